@@ -0,0 +1,773 @@
+"""
+HTTP Job API
+Accepts Template and Bulk uploads over HTTP, runs them on a bounded job
+queue and serves job status, validation results and the output files
+
+    ./bid-optimizer serve --port 8000
+
+    curl -F template=@Template.xlsx -F bulk=@Bulk.xlsx localhost:8000/jobs
+    curl localhost:8000/jobs/<job_id>
+    curl -OJ localhost:8000/jobs/<job_id>/files/clean
+
+Routes:
+    GET    /health                     Queue load
+    POST   /jobs                       Submit (multipart: template, bulk,
+                                       optimization*, format, changes_only,
+                                       validate_only) - 202, 429 when full
+    GET    /jobs                       All jobs
+    GET    /jobs/<id>                  Status, progress and result
+    GET    /jobs/<id>/validation       Validation result
+    GET    /jobs/<id>/files/<kind>     Download (kind: working or clean)
+    DELETE /jobs/<id>                  Cancel a running job, or discard a
+                                       finished one with its files
+
+The API is a plain WSGI application; LocalApiClient calls it in-process
+without a socket.
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import time
+import traceback
+from datetime import datetime
+from email import policy
+from email.parser import BytesParser
+from http import HTTPStatus
+from io import BytesIO
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+from wsgiref.simple_server import WSGIServer, make_server
+from wsgiref.util import setup_testing_defaults
+
+from business.optimizations import OPTIMIZATION_REGISTRY
+from business.services.batch_runner import (
+    STATUS_DONE,
+    STATUS_INVALID,
+    STATUS_VALID,
+    VALIDATION_KEYS,
+)
+from business.services.job_runner import (
+    Job,
+    JobQueueFullError,
+    JobRunner,
+    JobStatus,
+)
+from business.services.orchestrator import Orchestrator
+from data.writers.output_writer import OutputWriter
+from utils.cancellation import CancellationToken
+from utils.filename_generator import generate_output_filename
+from utils.instrumentation import debug
+from utils.progress import ProgressReporter
+
+# Output files a job can serve
+OUTPUT_KINDS = ["working", "clean"]
+
+# Form values read as True
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+# Download chunk size
+CHUNK_SIZE = 1024 * 1024
+
+# (status, headers, body chunks)
+Response = Tuple[int, List[Tuple[str, str]], Iterable[bytes]]
+
+
+class ApiError(Exception):
+    """Error answered with an HTTP status and a JSON message"""
+
+    def __init__(
+        self,
+        status: int,
+        message: str,
+        headers: Optional[List[Tuple[str, str]]] = None,
+    ):
+        """
+        Initialize error
+
+        Args:
+            status: HTTP status code
+            message: Error message for the client
+            headers: Extra response headers (e.g. Retry-After)
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+def run_optimization_job(
+    template_file: BytesIO,
+    bulk_file: BytesIO,
+    optimizations: List[str],
+    output_format: str = OutputWriter.XLSX_FORMAT,
+    changes_only: bool = False,
+    validate_only: bool = False,
+    progress: Optional[ProgressReporter] = None,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Dict[str, Any]:
+    """
+    Validate and process one upload pair - runs on a JobRunner worker
+
+    Args:
+        template_file: Uploaded Template (buffer with .name)
+        bulk_file: Uploaded Bulk (buffer with .name)
+        optimizations: Optimization names
+        output_format: Clean file format - 'xlsx' or 'csv'
+        changes_only: Keep only rows with a changed Bid in the Clean file
+        validate_only: Stop after validation
+        progress: Reporter for stage events (optional)
+        cancel_token: Token to abort processing (optional)
+
+    Returns:
+        Dictionary with status (done, valid or invalid), validation,
+        outputs (kind -> OutputFileHandle) and stats
+    """
+    orchestrator = Orchestrator()
+    validation = orchestrator.validate_files(
+        template_file, bulk_file, progress, cancel_token
+    )
+    result = {
+        "status": STATUS_INVALID,
+        "validation": {key: validation.get(key) for key in VALIDATION_KEYS},
+        "outputs": {},
+        "stats": None,
+    }
+    # The uploads are not needed any more - free them while processing
+    template_file.close()
+    bulk_file.close()
+
+    if not validation["is_valid"]:
+        return result
+    if validate_only:
+        result["status"] = STATUS_VALID
+        return result
+
+    working_file, clean_file, _ = orchestrator.process_files(
+        validation["template_df"],
+        validation["separated_dataframes"],
+        optimizations,
+        output_format=output_format,
+        changes_only=changes_only,
+        progress=progress,
+        cancel_token=cancel_token,
+    )
+    result["outputs"] = {"working": working_file, "clean": clean_file}
+    result["stats"] = orchestrator.file_generator.get_generation_summary()
+    result["status"] = STATUS_DONE
+
+    return result
+
+
+class JobApi:
+    """
+    WSGI application serving optimization jobs
+
+    Jobs run on a JobRunner with a bounded queue: once max_workers jobs
+    run and max_pending wait, new submissions get 429 with Retry-After
+    instead of piling up uploads in memory. Output files of discarded and
+    expired jobs are deleted.
+    """
+
+    DEFAULT_MAX_WORKERS = 2
+    DEFAULT_MAX_PENDING = 8
+    DEFAULT_MAX_UPLOAD_MB = 200
+
+    # Suggested wait before resubmitting after a 429
+    RETRY_AFTER_SECONDS = 10
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_upload_mb: float = DEFAULT_MAX_UPLOAD_MB,
+        result_ttl_seconds: int = JobRunner.DEFAULT_RESULT_TTL_SECONDS,
+    ):
+        """
+        Initialize API
+
+        Args:
+            max_workers: Jobs processed at the same time
+            max_pending: Jobs waiting for a worker before submissions are
+                refused with 429
+            max_upload_mb: Largest accepted request body
+            result_ttl_seconds: How long finished jobs and their files are
+                kept
+        """
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        self.runner = JobRunner(
+            max_workers=max_workers,
+            result_ttl_seconds=result_ttl_seconds,
+            max_pending=max_pending,
+            on_forget=_cleanup_job_outputs,
+        )
+        self.routes: List[Tuple[str, re.Pattern, Callable[..., Response]]] = [
+            ("GET", re.compile(r"^/health$"), self.health),
+            ("POST", re.compile(r"^/jobs$"), self.submit_job),
+            ("GET", re.compile(r"^/jobs$"), self.list_jobs),
+            ("GET", re.compile(r"^/jobs/(?P<job_id>\w+)$"), self.get_job),
+            (
+                "GET",
+                re.compile(r"^/jobs/(?P<job_id>\w+)/validation$"),
+                self.get_validation,
+            ),
+            (
+                "GET",
+                re.compile(r"^/jobs/(?P<job_id>\w+)/files/(?P<kind>\w+)$"),
+                self.download_file,
+            ),
+            ("DELETE", re.compile(r"^/jobs/(?P<job_id>\w+)$"), self.delete_job),
+        ]
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable):
+        """WSGI entry point"""
+        method = environ.get("REQUEST_METHOD", "GET").upper()
+        path = environ.get("PATH_INFO", "/").rstrip("/") or "/"
+
+        try:
+            status, headers, body = self._dispatch(method, path, environ)
+        except ApiError as e:
+            status, headers, body = _json_response(
+                e.status, {"error": e.message}, e.headers
+            )
+        except Exception as e:
+            print(f"JobApi error on {method} {path}: {e}")
+            traceback.print_exc()
+            status, headers, body = _json_response(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+            )
+
+        start_response(f"{status} {HTTPStatus(status).phrase}", headers)
+        return body
+
+    def close(self):
+        """Cancel running jobs and stop the workers"""
+        for status in self.runner.list_jobs():
+            self.runner.cancel(status["job_id"])
+        self.runner.executor.shutdown(wait=True, cancel_futures=True)
+
+    def health(self, environ: Dict[str, Any]) -> Response:
+        """GET /health - queue load"""
+        return _json_response(
+            HTTPStatus.OK, {"status": "ok", "jobs": self.runner.get_load()}
+        )
+
+    def submit_job(self, environ: Dict[str, Any]) -> Response:
+        """POST /jobs - queue an upload pair"""
+        fields, files = self._read_form(environ)
+
+        for field in ("template", "bulk"):
+            if field not in files:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing file field: {field}")
+
+        optimizations = fields.get("optimization") or ["Zero Sales"]
+        unknown = [name for name in optimizations if name not in OPTIMIZATION_REGISTRY]
+        if unknown:
+            raise ApiError(
+                HTTPStatus.BAD_REQUEST,
+                f"Unknown optimization: {', '.join(unknown)} "
+                f"(available: {', '.join(sorted(OPTIMIZATION_REGISTRY))})",
+            )
+
+        output_format = _get_field(fields, "format", OutputWriter.XLSX_FORMAT)
+        if output_format not in OutputWriter.OUTPUT_FORMATS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown format: {output_format}")
+
+        try:
+            job_id = self.runner.submit(
+                run_optimization_job,
+                files["template"],
+                files["bulk"],
+                optimizations,
+                output_format=output_format,
+                changes_only=_get_field(fields, "changes_only", "").lower()
+                in TRUE_VALUES,
+                validate_only=_get_field(fields, "validate_only", "").lower()
+                in TRUE_VALUES,
+                name=files["bulk"].name,
+                track_progress=True,
+                cancellable=True,
+            )
+        except JobQueueFullError as e:
+            raise ApiError(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                str(e),
+                [("Retry-After", str(self.RETRY_AFTER_SECONDS))],
+            )
+
+        debug("JobApi: Queued job %s for %s", job_id, files["bulk"].name)
+        return _json_response(
+            HTTPStatus.ACCEPTED,
+            self._describe_job(self.runner.get_job(job_id)),
+            [("Location", f"/jobs/{job_id}")],
+        )
+
+    def list_jobs(self, environ: Dict[str, Any]) -> Response:
+        """GET /jobs - status of all jobs"""
+        return _json_response(HTTPStatus.OK, {"jobs": self.runner.list_jobs()})
+
+    def get_job(self, environ: Dict[str, Any], job_id: str) -> Response:
+        """GET /jobs/<id> - status, progress and result"""
+        return _json_response(HTTPStatus.OK, self._describe_job(self._get_job(job_id)))
+
+    def get_validation(self, environ: Dict[str, Any], job_id: str) -> Response:
+        """GET /jobs/<id>/validation - validation result"""
+        result = self._get_result(job_id)
+        return _json_response(HTTPStatus.OK, result["validation"])
+
+    def download_file(
+        self, environ: Dict[str, Any], job_id: str, kind: str
+    ) -> Response:
+        """GET /jobs/<id>/files/<kind> - stream an output file"""
+        if kind not in OUTPUT_KINDS:
+            raise ApiError(
+                HTTPStatus.NOT_FOUND,
+                f"Unknown file: {kind} (available: {', '.join(OUTPUT_KINDS)})",
+            )
+
+        output_file = self._get_result(job_id)["outputs"].get(kind)
+        if output_file is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Job {job_id} has no {kind} file")
+
+        filename = generate_output_filename(
+            kind.capitalize(),
+            timestamp=_get_finish_time(self._get_job(job_id)),
+            extension=output_file.extension,
+        )
+        headers = [
+            ("Content-Type", _get_content_type(output_file.extension)),
+            ("Content-Length", str(output_file.size_bytes)),
+            ("Content-Disposition", f'attachment; filename="{filename}"'),
+        ]
+        # The open file survives a concurrent discard of the job
+        stream = output_file.open()
+        wrapper = environ.get("wsgi.file_wrapper")
+        if wrapper is not None:
+            return HTTPStatus.OK, headers, wrapper(stream, CHUNK_SIZE)
+        return HTTPStatus.OK, headers, _iter_file(stream)
+
+    def delete_job(self, environ: Dict[str, Any], job_id: str) -> Response:
+        """DELETE /jobs/<id> - cancel a running job or discard a finished one"""
+        job = self._get_job(job_id)
+        if not job.is_finished:
+            self.runner.cancel(job_id)
+            return _json_response(
+                HTTPStatus.ACCEPTED, {"job_id": job_id, "status": "cancelling"}
+            )
+
+        self.runner.discard(job_id)
+        return _json_response(HTTPStatus.OK, {"job_id": job_id, "status": "discarded"})
+
+    def _dispatch(self, method: str, path: str, environ: Dict[str, Any]) -> Response:
+        """Find the route for a request and call it"""
+        allowed = []
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            return handler(environ, **match.groupdict())
+
+        if allowed:
+            raise ApiError(
+                HTTPStatus.METHOD_NOT_ALLOWED,
+                f"{method} not allowed on {path}",
+                [("Allow", ", ".join(allowed))],
+            )
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Not found: {path}")
+
+    def _read_form(
+        self, environ: Dict[str, Any]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, BytesIO]]:
+        """
+        Parse a multipart/form-data request body
+
+        Returns:
+            Tuple of (fields: name -> values, files: name -> buffer with
+            .name set to the uploaded filename)
+        """
+        content_type = environ.get("CONTENT_TYPE", "")
+        if not content_type.startswith("multipart/form-data"):
+            raise ApiError(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Expected multipart/form-data"
+            )
+
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        if length <= 0:
+            raise ApiError(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+        if length > self.max_upload_bytes:
+            raise ApiError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Upload of {length / (1024 * 1024):.0f} MB exceeds "
+                f"{self.max_upload_bytes / (1024 * 1024):.0f} MB",
+            )
+
+        body = environ["wsgi.input"].read(length)
+        message = BytesParser(policy=policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+        )
+        if not message.is_multipart():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed multipart body")
+
+        fields: Dict[str, List[str]] = {}
+        files: Dict[str, BytesIO] = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if not name:
+                continue
+            content = part.get_payload(decode=True) or b""
+            filename = part.get_filename()
+            if filename is None:
+                fields.setdefault(name, []).append(content.decode("utf-8"))
+            else:
+                buffer = BytesIO(content)
+                # Readers pick CSV or Excel by the upload name
+                buffer.name = os.path.basename(filename)
+                files[name] = buffer
+
+        return fields, files
+
+    def _get_job(self, job_id: str) -> Job:
+        """Get a job or answer 404"""
+        job = self.runner.get_job(job_id)
+        if job is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown job: {job_id}")
+        return job
+
+    def _get_result(self, job_id: str) -> Dict[str, Any]:
+        """Get the result of a completed job or answer 409"""
+        job = self._get_job(job_id)
+        if job.status != JobStatus.COMPLETED:
+            raise ApiError(
+                HTTPStatus.CONFLICT,
+                f"Job {job_id} is {job.status}"
+                + (f": {job.error}" if job.error else ""),
+            )
+        return job.result
+
+    def _describe_job(self, job: Job) -> Dict[str, Any]:
+        """Job status with its result in JSON form"""
+        description = job.to_dict()
+        description["result"] = None
+        if job.status == JobStatus.COMPLETED:
+            result = job.result
+            description["result"] = {
+                "status": result["status"],
+                "validation": result["validation"],
+                "outputs": {
+                    kind: {
+                        "url": f"/jobs/{job.job_id}/files/{kind}",
+                        "size_bytes": output_file.size_bytes,
+                        "format": output_file.extension,
+                    }
+                    for kind, output_file in result["outputs"].items()
+                },
+                "stats": result["stats"],
+            }
+        return description
+
+
+class ApiResponse:
+    """Response returned by LocalApiClient"""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        """Decode the body as JSON"""
+        return json.loads(self.body)
+
+    def __repr__(self) -> str:
+        return f"ApiResponse({self.status}, {len(self.body)} bytes)"
+
+
+class LocalApiClient:
+    """Calls a JobApi in-process through WSGI - no server or socket needed"""
+
+    def __init__(self, api: JobApi):
+        """
+        Initialize client
+
+        Args:
+            api: Application to call
+        """
+        self.api = api
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        content_type: Optional[str] = None,
+    ) -> ApiResponse:
+        """
+        Send one request
+
+        Args:
+            method: HTTP method
+            path: Path, optionally with a query string
+            body: Request body
+            content_type: Content-Type of the body
+
+        Returns:
+            Response with status, headers and the whole body
+        """
+        path, _, query = path.partition("?")
+        environ: Dict[str, Any] = {}
+        setup_testing_defaults(environ)
+        environ.update(
+            {
+                "REQUEST_METHOD": method.upper(),
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": BytesIO(body),
+            }
+        )
+        if content_type:
+            environ["CONTENT_TYPE"] = content_type
+
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured["status"] = int(status.split()[0])
+            captured["headers"] = dict(headers)
+
+        chunks = self.api(environ, start_response)
+        try:
+            content = b"".join(chunks)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+        return ApiResponse(captured["status"], captured["headers"], content)
+
+    def get(self, path: str) -> ApiResponse:
+        """Send a GET request"""
+        return self.request("GET", path)
+
+    def delete(self, path: str) -> ApiResponse:
+        """Send a DELETE request"""
+        return self.request("DELETE", path)
+
+    def submit(
+        self,
+        template: Tuple[str, bytes],
+        bulk: Tuple[str, bytes],
+        **fields: Any,
+    ) -> ApiResponse:
+        """
+        Submit a job
+
+        Args:
+            template: (filename, content) of the Template
+            bulk: (filename, content) of the Bulk
+            **fields: Form fields - optimization may be a list
+
+        Returns:
+            Response of POST /jobs
+        """
+        body, content_type = encode_multipart(
+            fields, {"template": template, "bulk": bulk}
+        )
+        return self.request("POST", "/jobs", body, content_type)
+
+    def wait(self, job_id: str, timeout: float = 60.0, interval: float = 0.1) -> Dict:
+        """
+        Poll a job until it finishes
+
+        Args:
+            job_id: Job ID
+            timeout: Seconds before giving up
+            interval: Seconds between polls
+
+        Returns:
+            Final job description (GET /jobs/<id>)
+
+        Raises:
+            TimeoutError: If the job is still unfinished after timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            description = self.get(f"/jobs/{job_id}").json()
+            if description["status"] in JobStatus.FINISHED:
+                return description
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} still {description['status']}")
+            time.sleep(interval)
+
+
+def encode_multipart(
+    fields: Dict[str, Any], files: Dict[str, Tuple[str, bytes]]
+) -> Tuple[bytes, str]:
+    """
+    Encode a multipart/form-data body
+
+    Args:
+        fields: Field name -> value (or list of values)
+        files: Field name -> (filename, content)
+
+    Returns:
+        Tuple of (body, Content-Type header value)
+    """
+    boundary = uuid4().hex
+    parts = []
+    for name, values in fields.items():
+        for value in values if isinstance(values, (list, tuple)) else [values]:
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+                f"\r\n\r\n{value}\r\n".encode("utf-8")
+            )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n".encode("utf-8")
+            + content
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """WSGI server handling every request in its own thread"""
+
+    daemon_threads = True
+
+
+def serve(api: JobApi, host: str = "127.0.0.1", port: int = 8000):
+    """
+    Serve the API until interrupted
+
+    Args:
+        api: Application to serve
+        host: Interface to bind
+        port: Port to bind
+    """
+    server = make_server(host, port, api, server_class=_ThreadingWSGIServer)
+    # SIGTERM stops the server like Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"Bid Optimizer API on http://{host}:{server.server_port}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        api.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="bid-optimizer serve",
+        description="Serve optimization jobs over HTTP",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=JobApi.DEFAULT_MAX_WORKERS,
+        help="Jobs processed at the same time",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=JobApi.DEFAULT_MAX_PENDING,
+        help="Jobs waiting before submissions get 429",
+    )
+    parser.add_argument(
+        "--max-upload-mb",
+        type=float,
+        default=JobApi.DEFAULT_MAX_UPLOAD_MB,
+        help="Largest accepted upload request",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Server entry point - returns the exit code"""
+    args = build_parser().parse_args(argv)
+    serve(
+        JobApi(args.workers, args.max_pending, args.max_upload_mb),
+        args.host,
+        args.port,
+    )
+    return 0
+
+
+def _json_response(
+    status: int,
+    payload: Any,
+    headers: Optional[List[Tuple[str, str]]] = None,
+) -> Response:
+    """Build a JSON response"""
+    body = json.dumps(payload, default=str).encode("utf-8")
+    return (
+        int(status),
+        [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(body))),
+            *(headers or []),
+        ],
+        [body],
+    )
+
+
+def _get_field(fields: Dict[str, List[str]], name: str, default: str) -> str:
+    """Get the first value of a form field"""
+    values = fields.get(name)
+    return values[0].strip() if values else default
+
+
+def _get_content_type(extension: str) -> str:
+    """Content-Type of an output file"""
+    return {
+        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "csv": "text/csv",
+        "zip": "application/zip",
+    }.get(extension, "application/octet-stream")
+
+
+def _get_finish_time(job: Job) -> Optional[datetime]:
+    """Finish time of a job, for download names"""
+    return datetime.fromtimestamp(job.finished) if job.finished else None
+
+
+def _iter_file(stream) -> Iterable[bytes]:
+    """Read a file in chunks and close it"""
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.close()
+
+
+def _cleanup_job_outputs(job: Job):
+    """JobRunner on_forget hook - delete the output files of a job"""
+    if job.status != JobStatus.COMPLETED or not job.result:
+        return
+    for output_file in job.result["outputs"].values():
+        output_file.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Command Line Interface
+Validates and processes Template and Bulk files without Streamlit, writes
+the Working and Clean files to a directory and prints the run as JSON
+
+    ./bid-optimizer --template Template.xlsx --bulk Bulk.xlsx --output-dir out
+    ./bid-optimizer --template Template.xlsx --bulk Bulk.xlsx --validate-only
+
+    # Many accounts in parallel - a manifest or a directory of pairs
+    ./bid-optimizer batch --manifest accounts.json --output-dir out
+    ./bid-optimizer batch --accounts-dir exports/ --output-dir out
+
+    # HTTP job API (see app/api.py)
+    ./bid-optimizer serve --port 8000
+
+The JSON result goes to stdout (or --stats-file); progress and pipeline
+messages go to stderr. Exit codes: 0 done, 1 validation failed, 2 bad
+arguments, 3 processing error, 130 cancelled (SIGINT/SIGTERM). A batch
+exits with the most severe code among its accounts.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional
+
+from business.optimizations import OPTIMIZATION_REGISTRY
+from business.services.batch_runner import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_ERROR,
+    STATUS_INVALID,
+    STATUS_VALID,
+    BatchRunner,
+    process_account,
+)
+from data.writers.output_writer import OutputWriter
+from utils.cancellation import CancellationToken
+from utils.progress import STAGE_FINISHED, ProgressReporter
+
+# Exit codes
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_ERROR = 3
+EXIT_CANCELLED = 130
+
+EXIT_CODES = {
+    STATUS_DONE: EXIT_OK,
+    STATUS_VALID: EXIT_OK,
+    STATUS_INVALID: EXIT_INVALID,
+    STATUS_ERROR: EXIT_ERROR,
+    STATUS_CANCELLED: EXIT_CANCELLED,
+}
+
+# Batch exit code - the first of these any account has
+EXIT_SEVERITY = [EXIT_CANCELLED, EXIT_ERROR, EXIT_INVALID]
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of a single run"""
+    parser = argparse.ArgumentParser(
+        prog="bid-optimizer",
+        description="Validate and optimize an Amazon Bulk file without the UI "
+        "(many accounts: bid-optimizer batch --help)",
+    )
+    parser.add_argument("--template", required=True, help="Template file (xlsx/csv)")
+    parser.add_argument("--bulk", required=True, help="Bulk file (xlsx/csv)")
+    parser.add_argument(
+        "--output-dir", help="Directory for the Working and Clean files"
+    )
+    _add_processing_arguments(parser)
+    return parser
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of a batch run"""
+    parser = argparse.ArgumentParser(
+        prog="bid-optimizer batch",
+        description="Validate and optimize many accounts in parallel",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--manifest", help="JSON or CSV manifest of accounts (name, template, bulk)"
+    )
+    source.add_argument(
+        "--accounts-dir",
+        help="Directory with one subdirectory per account, holding its "
+        "Template (name contains 'template') and Bulk",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Parent directory - every account writes to <output-dir>/<name>",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Accounts run in parallel (default: CPU count)"
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        help="Estimated memory of all running accounts "
+        "(default: 75%% of physical memory)",
+    )
+    _add_processing_arguments(parser)
+    return parser
+
+
+def run(args: argparse.Namespace, cancel_token: CancellationToken) -> Dict[str, Any]:
+    """
+    Run validation and processing
+
+    Args:
+        args: Parsed arguments
+        cancel_token: Token cancelled by SIGINT/SIGTERM
+
+    Returns:
+        Result dictionary with status, exit_code, validation, outputs and
+        stats
+    """
+    progress = ProgressReporter([] if args.quiet else [_print_stage])
+    result = process_account(
+        args.template,
+        args.bulk,
+        args.output_dir,
+        progress=progress,
+        cancel_token=cancel_token,
+        **_get_processing_options(args),
+    )
+
+    return {
+        "status": result["status"],
+        "exit_code": EXIT_CODES[result["status"]],
+        "template": os.path.abspath(args.template),
+        "bulk": os.path.abspath(args.bulk),
+        **result,
+    }
+
+
+def run_batch(
+    args: argparse.Namespace,
+    runner: BatchRunner,
+    accounts: List[Dict[str, Any]],
+    cancel_token: CancellationToken,
+) -> Dict[str, Any]:
+    """
+    Run all accounts of a batch
+
+    Args:
+        args: Parsed batch arguments
+        runner: Batch runner
+        accounts: Accounts from the manifest or accounts directory
+        cancel_token: Token cancelled by SIGINT/SIGTERM
+
+    Returns:
+        Batch summary (see BatchRunner.run) with exit_code
+    """
+    if not args.quiet:
+        budget = (
+            f"{runner.memory_budget_mb:,.0f} MB"
+            if runner.memory_budget_mb
+            else "unbounded"
+        )
+        print(
+            f"Batch: {len(accounts)} accounts, {runner.max_workers} workers, "
+            f"memory budget {budget}",
+            file=sys.stderr,
+        )
+
+    summary = runner.run(
+        accounts,
+        args.output_dir,
+        _get_processing_options(args),
+        on_result=None if args.quiet else _print_account,
+        cancel_token=cancel_token,
+    )
+
+    exit_codes = {EXIT_CODES[result["status"]] for result in summary["accounts"]}
+    summary["exit_code"] = next(
+        (code for code in EXIT_SEVERITY if code in exit_codes), EXIT_OK
+    )
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point - returns the exit code"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "serve":
+        # Imported on demand - file runs do not need the server
+        from app import api
+
+        return api.main(argv[1:])
+
+    batch = bool(argv) and argv[0] == "batch"
+
+    if batch:
+        parser = build_batch_parser()
+        args = parser.parse_args(argv[1:])
+        runner = BatchRunner(args.workers, args.memory_budget_mb)
+        try:
+            if args.manifest:
+                accounts = runner.load_manifest(args.manifest)
+            else:
+                accounts = runner.discover_accounts(args.accounts_dir)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        if not accounts:
+            parser.error("No accounts found")
+    else:
+        parser = build_parser()
+        args = parser.parse_args(argv)
+        for path in (args.template, args.bulk):
+            if not os.path.isfile(path):
+                parser.error(f"File not found: {path}")
+
+    if not args.validate_only and not args.output_dir:
+        parser.error("--output-dir is required unless --validate-only is given")
+
+    # Stop at the next checkpoint on Ctrl+C or when cron/systemd stops us
+    cancel_token = CancellationToken()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: cancel_token.cancel())
+
+    start = time.perf_counter()
+    # Pipeline prints go to stderr - stdout carries only the JSON result
+    with redirect_stdout(sys.stderr):
+        if batch:
+            result = run_batch(args, runner, accounts, cancel_token)
+        else:
+            result = run(args, cancel_token)
+    result["duration_seconds"] = round(time.perf_counter() - start, 3)
+
+    output = json.dumps(result, indent=2, default=str)
+    if batch and args.output_dir:
+        # Kept next to the account outputs for later inspection
+        os.makedirs(args.output_dir, exist_ok=True)
+        with open(
+            os.path.join(args.output_dir, BATCH_SUMMARY_FILE), "w", encoding="utf-8"
+        ) as f:
+            f.write(output + "\n")
+    if args.stats_file:
+        with open(args.stats_file, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return result["exit_code"]
+
+
+def _add_processing_arguments(parser: argparse.ArgumentParser):
+    """Options shared by single and batch runs"""
+    parser.add_argument(
+        "--optimization",
+        action="append",
+        choices=sorted(OPTIMIZATION_REGISTRY),
+        help="Optimization to apply, repeatable (default: Zero Sales)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OutputWriter.OUTPUT_FORMATS,
+        default=OutputWriter.XLSX_FORMAT,
+        help="Clean file format (default: xlsx)",
+    )
+    parser.add_argument(
+        "--changes-only",
+        action="store_true",
+        help="Keep only rows with a changed Bid in the Clean file",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Stop after validation, write no files",
+    )
+    parser.add_argument(
+        "--stats-file", help="Write the JSON result to this file instead of stdout"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="No progress lines on stderr"
+    )
+
+
+def _get_processing_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Keyword arguments for process_account"""
+    return {
+        "optimizations": args.optimization,
+        "output_format": args.format,
+        "changes_only": args.changes_only,
+        "validate_only": args.validate_only,
+    }
+
+
+def _print_stage(event: Dict[str, Any]):
+    """Progress callback - one line per finished stage on stderr"""
+    if event["type"] != STAGE_FINISHED:
+        return
+    rows = f"{event['rows']:,} rows" if event.get("rows") is not None else ""
+    print(
+        f"[{event['progress']:>4.0%}] {event['stage']:<28} "
+        f"{event['elapsed_seconds']:>7.2f}s {rows}",
+        file=sys.stderr,
+    )
+
+
+def _print_account(result: Dict[str, Any]):
+    """Batch callback - one line per finished account on stderr"""
+    duration = result.get("duration_seconds")
+    detail = result.get("error") or ""
+    if result["status"] == STATUS_INVALID:
+        validation = result.get("validation") or {}
+        detail = "; ".join(validation.get("errors") or [])
+    print(
+        f"{result['name']:<30} {result['status']:<10} "
+        f"{f'{duration:.1f}s' if duration is not None else '-':>8} {detail}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
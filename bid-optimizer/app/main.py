@@ -1,4 +1,5 @@
 import streamlit as st
+from state.session import SessionStateManager
 from ui.page import render_page
 
 
@@ -12,6 +13,9 @@ def main():
 
     render_page()
 
+    # Reached only when the run was not cut short by st.rerun()
+    SessionStateManager.release_memory()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,373 @@
+"""
+Session Memory Governor
+Tracks the size of large session state entries and spills those of idle
+sessions to disk, reloading them when the session comes back
+"""
+
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, MutableMapping, Optional
+
+from data.artifact_store import ArtifactNotFoundError, ArtifactStore, get_artifact_store
+from data.dataset_cache import estimate_size
+from utils.instrumentation import debug
+
+# Session state entries that can hold DataFrames or file bytes
+LARGE_STATE_KEYS = [
+    "template_df",
+    "bulk_df",
+    "cleaned_bulk_df",
+    "separated_dataframes",
+    "validation_result",
+    "output_files",
+]
+
+# Session state entries set while a background job works for the session
+BUSY_STATE_KEYS = ["processing_job_id", "working_job_id"]
+
+# Environment switch for the memory budget in MB
+MEMORY_BUDGET_ENV_VAR = "BID_OPTIMIZER_SESSION_MEMORY_MB"
+
+
+class SpilledValue:
+    """Placeholder left in session state for a value spilled to disk"""
+
+    def __init__(self, artifact_id: str, size_bytes: int):
+        """
+        Initialize placeholder
+
+        Args:
+            artifact_id: Artifact holding the pickled value
+            size_bytes: Estimated in-memory size of the value
+        """
+        self.artifact_id = artifact_id
+        self.size_bytes = size_bytes
+
+    def __repr__(self) -> str:
+        return f"SpilledValue({self.artifact_id!r}, {self.size_bytes} bytes)"
+
+
+class SessionMemoryGovernor:
+    """
+    Keeps the large session state of idle sessions out of memory
+
+    Every script run registers its session with touch(), which first
+    reloads anything spilled while the session was idle. Sweeps - at most
+    every SWEEP_INTERVAL_SECONDS, run from touch() - pickle the large
+    entries of sessions idle for longer than idle_ttl_seconds into the
+    artifact store, leaving SpilledValue placeholders. Sessions with a
+    background job running are never spilled by a sweep.
+
+    Only idle sessions are spilled by the sweeping thread - the script
+    thread of an active session may be reading its state. When the
+    entries still in memory exceed the budget, the least recently active
+    sessions are marked instead, and each swaps its own entries out when
+    its script run ends (see release). Spilled values expire with the
+    artifact store TTL; touch() reports those, and any the store refuses
+    to load, as lost.
+
+    Sessions are held by weak reference, so closed sessions drop out.
+    """
+
+    DEFAULT_IDLE_TTL_SECONDS = 15 * 60  # 15 minutes
+    DEFAULT_MEMORY_BUDGET_MB = 2048
+
+    # Smaller entries are not worth a round trip to disk
+    MIN_SPILL_BYTES = 1024 * 1024
+
+    # Minimum time between two sweeps
+    SWEEP_INTERVAL_SECONDS = 30
+
+    def __init__(
+        self,
+        idle_ttl_seconds: int = DEFAULT_IDLE_TTL_SECONDS,
+        memory_budget_mb: Optional[float] = None,
+        keys: Optional[List[str]] = None,
+        store: Optional[ArtifactStore] = None,
+        busy_keys: Optional[List[str]] = None,
+    ):
+        """
+        Initialize governor
+
+        Args:
+            idle_ttl_seconds: Idle time after which a session is spilled
+            memory_budget_mb: Size of all large entries in memory before
+                active sessions are spilled too (default:
+                BID_OPTIMIZER_SESSION_MEMORY_MB or 2048)
+            keys: Session state keys to govern (default: LARGE_STATE_KEYS)
+            store: Store for spilled values (default: shared artifact store)
+            busy_keys: Session state keys set while a background job runs
+                for the session (default: BUSY_STATE_KEYS)
+        """
+        if memory_budget_mb is None:
+            memory_budget_mb = float(
+                os.environ.get(MEMORY_BUDGET_ENV_VAR, self.DEFAULT_MEMORY_BUDGET_MB)
+            )
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.keys = list(keys or LARGE_STATE_KEYS)
+        self.store = store
+        self.busy_keys = list(busy_keys or BUSY_STATE_KEYS)
+
+        # session ID -> {"state", "last_access", "lock", "sizes",
+        # "spill_requested"}
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.stats = {"spilled": 0, "reloaded": 0, "lost": 0}
+
+    def touch(self, session_id: str, state: MutableMapping) -> List[str]:
+        """
+        Register activity of a session and reload its spilled entries
+
+        Call at the start of every script run, before the state is read.
+
+        Args:
+            session_id: Stable session ID
+            state: The session's state mapping (held by weak reference)
+
+        Returns:
+            Keys whose spilled values had expired - they are removed from
+            the state
+        """
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                record = {
+                    "lock": threading.Lock(),
+                    "sizes": {},
+                    "spill_requested": False,
+                }
+                self._sessions[session_id] = record
+            record["state"] = weakref.ref(state)
+            record["last_access"] = time.time()
+
+        lost = self._reload(record, state)
+        self.sweep(exclude=session_id)
+        return lost
+
+    def sweep(self, exclude: Optional[str] = None, force: bool = False) -> int:
+        """
+        Spill idle sessions, then mark the least recently active ones for
+        spilling while the entries in memory exceed the budget
+
+        Args:
+            exclude: Session never spilled (the one running the sweep)
+            force: Sweep even if the last sweep was recent
+
+        Returns:
+            Number of sessions spilled or marked for spilling
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_sweep < self.SWEEP_INTERVAL_SECONDS:
+                return 0
+            self._last_sweep = now
+
+            # Closed sessions are gone once Streamlit drops their state
+            for session_id in [
+                session_id
+                for session_id, record in self._sessions.items()
+                if record["state"]() is None
+            ]:
+                del self._sessions[session_id]
+            records = sorted(
+                (
+                    (session_id, record)
+                    for session_id, record in self._sessions.items()
+                    if session_id != exclude
+                ),
+                key=lambda item: item[1]["last_access"],
+            )
+
+        spilled = 0
+        in_memory = self.get_memory_bytes()
+        for session_id, record in records:
+            idle = now - record["last_access"] > self.idle_ttl_seconds
+            if not idle and in_memory <= self.memory_budget_bytes:
+                break
+            if self._is_busy(record):
+                continue
+            if idle:
+                freed = self._spill(session_id, record, idle_only=True)
+            elif not record["spill_requested"]:
+                # Its script thread may be reading the state right now -
+                # leave the swap to it, and count the entries as freed
+                freed = self._get_record_bytes(record)
+                record["spill_requested"] = freed > 0
+            else:
+                continue
+            if freed:
+                in_memory -= freed
+                spilled += 1
+
+        return spilled
+
+    def release(self, session_id: str) -> int:
+        """
+        Spill a session's large entries if a sweep marked it
+
+        Call from the session's own script thread at the end of a run -
+        the next run reloads them in touch().
+
+        Args:
+            session_id: Stable session ID
+
+        Returns:
+            Bytes freed
+        """
+        with self._lock:
+            record = self._sessions.get(session_id)
+        if record is None or not record["spill_requested"]:
+            return 0
+
+        record["spill_requested"] = False
+        if self._is_busy(record) or self.get_memory_bytes() <= self.memory_budget_bytes:
+            return 0
+        return self._spill(session_id, record)
+
+    def get_memory_bytes(self) -> int:
+        """Estimated size of all governed entries still in memory"""
+        with self._lock:
+            records = list(self._sessions.values())
+
+        return sum(self._get_record_bytes(record) for record in records)
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get governor usage
+
+        Returns:
+            Dictionary with sessions, memory_mb, budget_mb, spilled,
+            reloaded and lost
+        """
+        with self._lock:
+            sessions = len(self._sessions)
+        return {
+            "sessions": sessions,
+            "memory_mb": round(self.get_memory_bytes() / (1024 * 1024), 1),
+            "budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1),
+            **self.stats,
+        }
+
+    def _spill(
+        self, session_id: str, record: Dict[str, Any], idle_only: bool = False
+    ) -> int:
+        """
+        Pickle a session's large entries to disk - returns bytes freed
+
+        With idle_only, nothing is spilled if the session came back since
+        the sweep saw it idle (touch() updates last_access before it takes
+        the session lock to reload).
+        """
+        state = record["state"]()
+        if state is None:
+            return 0
+
+        store = self.store or get_artifact_store()
+        freed = 0
+        with record["lock"]:
+            if idle_only and (
+                time.time() - record["last_access"] <= self.idle_ttl_seconds
+            ):
+                return 0
+            for key in self.keys:
+                value = _get_value(state, key)
+                if value is None or isinstance(value, SpilledValue):
+                    continue
+                size_bytes = self._get_size(record, key, value)
+                if size_bytes < self.MIN_SPILL_BYTES:
+                    continue
+
+                artifact_id = store.put_object(value, f"session_{key}.pkl")
+                state[key] = SpilledValue(artifact_id, size_bytes)
+                record["sizes"].pop(key, None)
+                freed += size_bytes
+                self.stats["spilled"] += 1
+
+        if freed:
+            debug(
+                "SessionMemoryGovernor: Spilled %.1f MB of session %s",
+                freed / (1024 * 1024),
+                session_id[:8],
+            )
+        return freed
+
+    def _reload(self, record: Dict[str, Any], state: MutableMapping) -> List[str]:
+        """Load a session's spilled entries back into its state"""
+        store = self.store or get_artifact_store()
+        lost = []
+        with record["lock"]:
+            for key in self.keys:
+                value = _get_value(state, key)
+                if not isinstance(value, SpilledValue):
+                    continue
+                try:
+                    state[key] = store.get_object(value.artifact_id)
+                    self.stats["reloaded"] += 1
+                except (ArtifactNotFoundError, PermissionError):
+                    # Expired, or a file this user did not write - never
+                    # unpickled
+                    del state[key]
+                    lost.append(key)
+                    self.stats["lost"] += 1
+                store.delete(value.artifact_id)
+
+        return lost
+
+    def _get_record_bytes(self, record: Dict[str, Any]) -> int:
+        """Estimated size of a session's governed entries still in memory"""
+        state = record["state"]()
+        if state is None:
+            return 0
+
+        total = 0
+        with record["lock"]:
+            for key in self.keys:
+                value = _get_value(state, key)
+                if value is not None and not isinstance(value, SpilledValue):
+                    total += self._get_size(record, key, value)
+        return total
+
+    def _is_busy(self, record: Dict[str, Any]) -> bool:
+        """Whether a background job is running for the session"""
+        state = record["state"]()
+        return state is not None and any(
+            _get_value(state, key) is not None for key in self.busy_keys
+        )
+
+    def _get_size(self, record: Dict[str, Any], key: str, value: Any) -> int:
+        """Size of an entry, measured again only when the value changed"""
+        # Keyed by id() - holding the value would keep replaced ones alive
+        cached = record["sizes"].get(key)
+        if cached is not None and cached[0] == id(value):
+            return cached[1]
+        size_bytes = estimate_size(value)
+        record["sizes"][key] = (id(value), size_bytes)
+        return size_bytes
+
+
+def _get_value(state: MutableMapping, key: str) -> Any:
+    """Get a state entry (None if missing)"""
+    return state[key] if key in state else None
+
+
+# Process-wide governor shared by all sessions
+_session_governor = None
+_session_governor_lock = threading.Lock()
+
+
+def get_session_governor() -> SessionMemoryGovernor:
+    """
+    Get the process-wide session memory governor
+
+    Returns:
+        Shared SessionMemoryGovernor instance
+    """
+    global _session_governor
+    with _session_governor_lock:
+        if _session_governor is None:
+            _session_governor = SessionMemoryGovernor()
+        return _session_governor
@@ -3,9 +3,16 @@ Session State Manager
 Manages all application state and transitions
 """
 
+import uuid
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from typing import Any, Dict, List, Optional
 
+from data.dataset_cache import get_dataset_cache
+from state.memory_governor import get_session_governor
+from utils.instrumentation import debug
+
 
 class SessionStateManager:
     """Manages application state and transitions"""
@@ -13,6 +20,8 @@ class SessionStateManager:
     @staticmethod
     def initialize():
         """Initialize all session state variables"""
+        SessionStateManager.govern_memory()
+
         defaults = {
             "current_state": "upload",
             "template_file": None,
@@ -20,7 +29,10 @@ class SessionStateManager:
             "template_df": None,
             "bulk_df": None,
             "cleaned_bulk_df": None,
+            "dataset_key": None,  # Parsed files in the shared dataset cache
             "selected_optimizations": ["Zero Sales"],
+            "output_format": "xlsx",
+            "changes_only": False,
             "validation_state": "pending",
             "validation_result": None,
             "missing_portfolios": [],
@@ -47,11 +59,82 @@ class SessionStateManager:
         """Get a value from session state"""
         return st.session_state.get(key, default)
 
+    @staticmethod
+    def get_session_id() -> str:
+        """Get a stable ID of this browser session"""
+        if "session_id" not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
+        return st.session_state.session_id
+
+    @staticmethod
+    def govern_memory():
+        """
+        Reload large entries spilled while this session was idle, and let
+        the memory governor spill other idle sessions
+        """
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return
+
+        lost = get_session_governor().touch(
+            SessionStateManager.get_session_id(), ctx.session_state
+        )
+        if lost:
+            # Spilled too long ago - validate the uploads again
+            debug("[session]: Spilled state expired: %s", lost)
+            st.session_state.validation_state = "pending"
+            if st.session_state.get("current_state") == "complete":
+                st.session_state.current_state = "ready"
+
+    @staticmethod
+    def release_memory():
+        """
+        Spill this session's large entries if the memory governor asked
+        for it - call once the page has rendered
+        """
+        if get_script_run_ctx() is None or "session_id" not in st.session_state:
+            return
+
+        freed = get_session_governor().release(st.session_state.session_id)
+        if freed:
+            debug("[session]: Released %.1f MB", freed / (1024 * 1024))
+
+    @staticmethod
+    def set_dataset(key: Optional[str]):
+        """Point the session at a dataset in the shared cache"""
+        if st.session_state.get("dataset_key") not in (None, key):
+            SessionStateManager.release_dataset()
+        st.session_state.dataset_key = key
+
+    @staticmethod
+    def get_dataset() -> Optional[Dict[str, Any]]:
+        """
+        Get this session's parsed files from the shared cache
+
+        Returns:
+            Dataset with validation, template_df and separated_dataframes,
+            or None if there is none or it was evicted
+        """
+        key = st.session_state.get("dataset_key")
+        if key is None:
+            return None
+        return get_dataset_cache().get(key, SessionStateManager.get_session_id())
+
+    @staticmethod
+    def release_dataset():
+        """Let go of this session's dataset - other sessions keep it"""
+        key = st.session_state.get("dataset_key")
+        if key is not None:
+            get_dataset_cache().release(key, SessionStateManager.get_session_id())
+            st.session_state.dataset_key = None
+
     @staticmethod
     def clear():
         """Clear all session state except defaults"""
+        SessionStateManager.release_dataset()
+
         # Keep only essential keys
-        keep_keys = ["current_state"]
+        keep_keys = ["current_state", "session_id"]
         for key in list(st.session_state.keys()):
             if key not in keep_keys:
                 del st.session_state[key]
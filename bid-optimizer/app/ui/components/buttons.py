@@ -1,4 +1,5 @@
 import streamlit as st
+from state.session import SessionStateManager
 
 
 def render_download_template_button():
@@ -54,9 +55,8 @@ def render_reset_button():
         use_container_width=True,
         help="Clear all data and start over",
     ):
-        # Clear all session state
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        # Clear session state - releases this session's hold on its dataset
+        SessionStateManager.clear()
         st.session_state.current_state = "upload"
         st.rerun()
 
@@ -2,7 +2,13 @@
 import streamlit as st
 from datetime import datetime
 from io import BytesIO
+from typing import Any, Callable, Optional, Tuple
 import pandas as pd
+from business.services.job_runner import get_job_runner, JobStatus
+from data.artifact_store import get_artifact_store, ArtifactNotFoundError
+from state.session import SessionStateManager
+from ui.components.progress_bar import render_progress_bar, render_stage_progress
+from utils.instrumentation import debug
 
 
 def generate_filename(file_type: str) -> str:
@@ -63,6 +69,115 @@ def create_mock_excel_file(file_type: str) -> BytesIO:
     return output
 
 
+# MIME types by output file extension
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "zip": "application/zip",
+}
+
+
+def render_output_format_selector():
+    """Render Clean file options - format (Excel or bulk-upload CSV) and diff mode"""
+
+    formats = {
+        "xlsx": "Excel (.xlsx)",
+        "csv": "CSV for bulk upload (faster for large files)",
+    }
+
+    st.radio(
+        "Clean file format",
+        options=list(formats.keys()),
+        format_func=lambda x: formats[x],
+        key="output_format",
+        horizontal=True,
+        help="CSV output has one file per sheet, zipped when there are several",
+    )
+
+    st.checkbox(
+        "Clean file: changed rows only",
+        key="changes_only",
+        help="Leave out rows whose new Bid equals the Old Bid",
+    )
+
+
+def read_artifact_bytes(artifact_id: str) -> bytes:
+    """
+    Read an output file for a download button
+
+    The bytes are read from the store on each render and not kept in any
+    server-wide cache, so whole workbooks are only held for the session
+    rendering them.
+
+    Args:
+        artifact_id: Artifact of the output file
+
+    Returns:
+        File bytes
+
+    Raises:
+        ArtifactNotFoundError: If the artifact does not exist or expired
+    """
+    with get_artifact_store().open(artifact_id) as f:
+        return f.read()
+
+
+def get_output_file_data(
+    file_type: str,
+) -> Tuple[Optional[Callable[[], Any]], float]:
+    """
+    Get a loader for the download data of a generated output file
+
+    Files are kept on disk in the artifact store and session state holds
+    only their artifact IDs ("<file_type>_artifact"). The size comes from
+    the store; the bytes are read only when the loader is called, right
+    before the download button is rendered. Bytes stored directly under
+    "<file_type>" (e.g. mock output) are still supported.
+
+    Args:
+        file_type: 'working' or 'clean'
+
+    Returns:
+        Tuple of (loader returning the file data, or None; size in KB)
+    """
+    output_files = st.session_state.get("output_files") or {}
+
+    artifact_id = output_files.get(f"{file_type}_artifact")
+    if artifact_id:
+        try:
+            size_bytes = get_artifact_store().get_info(artifact_id)["size_bytes"]
+        except ArtifactNotFoundError:
+            st.warning(
+                f"The {file_type.title()} file has expired - please process the files again"
+            )
+            return None, 0.0
+        return lambda: read_artifact_bytes(artifact_id), size_bytes / 1024
+
+    file_data = output_files.get(file_type)
+    if not file_data:
+        return None, 0.0
+
+    if isinstance(file_data, bytes):
+        return lambda: file_data, len(file_data) / 1024  # KB
+    return lambda: file_data, len(file_data.getvalue()) / 1024  # KB
+
+
+def load_output_file_data(file_type: str, load: Callable[[], Any]) -> Optional[Any]:
+    """
+    Call a loader from get_output_file_data
+
+    Returns:
+        File data, or None if the file expired in the meantime
+    """
+    try:
+        return load()
+    except ArtifactNotFoundError:
+        st.warning(
+            f"The {file_type.title()} file has expired - please process the files again"
+        )
+        return None
+
+
 def render_download_buttons():
     """Render download buttons for Working and Clean files"""
 
@@ -78,24 +193,23 @@ def render_download_buttons():
 def render_working_download():
     """Render Working File download button"""
 
+    # Working file not built yet - offer to prepare it
+    if st.session_state.get("output_files", {}).get("working_sheets_artifact"):
+        render_prepare_working_button()
+        return
+
     # Check if we have real files in session state
-    if st.session_state.get("output_files", {}).get("working"):
-        # Use real file from session state
-        file_data = st.session_state.output_files["working"]
+    load_file_data, file_size = get_output_file_data("working")
+    if load_file_data is not None:
         filename = st.session_state.output_files.get(
             "working_filename", generate_filename("Working")
         )
-
-        # Get file size
-        if isinstance(file_data, bytes):
-            file_size = len(file_data) / 1024  # KB
-        else:
-            file_size = len(file_data.getvalue()) / 1024  # KB
     else:
         # Fallback to mock file
         filename = generate_filename("Working")
-        file_data = create_mock_excel_file("Working")
-        file_size = len(file_data.getvalue()) / 1024  # KB
+        mock_data = create_mock_excel_file("Working")
+        load_file_data = lambda: mock_data
+        file_size = len(mock_data.getvalue()) / 1024  # KB
 
     # Display file info
     st.markdown(f"**Working File**")
@@ -103,7 +217,10 @@ def render_working_download():
         f"<small>Size: {file_size:.1f} KB | 2 sheets</small>", unsafe_allow_html=True
     )
 
-    # Download button
+    # Download button - the file is read only now
+    file_data = load_output_file_data("working", load_file_data)
+    if file_data is None:
+        return
     st.download_button(
         label="Download Working File",
         data=file_data,
@@ -115,40 +232,177 @@ def render_working_download():
     )
 
 
+def build_working_artifact(
+    working_sheets_artifact: str, progress=None, cancel_token=None
+) -> Optional[dict]:
+    """
+    Build a deferred Working file and move it into the artifact store
+
+    Runs as a background job - must not touch st.session_state.
+    Stage events are published to progress (a ProgressReporter);
+    cancel_token (a CancellationToken) stops the writer at its next
+    checkpoint and removes its partial files.
+
+    Args:
+        working_sheets_artifact: Artifact holding the pickled Working sheets
+
+    Returns:
+        Dictionary with working_artifact and working_filename, or None if
+        the Working sheets have expired
+    """
+    from business.processors.file_generator import FileGenerator
+    from utils.filename_generator import generate_output_filename
+
+    store = get_artifact_store()
+    try:
+        working_sheets = store.get_object(working_sheets_artifact)
+    except ArtifactNotFoundError:
+        return None
+
+    working_file = FileGenerator().build_working_file(
+        working_sheets, progress=progress, cancel_token=cancel_token
+    )
+    working_filename = generate_output_filename("Working")
+    return {
+        "working_artifact": store.put_file(working_file.path, working_filename),
+        "working_filename": working_filename,
+    }
+
+
+def render_prepare_working_button():
+    """Render button that builds the deferred Working file as a background job"""
+
+    st.markdown(f"**Working File**")
+
+    job_id = st.session_state.get("working_job_id")
+    if job_id is not None:
+        render_working_job_progress(job_id)
+        return
+
+    st.markdown(
+        "<small>Built on request - includes all helper columns</small>",
+        unsafe_allow_html=True,
+    )
+    error = st.session_state.pop("working_error", None)
+    if error:
+        st.warning(error)
+
+    if st.button(
+        "Prepare Working File",
+        key="prepare_working_file",
+        use_container_width=True,
+    ):
+        st.session_state.working_job_id = get_job_runner().submit(
+            build_working_artifact,
+            st.session_state.output_files["working_sheets_artifact"],
+            name="Prepare Working file",
+            track_progress=True,
+            cancellable=True,
+        )
+        st.rerun()
+
+
+def render_working_job_progress(job_id: str):
+    """
+    Show the progress of the Working file job, or take its result
+
+    The caller reruns the page to poll while the job runs (see
+    is_working_file_building).
+    """
+    runner = get_job_runner()
+    status = runner.get_status(job_id)
+
+    if status is None:
+        # Job expired or the server restarted
+        st.session_state.pop("working_job_id", None)
+        st.session_state.working_error = (
+            "The Working file job was lost - please prepare it again"
+        )
+        st.rerun()
+
+    if status["status"] in (JobStatus.FAILED, JobStatus.CANCELLED):
+        st.session_state.pop("working_job_id", None)
+        runner.discard(job_id)
+        if status["status"] == JobStatus.FAILED:
+            st.session_state.working_error = (
+                f"Preparing the Working file failed: {status['error']}"
+            )
+        st.rerun()
+
+    if status["status"] == JobStatus.COMPLETED:
+        result = runner.get_result(job_id)
+        st.session_state.pop("working_job_id", None)
+        runner.discard(job_id)
+        if result is None:
+            st.session_state.working_error = (
+                "The Working file data has expired - please process the files again"
+            )
+        else:
+            output_files = st.session_state.output_files
+            output_files.update(result)
+            get_artifact_store().delete(output_files.pop("working_sheets_artifact"))
+            debug("[download_buttons]: Working file prepared on request")
+        st.rerun()
+
+    # Still running
+    if status.get("progress"):
+        render_stage_progress(status["progress"])
+    else:
+        render_progress_bar(0.0, f"Preparing... {status['elapsed_seconds']:.0f}s")
+
+    # Cancelling only sets a flag - the writer stops at its next checkpoint
+    if st.button("Cancel", key="cancel_working_file", use_container_width=True):
+        runner.cancel(job_id)
+        st.info("Cancelling...")
+
+
+def is_working_file_building() -> bool:
+    """Whether a Working file job runs for this session - poll it by rerunning"""
+    return st.session_state.get("working_job_id") is not None
+
+
 def render_clean_download():
     """Render Clean File download button"""
 
     # Check if we have real files in session state
-    if st.session_state.get("output_files", {}).get("clean"):
-        # Use real file from session state
-        file_data = st.session_state.output_files["clean"]
+    load_file_data, file_size = get_output_file_data("clean")
+    if load_file_data is not None:
         filename = st.session_state.output_files.get(
             "clean_filename", generate_filename("Clean")
         )
-
-        # Get file size
-        if isinstance(file_data, bytes):
-            file_size = len(file_data) / 1024  # KB
-        else:
-            file_size = len(file_data.getvalue()) / 1024  # KB
+        extension = st.session_state.output_files.get("clean_extension", "xlsx")
+        part_count = st.session_state.output_files.get("clean_parts", 0)
     else:
         # Fallback to mock file
         filename = generate_filename("Clean")
-        file_data = create_mock_excel_file("Clean")
-        file_size = len(file_data.getvalue()) / 1024  # KB
+        extension = "xlsx"
+        part_count = 0
+        mock_data = create_mock_excel_file("Clean")
+        load_file_data = lambda: mock_data
+        file_size = len(mock_data.getvalue()) / 1024  # KB
 
     # Display file info
+    if part_count:
+        format_label = f"{part_count} upload files (zip)"
+    elif extension == "xlsx":
+        format_label = "1 sheet"
+    else:
+        format_label = f"{extension.upper()} bulk upload"
     st.markdown(f"**Clean File**")
     st.markdown(
-        f"<small>Size: {file_size:.1f} KB | 1 sheet</small>", unsafe_allow_html=True
+        f"<small>Size: {file_size:.1f} KB | {format_label}</small>",
+        unsafe_allow_html=True,
     )
 
-    # Download button
+    # Download button - the file is read only now
+    file_data = load_output_file_data("clean", load_file_data)
+    if file_data is None:
+        return
     st.download_button(
         label="Download Clean File",
         data=file_data,
         file_name=filename,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        mime=MIME_TYPES.get(extension, MIME_TYPES["xlsx"]),
         key="download_clean_file",
         use_container_width=True,
         type="primary",
@@ -164,9 +418,22 @@ def render_reset_button():
         use_container_width=True,
         help="Clear all data and start over",
     ):
-        # Clear session state
-        for key in list(st.session_state.keys()):
-            if key not in ["current_state"]:
-                del st.session_state[key]
+        # Stop a Working file build, then release generated files on disk
+        working_job_id = st.session_state.get("working_job_id")
+        if working_job_id is not None:
+            get_job_runner().cancel(working_job_id)
+            get_job_runner().discard(working_job_id)
+        output_files = st.session_state.get("output_files") or {}
+        for artifact_key in [
+            "working_artifact",
+            "working_sheets_artifact",
+            "clean_artifact",
+        ]:
+            artifact_id = output_files.get(artifact_key)
+            if artifact_id:
+                get_artifact_store().delete(artifact_id)
+
+        # Clear session state - releases this session's hold on its dataset
+        SessionStateManager.clear()
         st.session_state.current_state = "upload"
         st.rerun()
@@ -77,3 +77,72 @@ def render_processing_status(status: str, progress_value: float = None):
             f"<p style='text-align: center; color: #FAFAFA;'>{status}</p>",
             unsafe_allow_html=True,
         )
+
+
+def render_stage_progress(snapshot: dict):
+    """
+    Render real pipeline progress from a ProgressReporter snapshot
+
+    Args:
+        snapshot: Dictionary from ProgressReporter.get_snapshot()
+    """
+    current_stage = snapshot.get("current_stage") or "Processing"
+    elapsed = snapshot.get("total_elapsed_seconds", 0.0)
+    render_processing_status(
+        f"{current_stage}... ({elapsed:.0f}s elapsed)", snapshot.get("progress", 0.0)
+    )
+    render_stage_timeline(snapshot.get("timeline", []))
+
+
+def render_stage_timeline(timeline: list):
+    """
+    Render a table of pipeline stages with rows and elapsed time
+
+    Args:
+        timeline: List of stage dictionaries (stage, status, rows, elapsed_seconds)
+    """
+    if not timeline:
+        return
+
+    status_icons = {"running": "⏳", "done": "✓", "failed": "✗"}
+    rows = [
+        {
+            "": status_icons.get(entry.get("status"), ""),
+            "Stage": entry.get("stage"),
+            "Rows": f"{entry['rows']:,}" if entry.get("rows") is not None else "",
+            "Time": f"{entry.get('elapsed_seconds', 0.0):.1f}s",
+        }
+        for entry in timeline
+    ]
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
+def render_span_table(spans: list):
+    """
+    Render instrumentation spans with CPU time and memory
+
+    Args:
+        spans: List of span dictionaries (see utils.instrumentation)
+    """
+    if not spans:
+        return
+
+    rows = [
+        {
+            "Step": "  " * span.get("depth", 0) + span.get("name", ""),
+            "Rows": f"{span['rows_in']:,}" if span.get("rows_in") is not None else "",
+            "Wall": f"{span.get('wall_seconds') or 0.0:.2f}s",
+            "CPU": f"{span.get('cpu_seconds') or 0.0:.2f}s",
+            "Peak MB": _format_peak_mb(span),
+        }
+        for span in spans
+    ]
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
+def _format_peak_mb(span: dict) -> str:
+    """tracemalloc peak if traced, otherwise the process RSS high-water mark"""
+    peak = span.get("memory_peak_mb")
+    if peak is None:
+        peak = span.get("rss_peak_mb")
+    return f"{peak:.1f}" if peak is not None else ""
@@ -1,22 +1,11 @@
 import streamlit as st
-import sys
-import os
-
-# Add app directory to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-app_dir = os.path.dirname(current_dir)
-project_root = os.path.dirname(app_dir)
-if app_dir not in sys.path:
-    sys.path.insert(0, app_dir)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
 
+# The validation and output panels (pandas, the orchestrator) and the mock
+# data are imported where they are first needed, so the upload page renders
+# without them
 from ui.layout import apply_custom_css, create_header
 from ui.panels.upload_panel import render_upload_panel
-from ui.panels.validate_panel import render_validation_panel
-from ui.panels.output_panel import render_output_panel
 from state.session import SessionStateManager
-from state.mock_data import MockDataProvider, MockFile
 from config.constants import DEBUG_MODE
 
 
@@ -26,6 +15,12 @@ def render_page():
     # Initialize session state
     SessionStateManager.initialize()
 
+    # Reattach to a processing job after a page reload
+    if st.query_params.get("job"):
+        from ui.panels.output_panel import resume_processing_job
+
+        resume_processing_job()
+
     # Apply styling
     apply_custom_css()
 
@@ -52,6 +47,8 @@ def render_panels_based_on_state():
     if SessionStateManager.get("template_file") and SessionStateManager.get(
         "bulk_file"
     ):
+        from ui.panels.validate_panel import render_validation_panel
+
         # Trigger validation automatically
         if SessionStateManager.get("validation_state") == "pending":
             trigger_mock_validation()
@@ -60,6 +57,8 @@ def render_panels_based_on_state():
 
     # Show output panel if in processing or complete state
     if current_state in ["processing", "complete"]:
+        from ui.panels.output_panel import render_output_panel
+
         render_output_panel()
 
 
@@ -168,6 +167,7 @@ def render_debug_controls():
 
 def load_mock_data_from_provider(scenario_name: str = "valid"):
     """Load mock data from MockDataProvider"""
+    from state.mock_data import MockDataProvider, MockFile
 
     # Get scenario data
     scenarios = MockDataProvider.get_mock_scenarios()
@@ -216,6 +216,7 @@ def load_mock_data_from_provider(scenario_name: str = "valid"):
 
 def load_mock_output_files():
     """Load mock output files"""
+    from state.mock_data import MockDataProvider
 
     # Create mock output files
     working_file = MockDataProvider.create_mock_excel_file("working")
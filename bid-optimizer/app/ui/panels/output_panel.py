@@ -1,12 +1,23 @@
 # LOCKED - Phase A4 Complete
 import streamlit as st
 import time
-from ui.components.progress_bar import animate_progress
+from ui.components.progress_bar import (
+    animate_progress,
+    render_progress_bar,
+    render_stage_progress,
+    render_stage_timeline,
+    render_span_table,
+)
 from ui.components.download_buttons import (
+    is_working_file_building,
     render_download_buttons,
     render_reset_button,
     generate_filename,
 )
+from business.services.job_runner import get_job_runner, JobStatus
+from business.services.orchestrator import Orchestrator
+from state.session import SessionStateManager
+from utils.instrumentation import debug
 
 
 def render_output_panel():
@@ -34,71 +45,216 @@ def render_output_panel():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+# How often the processing and complete states rerun to poll their jobs
+JOB_POLL_INTERVAL_SECONDS = 0.5
+
+
+def generate_output_artifacts(
+    cleaned_df,
+    template_df,
+    selected_optimizations,
+    output_format: str = "xlsx",
+    changes_only: bool = False,
+    progress=None,
+    cancel_token=None,
+) -> dict:
+    """
+    Generate output files and move them into the artifact store
+
+    Runs as a background job - must not touch st.session_state.
+    Stage events are published to progress (a ProgressReporter);
+    cancel_token (a CancellationToken) stops the work at the next checkpoint.
+
+    Returns:
+        Dictionary with output_files (artifact IDs and filenames) and stats
+    """
+    from business.processors.file_generator import FileGenerator
+    from data.artifact_store import get_artifact_store
+    from utils.filename_generator import generate_output_filename
+
+    # Generate real files
+    generator = FileGenerator()
+    working_file, clean_file, stats = generator.generate_output_files(
+        cleaned_df,
+        selected_optimizations,
+        template_df,
+        output_format=output_format,
+        changes_only=changes_only,
+        defer_working=True,
+        progress=progress,
+        cancel_token=cancel_token,
+    )
+
+    # Move files into the artifact store - session state keeps only IDs.
+    # The Working file is built when requested, so only its sheets are
+    # kept (pickled) until then
+    store = get_artifact_store()
+    clean_filename = generate_output_filename("Clean", extension=clean_file.extension)
+    output_files = {
+        "working_sheets_artifact": store.put_object(
+            generator.deferred_working_sheets, "working_sheets.pkl"
+        ),
+        "clean_artifact": store.put_file(clean_file.path, clean_filename),
+        "clean_filename": clean_filename,
+        "clean_extension": clean_file.extension,
+        "clean_parts": len(stats.get("clean_parts", [])),
+    }
+
+    return {"output_files": output_files, "stats": stats}
+
+
+def resume_processing_job():
+    """
+    Reattach to a running job after a page reload
+
+    The job ID is kept in the URL (?job=...), so a refreshed page polls the
+    same job instead of starting the work again.
+    """
+    if st.session_state.get("processing_job_id"):
+        return
+
+    job_id = st.query_params.get("job")
+    if job_id and get_job_runner().get_job(job_id) is not None:
+        debug("[output_panel]: Resuming job %s", job_id)
+        st.session_state.processing_job_id = job_id
+        st.session_state.current_state = "processing"
+
+
 def render_processing_state():
-    """Render processing state with progress bar"""
+    """Render processing state - start a background job and poll it"""
 
-    # Check if we have real data to process
-    if st.session_state.get("cleaned_bulk_df") is not None:
-        # Real processing with actual data
+    job_id = st.session_state.get("processing_job_id")
+
+    # Real data: parsed files from the shared dataset cache (mock data keeps
+    # its cleaned DataFrame in session state)
+    cleaned_df = None
+    template_df = st.session_state.get("template_df")
+    if job_id is None:
         cleaned_df = st.session_state.get("cleaned_bulk_df")
+        if cleaned_df is None and st.session_state.get("dataset_key"):
+            dataset = SessionStateManager.get_dataset()
+            if dataset is None:
+                # Evicted under memory pressure - parse the uploads again
+                SessionStateManager.set_dataset(None)
+                st.session_state.processing_error = (
+                    "Parsed files were released to save memory - please process again"
+                )
+                st.session_state.validation_state = "pending"
+                st.session_state.current_state = "ready"
+                st.rerun()
+            cleaned_df = Orchestrator().combine_for_processing(
+                dataset["separated_dataframes"]
+            )
+            template_df = dataset["template_df"]
+
+    # Check if we have real data to process
+    if cleaned_df is not None:
         selected_optimizations = st.session_state.get(
             "selected_optimizations", ["Zero Sales"]
         )
 
-        print(f"DEBUG [output_panel]: Starting real processing")
-        print(f"DEBUG [output_panel]: Cleaned DF has {len(cleaned_df.columns)} columns")
-        print(f"DEBUG [output_panel]: Selected optimizations: {selected_optimizations}")
+        debug("[output_panel]: Starting real processing")
+        debug("[output_panel]: Cleaned DF has %d columns", len(cleaned_df.columns))
+        debug("[output_panel]: Selected optimizations: %s", selected_optimizations)
+
+        job_id = get_job_runner().submit(
+            generate_output_artifacts,
+            cleaned_df,
+            template_df,
+            selected_optimizations,
+            output_format=st.session_state.get("output_format", "xlsx"),
+            changes_only=st.session_state.get("changes_only", False),
+            name="Generate output files",
+            track_progress=True,
+            cancellable=True,
+        )
+        st.session_state.processing_job_id = job_id
+        st.query_params["job"] = job_id
 
-        # Import file generator
-        import sys
-        import os
+    if job_id is not None:
+        render_job_progress(job_id)
+        return
 
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        if project_root not in sys.path:
-            sys.path.insert(0, project_root)
+    # Fallback to mock data
+    debug("[output_panel]: Using mock data (no cleaned_bulk_df)")
+    # Show animated progress bar
+    progress_placeholder = animate_progress(duration=3.0)
 
-        from business.processors.file_generator import FileGenerator
-        from utils.filename_generator import generate_output_filename
+    st.session_state.processing_stats = {
+        "rows_processed": 1234,
+        "rows_modified": 456,
+        "calculation_errors": 7,
+        "high_bids": 3,
+        "low_bids": 2,
+    }
 
-        # Generate real files
-        generator = FileGenerator()
-        working_file, clean_file, stats = generator.generate_output_files(
-            cleaned_df, selected_optimizations, st.session_state.get("template_df")
-        )
+    # After processing, transition to complete state
+    st.session_state.current_state = "complete"
+    time.sleep(0.5)
+    st.rerun()
 
-        # Store files in session state
-        st.session_state.output_files = {
-            "working": working_file.getvalue(),
-            "clean": clean_file.getvalue(),
-            "working_filename": generate_output_filename("Working"),
-            "clean_filename": generate_output_filename("Clean"),
-        }
 
-        # Store stats
-        st.session_state.processing_stats = stats
+def render_job_progress(job_id: str):
+    """Poll a processing job and move to complete state once it finishes"""
 
-        print(f"DEBUG [output_panel]: Files generated successfully")
+    runner = get_job_runner()
+    status = runner.get_status(job_id)
+
+    if status is None:
+        # Job expired or the server restarted
+        finish_processing_job()
+        st.session_state.processing_error = (
+            "Processing job was lost - please process the files again"
+        )
+        st.session_state.current_state = "ready"
+        st.rerun()
+
+    if status["status"] == JobStatus.FAILED:
+        finish_processing_job()
+        runner.discard(job_id)
+        st.session_state.processing_error = f"Processing failed: {status['error']}"
+        st.session_state.current_state = "ready"
+        st.rerun()
+
+    if status["status"] == JobStatus.CANCELLED:
+        finish_processing_job()
+        runner.discard(job_id)
+        st.session_state.processing_error = "Processing cancelled"
+        st.session_state.current_state = "ready"
+        st.rerun()
+
+    if status["status"] == JobStatus.COMPLETED:
+        result = runner.get_result(job_id)
+        st.session_state.output_files = result["output_files"]
+        st.session_state.processing_stats = result["stats"]
+        finish_processing_job()
+        runner.discard(job_id)
+
+        debug("[output_panel]: Files generated successfully")
+        st.session_state.current_state = "complete"
+        st.rerun()
+
+    # Still running - show stage progress and poll again
+    if status.get("progress"):
+        render_stage_progress(status["progress"])
     else:
-        # Fallback to mock data
-        print(f"DEBUG [output_panel]: Using mock data (no cleaned_bulk_df)")
-        # Show animated progress bar
-        progress_placeholder = animate_progress(duration=3.0)
-
-        st.session_state.processing_stats = {
-            "rows_processed": 1234,
-            "rows_modified": 456,
-            "calculation_errors": 7,
-            "high_bids": 3,
-            "low_bids": 2,
-        }
+        render_progress_bar(0.0, f"Processing... {status['elapsed_seconds']:.0f}s")
 
-    # After processing, transition to complete state
-    st.session_state.current_state = "complete"
-    time.sleep(0.5)
+    # Cancelling only sets a flag - the job unwinds at its next checkpoint
+    if st.button("Cancel", key="cancel_processing_btn"):
+        runner.cancel(job_id)
+        st.info("Cancelling...")
+    time.sleep(JOB_POLL_INTERVAL_SECONDS)
     st.rerun()
 
 
+def finish_processing_job():
+    """Detach the session and URL from the processing job"""
+    st.session_state.pop("processing_job_id", None)
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+
 def render_complete_state():
     """Render complete state with download buttons"""
 
@@ -170,6 +326,11 @@ def render_complete_state():
     # Processing statistics
     render_statistics()
 
+    # Poll the Working file job once the whole page has rendered
+    if is_working_file_building():
+        time.sleep(JOB_POLL_INTERVAL_SECONDS)
+        st.rerun()
+
 
 def render_pink_notice(error_count: int):
     """Render pink notice box for calculation errors"""
@@ -234,3 +395,10 @@ def render_statistics():
 
     with col4:
         st.metric("Processing Time", "2.3 seconds")
+
+    # Where the time went, stage by stage
+    if stats.get("timeline"):
+        with st.expander("Stage timeline"):
+            render_stage_timeline(stats["timeline"])
+            if stats.get("spans"):
+                render_span_table(stats["spans"])
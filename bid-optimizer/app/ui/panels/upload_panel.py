@@ -1,12 +1,6 @@
-import streamlit as st
-import sys
-import os
+from functools import lru_cache
 
-# Add project root to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+import streamlit as st
 
 from ui.components.file_uploader import render_file_uploaders
 from ui.components.checklist import render_optimization_checklist
@@ -46,8 +40,7 @@ def render_upload_panel():
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         # Generate template file
-        generator = TemplateGenerator()
-        template_file = generator.create_empty_template()
+        template_file = get_empty_template()
 
         # Direct download button
         st.download_button(
@@ -94,3 +87,9 @@ def display_file_status():
             st.success(f"Bulk: {file.name} ({size_mb:.1f} MB)")
         else:
             st.info("Bulk: Not uploaded")
+
+
+@lru_cache(maxsize=1)
+def get_empty_template() -> bytes:
+    """Empty template file - the same bytes for every session and rerun"""
+    return TemplateGenerator().create_empty_template()
@@ -1,15 +1,4 @@
 import streamlit as st
-import sys
-import os
-
-# Add project root to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-panels_dir = os.path.dirname(current_dir)
-ui_dir = os.path.dirname(panels_dir)
-app_dir = os.path.dirname(ui_dir)
-project_root = os.path.dirname(app_dir)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
 
 from ui.components.alerts import (
     render_success_alert,
@@ -18,7 +7,16 @@ from ui.components.alerts import (
     render_warning_alert,
 )
 from ui.components.portfolio_list import render_portfolio_list
+from ui.components.download_buttons import render_output_format_selector
 from business.services import Orchestrator
+from data.dataset_cache import get_dataset_cache
+from state.session import SessionStateManager
+from utils.progress import ProgressReporter
+from utils.instrumentation import debug
+
+# Parsed DataFrames of a validation result - kept in the shared dataset
+# cache, not in session state
+DATASET_KEYS = ["template_df", "separated_dataframes"]
 
 
 def render_validation_panel():
@@ -77,31 +75,69 @@ def perform_real_validation():
         template_file = st.session_state.get("template_file")
         bulk_file = st.session_state.get("bulk_file")
 
-        print(f"DEBUG: Template file type: {type(template_file)}")
-        print(f"DEBUG: Bulk file type: {type(bulk_file)}")
-
-        # Reset file positions if needed
-        if hasattr(template_file, "seek"):
-            template_file.seek(0)
-        if hasattr(bulk_file, "seek"):
-            bulk_file.seek(0)
-
-        # Create orchestrator and validate
-        orchestrator = Orchestrator()
-        result = orchestrator.validate_files(template_file, bulk_file)
-
-        print(f"DEBUG: Validation result: {result.get('is_valid')}")
-        print(f"DEBUG: Errors: {result.get('errors')}")
-        print(f"DEBUG: Missing portfolios: {result.get('missing_portfolios')}")
-
-        # Store the result in session state
+        debug("[validate_panel]: Template file type: %s", type(template_file))
+        debug("[validate_panel]: Bulk file type: %s", type(bulk_file))
+
+        # Sessions validating the same files share one parsed copy
+        cache = get_dataset_cache()
+        session_id = SessionStateManager.get_session_id()
+        dataset_key = cache.make_key(
+            template_file.name,
+            _get_upload_bytes(template_file),
+            bulk_file.name,
+            _get_upload_bytes(bulk_file),
+        )
+        dataset = cache.get(dataset_key, session_id)
+
+        if dataset is not None:
+            debug("[validate_panel]: Reusing parsed files %s", dataset_key[:12])
+            result = dataset["validation"]
+        else:
+            # Reset file positions if needed
+            if hasattr(template_file, "seek"):
+                template_file.seek(0)
+            if hasattr(bulk_file, "seek"):
+                bulk_file.seek(0)
+
+            # Show each validation stage as it completes
+            progress_placeholder = st.empty()
+            progress = ProgressReporter(
+                [
+                    lambda event: progress_placeholder.progress(
+                        event["progress"],
+                        text=f"{event['stage']} ({event['total_elapsed_seconds']:.0f}s)",
+                    )
+                ]
+            )
+
+            # Create orchestrator and validate
+            orchestrator = Orchestrator()
+            full_result = orchestrator.validate_files(
+                template_file, bulk_file, progress
+            )
+            progress_placeholder.empty()
+
+            result = {
+                key: value
+                for key, value in full_result.items()
+                if key not in DATASET_KEYS
+            }
+            if full_result.get("separated_dataframes"):
+                # Store the validation summary with the DataFrames for later
+                # processing and for other sessions with the same files
+                dataset = {"validation": result}
+                dataset.update({key: full_result[key] for key in DATASET_KEYS})
+                result = cache.put(dataset_key, dataset, session_id)["validation"]
+
+        debug("[validate_panel]: Validation result: %s", result.get("is_valid"))
+        debug("[validate_panel]: Errors: %s", result.get("errors"))
+        debug(
+            "[validate_panel]: Missing portfolios: %s", result.get("missing_portfolios")
+        )
+
+        # Session state keeps the summary and the dataset key only
         st.session_state["validation_result"] = result
-
-        # Store separated dataframes and template for later processing
-        if result.get("separated_dataframes"):
-            st.session_state["separated_dataframes"] = result["separated_dataframes"]
-        if result.get("template_df") is not None:
-            st.session_state["template_df"] = result["template_df"]
+        SessionStateManager.set_dataset(dataset_key if dataset is not None else None)
 
         # Determine validation state
         if not result["is_valid"]:
@@ -134,6 +170,14 @@ def perform_real_validation():
     st.rerun()
 
 
+def _get_upload_bytes(file) -> bytes:
+    """Get the content of an uploaded file"""
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
 def render_valid_state():
     """Render when all portfolios are valid"""
 
@@ -153,6 +197,13 @@ def render_valid_state():
         with col3:
             st.metric("Total Bulk Rows", stats.get("bulk_rows", 0))
 
+    # Error from the last processing run
+    if st.session_state.get("processing_error"):
+        st.error(st.session_state.pop("processing_error"))
+
+    # Clean file format
+    render_output_format_selector()
+
     # Process button
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
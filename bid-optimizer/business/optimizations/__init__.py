@@ -1,27 +1,76 @@
 """
 Optimizations Package
 Contains all optimization implementations for Bid Optimizer
+
+Optimizations are registered by name and metadata; an implementation module
+is imported only when get_optimization() (or OPTIMIZATION_REGISTRY[name])
+first asks for it. Third-party packages add optimizations through the
+"bid_optimizer.optimizations" entry point group (see registry.py).
 """
 
-from .base import BaseOptimization
-from .zero_sales import ZeroSalesOptimization
+from typing import TYPE_CHECKING
+
+from .registry import (
+    ENTRY_POINT_GROUP,
+    OptimizationRegistry,
+    OptimizationSpec,
+)
+
+if TYPE_CHECKING:
+    from .base import BaseOptimization
 
 __all__ = [
     "BaseOptimization",
     "ZeroSalesOptimization",
+    "ENTRY_POINT_GROUP",
+    "OPTIMIZATION_REGISTRY",
+    "OptimizationRegistry",
+    "OptimizationSpec",
+    "get_optimization",
 ]
 
 # Registry of available optimizations
-OPTIMIZATION_REGISTRY = {
-    "Zero Sales": ZeroSalesOptimization,
-    # Future optimizations will be added here:
-    # "Portfolio Bid Optimization": PortfolioBidOptimization,
-    # "Budget Optimization": BudgetOptimization,
-    # etc.
+OPTIMIZATION_REGISTRY = OptimizationRegistry()
+
+OPTIMIZATION_REGISTRY.register(
+    OptimizationSpec(
+        "Zero Sales",
+        ".zero_sales:ZeroSalesOptimization",
+        description="Reduces bids for keywords and products with no unit sales",
+        required_columns=[
+            "Entity",
+            "Units",
+            "Portfolio Name (Informational only)",
+            "Campaign ID",
+            "Campaign Name (Informational only)",
+            "Bid",
+            "Clicks",
+            "Percentage",
+        ],
+    )
+)
+# Future optimizations will be registered here, e.g.:
+# OPTIMIZATION_REGISTRY.register(
+#     OptimizationSpec("Budget Optimization", ".budget:BudgetOptimization", ...)
+# )
+
+# Implementation classes, imported on first access
+_LAZY_CLASSES = {
+    "BaseOptimization": ".base",
+    "ZeroSalesOptimization": ".zero_sales",
 }
 
 
-def get_optimization(name: str) -> BaseOptimization:
+def __getattr__(name: str):
+    if name in _LAZY_CLASSES:
+        import importlib
+
+        module = importlib.import_module(_LAZY_CLASSES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_optimization(name: str) -> "BaseOptimization":
     """
     Factory function to get optimization instance by name
 
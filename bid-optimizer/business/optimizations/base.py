@@ -4,10 +4,16 @@ Abstract base class for all optimization implementations
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import pandas as pd
 from datetime import datetime
 
+from utils.cancellation import (
+    CancellationToken,
+    ProcessingCancelledError,
+    check_cancelled,
+)
+
 
 class BaseOptimization(ABC):
     """Abstract base class for all optimizations"""
@@ -17,6 +23,12 @@ class BaseOptimization(ABC):
     description: str = "Base optimization class"
     required_columns: List[str] = []
 
+    # Bulk column whose values partition the results, and the template
+    # columns a partition's rows depend on - set both, and implement
+    # apply_reoptimization, to support reoptimize()
+    partition_column: Optional[str] = None
+    template_columns: List[str] = []
+
     def __init__(self):
         """Initialize optimization"""
         self.stats = {
@@ -29,6 +41,7 @@ class BaseOptimization(ABC):
             "warning_messages": [],
         }
         self.pink_highlighted_rows = []
+        self.cancel_token: Optional[CancellationToken] = None
 
     @abstractmethod
     def validate_inputs(
@@ -64,7 +77,10 @@ class BaseOptimization(ABC):
         pass
 
     def optimize(
-        self, bulk_df: pd.DataFrame, template_df: pd.DataFrame
+        self,
+        bulk_df: pd.DataFrame,
+        template_df: pd.DataFrame,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
         """
         Main optimization method - orchestrates the process
@@ -72,10 +88,98 @@ class BaseOptimization(ABC):
         Args:
             bulk_df: Cleaned bulk DataFrame
             template_df: Template DataFrame
+            cancel_token: Token checked between steps and inside row loops
+                via check_cancelled() (optional)
+
+        Returns:
+            Tuple of (optimized_data, stats)
+
+        Raises:
+            ProcessingCancelledError: If cancel_token was cancelled
+        """
+        return self._run(
+            lambda: self.apply_optimization(bulk_df, template_df),
+            bulk_df,
+            template_df,
+            cancel_token,
+        )
+
+    @property
+    def supports_reoptimize(self) -> bool:
+        """Whether reoptimize() can patch an earlier result"""
+        return self.partition_column is not None
+
+    def apply_reoptimization(
+        self,
+        previous_sheets: Dict[str, pd.DataFrame],
+        template_df: pd.DataFrame,
+        partitions: Set[Any],
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Patch the sheets of an earlier run for a new template
+
+        Args:
+            previous_sheets: Sheets apply_optimization returned for the
+                same bulk and an earlier template
+            template_df: New template DataFrame
+            partitions: partition_column values whose template rows changed
+
+        Returns:
+            Dictionary with sheet names as keys and DataFrames as values,
+            equal to what apply_optimization returns for the new template
+        """
+        raise NotImplementedError(f"{self.name} does not support reoptimize")
+
+    def reoptimize(
+        self,
+        bulk_df: pd.DataFrame,
+        template_df: pd.DataFrame,
+        previous_sheets: Dict[str, pd.DataFrame],
+        partitions: Set[Any],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+        """
+        Re-run after the template changed for a few partitions only
+
+        Only rows of the changed partitions are recomputed; the result is
+        the same as optimize() with the new template.
+
+        Args:
+            bulk_df: Cleaned bulk DataFrame the previous sheets came from
+            template_df: New template DataFrame
+            previous_sheets: Sheets optimize() returned for an earlier
+                template
+            partitions: partition_column values whose template rows changed
+            cancel_token: Token checked between steps (optional)
 
         Returns:
             Tuple of (optimized_data, stats)
+
+        Raises:
+            NotImplementedError: If the optimization is not partitioned
+            ProcessingCancelledError: If cancel_token was cancelled
         """
+        if not self.supports_reoptimize:
+            raise NotImplementedError(f"{self.name} does not support reoptimize")
+
+        return self._run(
+            lambda: self.apply_reoptimization(previous_sheets, template_df, partitions),
+            bulk_df,
+            template_df,
+            cancel_token,
+        )
+
+    def _run(
+        self,
+        apply: Callable[[], Dict[str, pd.DataFrame]],
+        bulk_df: pd.DataFrame,
+        template_df: pd.DataFrame,
+        cancel_token: Optional[CancellationToken],
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+        """Validate, apply and time an optimization step (see optimize)"""
+        self.cancel_token = cancel_token
+        self.check_cancelled()
+
         self.stats["start_time"] = datetime.now()
         self.stats["rows_processed"] = len(bulk_df)
 
@@ -89,7 +193,7 @@ class BaseOptimization(ABC):
 
         # Apply optimization
         try:
-            optimized_sheets = self.apply_optimization(bulk_df, template_df)
+            optimized_sheets = apply()
 
             # Ensure all sheets have Operation = "Update"
             for sheet_name, df in optimized_sheets.items():
@@ -103,12 +207,23 @@ class BaseOptimization(ABC):
 
             return optimized_sheets, self.stats
 
+        except ProcessingCancelledError:
+            raise
         except Exception as e:
             self.stats["error_messages"].append(f"Optimization failed: {str(e)}")
             self.stats["end_time"] = datetime.now()
             # Return original data on error
             return {"Clean": bulk_df.copy()}, self.stats
 
+    def check_cancelled(self):
+        """
+        Checkpoint for subclasses - stop if the run was cancelled
+
+        Raises:
+            ProcessingCancelledError: If the cancel token was cancelled
+        """
+        check_cancelled(self.cancel_token)
+
     def check_bid_limits(
         self, df: pd.DataFrame, bid_column: str = "Bid"
     ) -> Tuple[int, int, int]:
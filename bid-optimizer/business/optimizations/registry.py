@@ -0,0 +1,230 @@
+"""
+Optimization Registry
+Knows every optimization by name and metadata, and imports an
+implementation only when it is first requested
+"""
+
+import importlib
+import threading
+from collections.abc import Mapping
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from utils.instrumentation import debug
+
+# Entry point group third-party packages register optimizations under, e.g.
+# in pyproject.toml:
+#
+#     [project.entry-points."bid_optimizer.optimizations"]
+#     "Budget Optimization" = "acme_bids.budget:BudgetOptimization"
+ENTRY_POINT_GROUP = "bid_optimizer.optimizations"
+
+
+class OptimizationSpec:
+    """Name and metadata of an optimization, and where to import it from"""
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        description: str = "",
+        required_columns: Optional[List[str]] = None,
+        entry_point: Any = None,
+    ):
+        """
+        Initialize spec
+
+        Args:
+            name: Optimization name shown to users
+            target: "module:ClassName" of the BaseOptimization subclass
+                (modules starting with "." are relative to
+                business.optimizations)
+            description: One-line description
+            required_columns: Bulk columns the optimization needs
+            entry_point: Plugin entry point to load instead of target
+        """
+        self.name = name
+        self.target = target
+        self.description = description
+        self.required_columns = list(required_columns or [])
+        self.entry_point = entry_point
+        self._cls = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the implementation has been imported"""
+        return self._cls is not None
+
+    @property
+    def is_plugin(self) -> bool:
+        """Whether the optimization comes from an entry point"""
+        return self.entry_point is not None
+
+    def load(self) -> Type:
+        """
+        Import the implementation
+
+        Plugin specs take their description and required columns from the
+        class once loaded.
+
+        Returns:
+            The BaseOptimization subclass
+
+        Raises:
+            ImportError: If the module or class cannot be imported
+            TypeError: If the target is not a BaseOptimization subclass
+        """
+        if self._cls is not None:
+            return self._cls
+
+        from business.optimizations.base import BaseOptimization
+
+        if self.entry_point is not None:
+            cls = self.entry_point.load()
+        else:
+            module_name, _, class_name = self.target.partition(":")
+            module = importlib.import_module(module_name, __package__)
+            try:
+                cls = getattr(module, class_name)
+            except AttributeError as e:
+                raise ImportError(
+                    f"{module.__name__} has no optimization {class_name!r}"
+                ) from e
+
+        if not (isinstance(cls, type) and issubclass(cls, BaseOptimization)):
+            raise TypeError(
+                f"Optimization {self.name!r} ({self.target}) is not a "
+                "BaseOptimization subclass"
+            )
+
+        if self.is_plugin:
+            self.description = self.description or cls.description
+            self.required_columns = self.required_columns or list(cls.required_columns)
+
+        debug("OptimizationRegistry: Loaded %s from %s", self.name, self.target)
+        self._cls = cls
+        return cls
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get the metadata
+
+        Returns:
+            Dictionary with name, description, required_columns, target,
+            plugin and loaded
+        """
+        return {
+            "name": self.name,
+            "description": self.description,
+            "required_columns": list(self.required_columns),
+            "target": self.target,
+            "plugin": self.is_plugin,
+            "loaded": self.is_loaded,
+        }
+
+
+class OptimizationRegistry(Mapping):
+    """
+    Registry of available optimizations
+
+    A read-only mapping of name -> optimization class. Listing names,
+    membership tests and metadata never import an implementation; looking
+    a name up does, once. Plugins from the ENTRY_POINT_GROUP entry point
+    group are discovered on first use - their metadata is known after
+    they are loaded. Built-in optimizations win over plugins of the same
+    name.
+    """
+
+    def __init__(self, entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        """
+        Initialize registry
+
+        Args:
+            entry_point_group: Entry point group to discover plugins in
+                (None to disable plugins)
+        """
+        self.entry_point_group = entry_point_group
+        self._specs: Dict[str, OptimizationSpec] = {}
+        self._discovered = entry_point_group is None
+        self._lock = threading.Lock()
+
+    def register(self, spec: OptimizationSpec):
+        """
+        Add an optimization
+
+        Args:
+            spec: Optimization spec
+
+        Raises:
+            ValueError: If the name is already registered
+        """
+        with self._lock:
+            if spec.name in self._specs:
+                raise ValueError(f"Optimization already registered: {spec.name}")
+            self._specs[spec.name] = spec
+
+    def get_spec(self, name: str) -> OptimizationSpec:
+        """
+        Get the spec of an optimization without importing it
+
+        Args:
+            name: Name of the optimization
+
+        Returns:
+            The optimization's spec
+
+        Raises:
+            ValueError: If optimization name not found
+        """
+        spec = self._get_specs().get(name)
+        if spec is None:
+            raise ValueError(f"Unknown optimization: {name}")
+        return spec
+
+    def get_info(self) -> List[Dict[str, Any]]:
+        """
+        Get the metadata of all optimizations, without importing them
+
+        Returns:
+            List of spec dictionaries (see OptimizationSpec.get_info)
+        """
+        return [spec.get_info() for spec in self._get_specs().values()]
+
+    def __getitem__(self, name: str) -> Type:
+        spec = self._get_specs().get(name)
+        if spec is None:
+            raise KeyError(name)
+        with self._lock:
+            return spec.load()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._get_specs()))
+
+    def __len__(self) -> int:
+        return len(self._get_specs())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._get_specs()
+
+    def _get_specs(self) -> Dict[str, OptimizationSpec]:
+        """Specs by name, with plugins discovered on first call"""
+        if not self._discovered:
+            with self._lock:
+                if not self._discovered:
+                    self._discover_plugins()
+                    self._discovered = True
+        return self._specs
+
+    def _discover_plugins(self):
+        """Add the entry point plugins - reads metadata, imports nothing"""
+        for entry_point in entry_points(group=self.entry_point_group):
+            if entry_point.name in self._specs:
+                debug(
+                    "OptimizationRegistry: Plugin %s (%s) shadowed by a built-in",
+                    entry_point.name,
+                    entry_point.value,
+                )
+                continue
+            self._specs[entry_point.name] = OptimizationSpec(
+                entry_point.name, entry_point.value, entry_point=entry_point
+            )
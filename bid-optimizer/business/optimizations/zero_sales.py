@@ -5,8 +5,9 @@ Reduces bids for keywords/products with no sales (Units = 0)
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Set, Tuple, Any, Optional
 from .base import BaseOptimization
+from utils.instrumentation import debug, is_debug_enabled, span
 
 
 class ZeroSalesOptimization(BaseOptimization):
@@ -25,6 +26,10 @@ class ZeroSalesOptimization(BaseOptimization):
         "Percentage",
     ]
 
+    # Template edits are re-run per portfolio (see apply_reoptimization)
+    partition_column = "Portfolio Name (Informational only)"
+    template_columns = ["Base Bid", "Target CPA"]
+
     # Flat portfolio patterns to exclude
     FLAT_PORTFOLIOS = [
         "Flat 30",
@@ -63,17 +68,26 @@ class ZeroSalesOptimization(BaseOptimization):
     ) -> Dict[str, pd.DataFrame]:
         """Apply Zero Sales optimization logic"""
 
-        print(f"DEBUG: Starting with {len(bulk_df)} total rows")
-        print(
-            f"DEBUG: Unique Entity values: {bulk_df['Entity'].unique() if 'Entity' in bulk_df.columns else 'No Entity column'}"
-        )
+        debug("ZeroSales: Starting with %d total rows", len(bulk_df))
+        if is_debug_enabled():
+            debug(
+                "ZeroSales: Unique Entity values: %s",
+                (
+                    bulk_df["Entity"].unique()
+                    if "Entity" in bulk_df.columns
+                    else "No Entity column"
+                ),
+            )
 
         # Step 1: Separate Bidding Adjustment FIRST (ALL of them, not filtered)
-        bidding_adj_df = bulk_df[bulk_df["Entity"] == "Bidding Adjustment"].copy()
-        main_data_df = bulk_df[bulk_df["Entity"] != "Bidding Adjustment"].copy()
+        with span("Separate Bidding Adjustment", len(bulk_df)) as step:
+            is_bidding_adj = bulk_df["Entity"] == "Bidding Adjustment"
+            bidding_adj_df = bulk_df[is_bidding_adj].copy()
+            main_data_df = bulk_df[~is_bidding_adj].copy()
+            step["rows_out"] = len(main_data_df)
 
-        print(f"DEBUG: Found {len(bidding_adj_df)} Bidding Adjustment rows")
-        print(f"DEBUG: Found {len(main_data_df)} non-Bidding Adjustment rows")
+        debug("ZeroSales: Found %d Bidding Adjustment rows", len(bidding_adj_df))
+        debug("ZeroSales: Found %d non-Bidding Adjustment rows", len(main_data_df))
 
         # Check if Bidding Adjustment rows exist
         if len(bidding_adj_df) == 0:
@@ -81,10 +95,14 @@ class ZeroSalesOptimization(BaseOptimization):
                 "Note: No Bidding Adjustment rows found"
             )
 
+        self.check_cancelled()
+
         # Step 2: Filter main data - Units = 0 and not Flat portfolio
-        filtered_df = self._filter_data(main_data_df)
+        with span("Filter", len(main_data_df)) as step:
+            filtered_df = self._filter_data(main_data_df)
+            step["rows_out"] = len(filtered_df)
 
-        print(f"DEBUG: After filtering Units=0: {len(filtered_df)} rows")
+        debug("ZeroSales: After filtering Units=0: %d rows", len(filtered_df))
 
         if len(filtered_df) == 0:
             self.stats["warning_messages"].append(
@@ -97,33 +115,42 @@ class ZeroSalesOptimization(BaseOptimization):
             return result
 
         # Step 3: Add helper columns (only to filtered main sheet)
-        print(f"DEBUG: Total columns before helper: {len(filtered_df.columns)}")
-        print(f"DEBUG: Bid column exists: {'Bid' in filtered_df.columns}")
-        filtered_df = self._add_helper_columns(filtered_df, bidding_adj_df, template_df)
-        print(f"DEBUG: Total columns after helper: {len(filtered_df.columns)}")
+        debug("ZeroSales: Total columns before helper: %d", len(filtered_df.columns))
+        debug("ZeroSales: Bid column exists: %s", "Bid" in filtered_df.columns)
+        with span("Helper columns", len(filtered_df)):
+            filtered_df = self._add_helper_columns(
+                filtered_df, bidding_adj_df, template_df
+            )
+        debug("ZeroSales: Total columns after helper: %d", len(filtered_df.columns))
 
         # Check for helper columns
-        helper_cols = [
-            "Max BA",
-            "Base Bid",
-            "Target CPA",
-            "Adj. CPA",
-            "Old Bid",
-            "calc1",
-            "calc2",
-        ]
-        for col in helper_cols:
-            if col in filtered_df.columns:
-                print(f"DEBUG: Helper column '{col}' added successfully")
-                # Show sample values
-                sample_values = filtered_df[col].head(3).tolist()
-                print(f"  Sample values: {sample_values}")
+        if is_debug_enabled():
+            helper_cols = [
+                "Max BA",
+                "Base Bid",
+                "Target CPA",
+                "Adj. CPA",
+                "Old Bid",
+                "calc1",
+                "calc2",
+            ]
+            for col in helper_cols:
+                if col in filtered_df.columns:
+                    # Show sample values
+                    debug(
+                        "ZeroSales: Helper column '%s' added, sample values: %s",
+                        col,
+                        filtered_df[col].head(3).tolist(),
+                    )
+
+        self.check_cancelled()
 
         # Step 4: Calculate new bids
-        filtered_df = self._calculate_bids(filtered_df)
+        with span("Calculate bids", len(filtered_df)):
+            filtered_df = self._calculate_bids(filtered_df)
 
-        # Step 5: Check bid limits and highlight errors
-        below, above, errors = self.check_bid_limits(filtered_df)
+            # Step 5: Check bid limits and highlight errors
+            below, above, errors = self.check_bid_limits(filtered_df)
         if below > 0 or above > 0 or errors > 0:
             self.bid_check_results = (below, above, errors)
             self.stats["warning_messages"].append(
@@ -147,12 +174,96 @@ class ZeroSalesOptimization(BaseOptimization):
 
         # Add Bidding Adjustment sheet if it has data
         if len(bidding_adj_df) > 0:
-            print(
-                f"DEBUG: Adding Bidding Adjustment sheet with {len(bidding_adj_df)} rows"
+            debug(
+                "ZeroSales: Adding Bidding Adjustment sheet with %d rows",
+                len(bidding_adj_df),
             )
             result["Bidding Adjustment Zero Sales"] = bidding_adj_df
 
-        print(f"DEBUG: Returning {len(result)} sheets: {list(result.keys())}")
+        debug("ZeroSales: Returning %d sheets: %s", len(result), list(result))
+
+        return result
+
+    def apply_reoptimization(
+        self,
+        previous_sheets: Dict[str, pd.DataFrame],
+        template_df: pd.DataFrame,
+        partitions: Set[Any],
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Recompute the template-driven columns for the changed portfolios
+
+        Filtering and Max BA do not depend on the template, so the previous
+        Working sheet already holds the right rows; only Base Bid, Target
+        CPA, Adj. CPA and calc2 of the changed portfolios' rows are looked
+        up again, and Bid follows from them.
+        """
+        if "Bidding Adjustment Zero Sales" not in previous_sheets:
+            self.stats["warning_messages"].append(
+                "Note: No Bidding Adjustment rows found"
+            )
+
+        if "Working Zero Sales" not in previous_sheets:
+            # No Units=0 rows - nothing depends on the template
+            self.stats["warning_messages"].append(
+                "No rows found with Units=0 after filtering"
+            )
+            return {name: df.copy() for name, df in previous_sheets.items()}
+
+        working_df = previous_sheets["Working Zero Sales"].copy()
+        portfolio_col = self.partition_column
+        if portfolio_col in working_df.columns:
+            changed = working_df[portfolio_col].isin(partitions).to_numpy()
+        else:
+            changed = np.zeros(len(working_df), dtype=bool)
+
+        debug(
+            "ZeroSales: Re-running %d rows of %d changed portfolios",
+            changed.sum(),
+            len(partitions),
+        )
+
+        with span("Patch template columns", int(changed.sum())):
+            if changed.any():
+                new_values = self._get_template_values(
+                    working_df.loc[changed, portfolio_col],
+                    working_df.loc[changed, "Max BA"].tolist(),
+                    template_df,
+                )
+                for column, values in zip(
+                    ["Base Bid", "Target CPA", "Adj. CPA"], new_values
+                ):
+                    column_values = np.array(working_df[column].tolist(), dtype=object)
+                    column_values[changed] = np.array(values, dtype=object)
+                    # Missing as None, like a fresh lookup
+                    working_df[column] = [
+                        None if pd.isna(value) else value for value in column_values
+                    ]
+                working_df["calc2"] = working_df["Base Bid"].tolist()
+
+        self.check_cancelled()
+
+        with span("Calculate bids", len(working_df)):
+            working_df = self._calculate_bids(working_df)
+            working_df = working_df.drop(columns="Bid_Status", errors="ignore")
+            below, above, errors = self.check_bid_limits(working_df)
+        if below > 0 or above > 0 or errors > 0:
+            self.bid_check_results = (below, above, errors)
+            self.stats["warning_messages"].append(
+                f"{below} rows below 0.02, {above} rows above 1.25, "
+                f"{errors} rows with calculation errors"
+            )
+
+        self.stats["rows_modified"] = len(working_df)
+
+        result = {
+            "Clean Zero Sales": working_df.copy(),
+            "Working Zero Sales": working_df,
+        }
+        if "Bidding Adjustment Zero Sales" in previous_sheets:
+            result["Bidding Adjustment Zero Sales"] = previous_sheets[
+                "Bidding Adjustment Zero Sales"
+            ].copy()
 
         return result
 
@@ -165,7 +276,7 @@ class ZeroSalesOptimization(BaseOptimization):
         filtered = df[df["Units"] == 0].copy()
 
         # Exclude Flat portfolios
-        portfolio_col = "Portfolio Name (Informational only)"
+        portfolio_col = self.partition_column
         if portfolio_col in filtered.columns:
             filtered = filtered[~filtered[portfolio_col].isin(self.FLAT_PORTFOLIOS)]
 
@@ -192,7 +303,7 @@ class ZeroSalesOptimization(BaseOptimization):
 
         # Find the position of Bid column
         if "Bid" not in df_copy.columns:
-            print("ERROR: Bid column not found!")
+            debug("ZeroSales: Bid column not found, helper columns not added")
             return df_copy
 
         bid_column_index = df_copy.columns.get_loc("Bid")
@@ -203,35 +314,19 @@ class ZeroSalesOptimization(BaseOptimization):
         # Calculate Max BA for each Campaign ID
         max_ba_values = self._calculate_max_ba(df_copy, bidding_adj_df)
 
-        # Get Base Bid and Target CPA from template
-        base_bid_values = []
-        target_cpa_values = []
-
-        portfolio_col = "Portfolio Name (Informational only)"
-        for _, row in df_copy.iterrows():
-            portfolio = row.get(portfolio_col, "")
-            base_bid = self.get_portfolio_value(
-                portfolio, template_df, "Base Bid", default=0.02
-            )
-            target_cpa = self.get_portfolio_value(
-                portfolio, template_df, "Target CPA", default=None
-            )
-
-            # Handle "Ignore" values
-            if isinstance(base_bid, str) and base_bid.lower() == "ignore":
-                base_bid = 0.02
+        self.check_cancelled()
 
-            base_bid_values.append(base_bid)
-            target_cpa_values.append(target_cpa)
+        # Get Base Bid and Target CPA from template - looked up once per
+        # portfolio, not once per row
+        portfolio_col = self.partition_column
+        if portfolio_col in df_copy.columns:
+            portfolios = df_copy[portfolio_col]
+        else:
+            portfolios = pd.Series("", index=df_copy.index)
 
-        # Calculate derived columns
-        adj_cpa_values = []
-        for i in range(len(df_copy)):
-            if pd.notna(target_cpa_values[i]):
-                adj_cpa = target_cpa_values[i] * (1 + max_ba_values[i] / 100)
-            else:
-                adj_cpa = None
-            adj_cpa_values.append(adj_cpa)
+        base_bid_values, target_cpa_values, adj_cpa_values = self._get_template_values(
+            portfolios, max_ba_values, template_df
+        )
 
         # Calculate calc1 and calc2
         calc1_values = old_bid_values * 0.75  # 25% reduction
@@ -250,6 +345,50 @@ class ZeroSalesOptimization(BaseOptimization):
 
         return df_copy
 
+    def _get_template_values(
+        self, portfolios: pd.Series, max_ba_values: list, template_df: pd.DataFrame
+    ) -> Tuple[list, list, list]:
+        """
+        Look up the template-driven helper columns
+
+        Args:
+            portfolios: Portfolio name of each row
+            max_ba_values: Max BA of each row
+            template_df: Template DataFrame
+
+        Returns:
+            Tuple of (Base Bid, Target CPA, Adj. CPA) lists aligned with
+            portfolios
+        """
+
+        def get_base_bid(portfolio):
+            base_bid = self.get_portfolio_value(
+                portfolio, template_df, "Base Bid", default=0.02
+            )
+            # Handle "Ignore" values
+            if isinstance(base_bid, str) and base_bid.lower() == "ignore":
+                base_bid = 0.02
+            return base_bid
+
+        base_bid_values = self._map_distinct(portfolios, get_base_bid)
+        target_cpa_values = self._map_distinct(
+            portfolios,
+            lambda portfolio: self.get_portfolio_value(
+                portfolio, template_df, "Target CPA", default=None
+            ),
+        )
+
+        # Calculate derived columns
+        target_cpa_array = np.array(target_cpa_values, dtype=object)
+        max_ba_array = np.array(max_ba_values, dtype=object)
+        has_target_cpa = pd.notna(target_cpa_array)
+        adj_cpa_array = np.full(len(portfolios), None, dtype=object)
+        adj_cpa_array[has_target_cpa] = target_cpa_array[has_target_cpa] * (
+            1 + max_ba_array[has_target_cpa] / 100
+        )
+
+        return base_bid_values, target_cpa_values, adj_cpa_array.tolist()
+
     def _calculate_max_ba(
         self, main_df: pd.DataFrame, bidding_adj_df: pd.DataFrame
     ) -> List[float]:
@@ -258,8 +397,6 @@ class ZeroSalesOptimization(BaseOptimization):
 
         Returns list of Max BA values aligned with main_df rows
         """
-        max_ba_values = []
-
         if len(bidding_adj_df) == 0:
             # No Bidding Adjustments, return 0 for all
             return [0.0] * len(main_df)
@@ -268,12 +405,34 @@ class ZeroSalesOptimization(BaseOptimization):
         ba_max = bidding_adj_df.groupby("Campaign ID")["Percentage"].max().to_dict()
 
         # Map to main dataframe
-        for _, row in main_df.iterrows():
-            campaign_id = row.get("Campaign ID")
-            max_ba = ba_max.get(campaign_id, 0)
-            max_ba_values.append(max_ba)
+        if "Campaign ID" not in main_df.columns:
+            return [0] * len(main_df)
+
+        return self._map_distinct(
+            main_df["Campaign ID"], lambda campaign_id: ba_max.get(campaign_id, 0)
+        )
+
+    def _map_distinct(self, values: pd.Series, lookup: Callable[[Any], Any]) -> list:
+        """
+        Apply a lookup once per distinct value and spread the results to rows
+
+        Args:
+            values: Column to map
+            lookup: Function from a value to its result (missing values are
+                looked up as NaN)
+
+        Returns:
+            List of results aligned with values
+        """
+        codes, uniques = pd.factorize(values)
+
+        # Last slot holds the result for missing values (code -1)
+        mapped = np.empty(len(uniques) + 1, dtype=object)
+        for i, value in enumerate(uniques):
+            mapped[i] = lookup(value)
+        mapped[-1] = lookup(np.nan)
 
-        return max_ba_values
+        return mapped[codes].tolist()
 
     def _calculate_bids(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -1,9 +1,19 @@
 """
 Processors Package
 Export all processors for easy import
+
+FileGenerator is imported on first access - it pulls in the output writers
+(openpyxl) and the optimizations, which validation does not need.
 """
 
 from .bulk_cleaner import BulkCleaner
-from .file_generator import FileGenerator
 
 __all__ = ["BulkCleaner", "FileGenerator"]
+
+
+def __getattr__(name: str):
+    if name == "FileGenerator":
+        from .file_generator import FileGenerator
+
+        return FileGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,6 +6,8 @@ Bulk Cleaner - Cleans and filters Bulk data according to business rules
 import pandas as pd
 from typing import Dict, Any, List, Optional, Tuple
 
+from utils.cancellation import CancellationToken, check_cancelled
+
 
 class BulkCleaner:
     """Cleans and filters Bulk file data"""
@@ -27,7 +29,9 @@ class BulkCleaner:
         self.removed_reasons = {}
         self.separated_dataframes = {}
 
-    def clean_bulk(self, df: pd.DataFrame) -> pd.DataFrame:
+    def clean_bulk(
+        self, df: pd.DataFrame, cancel_token: Optional[CancellationToken] = None
+    ) -> pd.DataFrame:
         """
         Clean Bulk DataFrame and separate into different entity types
 
@@ -38,10 +42,13 @@ class BulkCleaner:
 
         Args:
             df: Raw Bulk DataFrame
+            cancel_token: Checked between cleaning steps (optional)
 
         Returns:
             Cleaned DataFrame (Targets only) for portfolio validation
         """
+        check_cancelled(cancel_token)
+
         # Track original count
         original_count = len(df)
         self.cleaning_stats = {"original_rows": original_count}
@@ -59,6 +66,8 @@ class BulkCleaner:
                 self.removed_reasons["invalid_entity"] = removed
                 self.cleaning_stats["after_entity_filter"] = len(filtered_df)
 
+        check_cancelled(cancel_token)
+
         # Step 2: Separate into 3 DataFrames
         targets_df = filtered_df[
             filtered_df["Entity"].isin(["Keyword", "Product Targeting"])
@@ -75,6 +84,8 @@ class BulkCleaner:
         self.cleaning_stats["product_ads_before_state_filter"] = len(product_ads_df)
         self.cleaning_stats["bidding_adjustments_count"] = len(bidding_adjustments_df)
 
+        check_cancelled(cancel_token)
+
         # Step 3: Apply State filters ONLY to Targets and Product Ads
         # NOT to Bidding Adjustments
 
@@ -84,6 +95,8 @@ class BulkCleaner:
         else:
             targets_cleaned = targets_df
 
+        check_cancelled(cancel_token)
+
         # Clean Product Ads
         if len(product_ads_df) > 0:
             product_ads_cleaned = self._apply_state_filters(
@@ -3,44 +3,74 @@ File Generator
 Generates Working and Clean output files from processed data
 """
 
+import sqlite3
+
 import pandas as pd
-from io import BytesIO
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-import sys
-import os
-
-# Add project root to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-processors_dir = os.path.dirname(current_dir)
-business_dir = os.path.dirname(processors_dir)
-project_root = os.path.dirname(business_dir)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
 
+from data.bid_history import BidHistoryStore, get_bid_history
+from data.result_cache import (
+    ResultCache,
+    get_code_version,
+    get_result_cache,
+    hash_dataframe,
+)
 from data.writers.output_writer import OutputWriter
+from data.writers.writer_scheduler import WriterScheduler, OutputFileHandle
 from utils.filename_generator import (
     generate_output_filename,
     get_sheet_name,
     get_file_size_display,
 )
-from business.optimizations import get_optimization
+from business.optimizations import OPTIMIZATION_REGISTRY, get_optimization
+from business.processors.template_index import TemplateIndex
+from utils.progress import ProgressReporter
+from utils.instrumentation import debug
+from utils.cancellation import (
+    CancellationToken,
+    ProcessingCancelledError,
+    check_cancelled,
+)
 
 
 class FileGenerator:
     """Generates output files from optimized data"""
 
-    def __init__(self):
-        """Initialize file generator"""
+    def __init__(
+        self,
+        result_cache: Optional[ResultCache] = None,
+        bid_history: Optional[BidHistoryStore] = None,
+    ):
+        """
+        Initialize file generator
+
+        Args:
+            result_cache: Cache of earlier results (default: the shared
+                on-disk result cache)
+            bid_history: Store every run's bids are appended to (default:
+                the shared local bid history)
+        """
         self.output_writer = OutputWriter()
+        self.writer_scheduler = WriterScheduler()
+        self.result_cache = result_cache or get_result_cache()
+        self.bid_history = bid_history or get_bid_history()
         self.generation_stats = {}
+        self.deferred_working_sheets = None
 
     def generate_output_files(
         self,
         cleaned_bulk_df: pd.DataFrame,
         selected_optimizations: List[str],
         template_df: Optional[pd.DataFrame] = None,
-    ) -> Tuple[BytesIO, BytesIO, Dict[str, Any]]:
+        output_format: str = OutputWriter.XLSX_FORMAT,
+        changes_only: bool = False,
+        max_rows_per_file: Optional[int] = None,
+        max_bytes_per_file: Optional[int] = None,
+        defer_working: bool = False,
+        progress: Optional[ProgressReporter] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Tuple[Optional[OutputFileHandle], OutputFileHandle, Dict[str, Any]]:
         """
         Generate both Working and Clean files
 
@@ -48,92 +78,245 @@ class FileGenerator:
             cleaned_bulk_df: Cleaned Bulk DataFrame
             selected_optimizations: List of optimization names to apply
             template_df: Template DataFrame (optional, for future optimizations)
+            output_format: Clean file format - 'xlsx' or 'csv' (bulk-upload
+                CSV, zipped with one CSV per sheet when there are several)
+            changes_only: Keep only rows whose Bid differs from Old Bid in the
+                Clean file (the Working file always keeps every row)
+            max_rows_per_file: Row budget per Clean upload file
+                (default: OutputWriter.MAX_ROWS_PER_PART)
+            max_bytes_per_file: Byte budget per Clean upload file
+                (default: OutputWriter.MAX_BYTES_PER_PART)
+            defer_working: Only write the Clean file now; the Working sheets
+                are kept in deferred_working_sheets for build_working_file()
+            progress: Reporter for stage events - one stage per optimization
+                plus one for writing (optional)
+            cancel_token: Checked between stages and passed to the
+                optimizations and writers (optional)
 
         Returns:
             Tuple of (working_file, clean_file, stats)
+            Files are OutputFileHandle objects backed by temp files;
+            call cleanup() on them once their contents are consumed.
+            When a Clean sheet exceeds the budget, clean_file is a zip
+            bundle of size-bounded part files. working_file is None when
+            defer_working is set. A repeat of an earlier run returns that
+            run's files from the result cache (stats["cached"] is True);
+            a run on the same bulk with an edited template only re-runs
+            the portfolios whose template rows changed
+            (stats["incremental"] is True). Every run, cached or not, is
+            appended to the bid history (stats["history_rows"]).
+
+        Raises:
+            ProcessingCancelledError: If cancel_token was cancelled; no
+                temp files are left behind
         """
+        if output_format not in OutputWriter.OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        progress = progress or ProgressReporter()
+        cache_key, partition_key = self._get_cache_keys(
+            cleaned_bulk_df,
+            selected_optimizations,
+            template_df,
+            output_format=output_format,
+            changes_only=changes_only,
+            max_rows_per_file=max_rows_per_file,
+            max_bytes_per_file=max_bytes_per_file,
+            defer_working=defer_working,
+        )
+        if cache_key is not None:
+            cached = self._load_cached_result(cache_key, cleaned_bulk_df, progress)
+            if cached is not None:
+                return cached
+
+        # Same bulk, edited template - patch the previous run's sheets
+        previous = self._load_partitions(partition_key, template_df)
+        partition_sheets = {}
+
         # Reset stats
         self.generation_stats = {
             "start_time": datetime.now(),
+            "cached": False,
             "selected_optimizations": selected_optimizations,
+            "output_format": output_format,
+            "changes_only": changes_only,
             "input_rows": len(cleaned_bulk_df),
             "sheets_created": 0,
+            "suppressed_rows": 0,
+            "suppressed_rows_by_sheet": {},
+            "clean_parts": [],
+            "history_rows": 0,
+            "working_deferred": defer_working,
+            "incremental": previous is not None,
+            "changed_partitions": (
+                None
+                if previous is None
+                else sum(len(changed) for changed in previous["changed"].values())
+            ),
             "errors": [],
             "warnings": [],
         }
 
-        # Collect all sheets from all optimizations
-        all_working_sheets = {}
-        all_clean_sheets = {}
-
-        for optimization_name in selected_optimizations:
-            try:
-                # Get the optimization instance
-                optimization = get_optimization(optimization_name)
-
-                # Apply the optimization
-                optimized_sheets, stats = optimization.optimize(
-                    cleaned_bulk_df, template_df
-                )
+        progress.plan(len(selected_optimizations) + 1)
+
+        # Root span - stages and optimization sub-steps nest under it
+        with progress.instrumentation.span(
+            "Generate output files", len(cleaned_bulk_df)
+        ) as root_span:
+            # Collect all sheets from all optimizations
+            all_working_sheets = {}
+            all_clean_sheets = {}
+
+            for optimization_name in selected_optimizations:
+                check_cancelled(cancel_token)
+                stage = progress.start_stage(optimization_name, len(cleaned_bulk_df))
+                try:
+                    # Get the optimization instance
+                    optimization = get_optimization(optimization_name)
+
+                    # Apply the optimization - or re-run the changed
+                    # partitions of the previous result
+                    if previous is not None:
+                        optimized_sheets, stats = optimization.reoptimize(
+                            cleaned_bulk_df,
+                            template_df,
+                            previous["sheets"][optimization_name],
+                            previous["changed"][optimization_name],
+                            cancel_token=cancel_token,
+                        )
+                    else:
+                        optimized_sheets, stats = optimization.optimize(
+                            cleaned_bulk_df, template_df, cancel_token=cancel_token
+                        )
+                    partition_sheets[optimization_name] = optimized_sheets
 
-                print(
-                    f"DEBUG FileGen: Optimization {optimization_name} returned {len(optimized_sheets)} sheets"
-                )
-                print(f"DEBUG FileGen: Sheet names: {list(optimized_sheets.keys())}")
-
-                # Add stats to generation stats
-                if stats.get("warning_messages"):
-                    self.generation_stats["warnings"].extend(stats["warning_messages"])
-                if stats.get("error_messages"):
-                    self.generation_stats["errors"].extend(stats["error_messages"])
-
-                # Process returned sheets
-                for sheet_name, df in optimized_sheets.items():
-                    print(
-                        f"DEBUG FileGen: Processing sheet {sheet_name} with {len(df)} rows, {len(df.columns)} columns"
+                    debug(
+                        "FileGen: Optimization %s returned %d sheets: %s",
+                        optimization_name,
+                        len(optimized_sheets),
+                        list(optimized_sheets),
                     )
 
-                    # Ensure Operation column is set to Update
-                    if "Operation" in df.columns:
-                        df["Operation"] = "Update"
-
-                    # IMPORTANT: Check if this is a Bidding Adjustment sheet
-                    if "Bidding Adjustment" in sheet_name:
-                        # Bidding Adjustment sheets go to BOTH files
-                        all_working_sheets[sheet_name] = df
-                        all_clean_sheets[sheet_name] = df
-                        print(
-                            f"DEBUG FileGen: Added {sheet_name} to BOTH Working and Clean files"
+                    # Add stats to generation stats
+                    if stats.get("warning_messages"):
+                        self.generation_stats["warnings"].extend(
+                            stats["warning_messages"]
                         )
-                    elif "Working" in sheet_name:
-                        # Working sheets only go to Working file
-                        all_working_sheets[sheet_name] = df
-                    else:
-                        # Clean sheets go to both files
-                        all_clean_sheets[sheet_name] = df
-                        # If no specific Working version, create one
-                        if f"Working {optimization_name}" not in optimized_sheets:
-                            all_working_sheets[f"Working {optimization_name}"] = (
-                                df.copy()
+                    if stats.get("error_messages"):
+                        self.generation_stats["errors"].extend(stats["error_messages"])
+
+                    # Process returned sheets
+                    for sheet_name, df in optimized_sheets.items():
+                        debug(
+                            "FileGen: Processing sheet %s with %d rows, %d columns",
+                            sheet_name,
+                            len(df),
+                            len(df.columns),
+                        )
+
+                        # Ensure Operation column is set to Update
+                        if "Operation" in df.columns:
+                            df["Operation"] = "Update"
+
+                        # IMPORTANT: Check if this is a Bidding Adjustment sheet
+                        if "Bidding Adjustment" in sheet_name:
+                            # Bidding Adjustment sheets go to BOTH files
+                            all_working_sheets[sheet_name] = df
+                            all_clean_sheets[sheet_name] = df
+                            debug(
+                                "FileGen: Added %s to BOTH Working and Clean files",
+                                sheet_name,
                             )
+                        elif "Working" in sheet_name:
+                            # Working sheets only go to Working file
+                            all_working_sheets[sheet_name] = df
+                        else:
+                            # Clean sheets go to both files
+                            all_clean_sheets[sheet_name] = df
+                            # If no specific Working version, create one
+                            if f"Working {optimization_name}" not in optimized_sheets:
+                                all_working_sheets[f"Working {optimization_name}"] = (
+                                    df.copy()
+                                )
+
+                    self.generation_stats["sheets_created"] += len(optimized_sheets)
+                    progress.finish_stage(stage)
+
+                except ProcessingCancelledError:
+                    progress.finish_stage(stage, failed=True)
+                    raise
+                except Exception as e:
+                    self.generation_stats["errors"].append(
+                        f"Error processing {optimization_name}: {str(e)}"
+                    )
+                    # Use original data if optimization fails
+                    fallback_df = cleaned_bulk_df.copy()
+                    fallback_df["Operation"] = "Update"
+                    all_clean_sheets[f"Clean {optimization_name}"] = fallback_df
+                    all_working_sheets[f"Working {optimization_name}"] = fallback_df
+                    progress.finish_stage(stage, failed=True)
+
+            # Every entity's bid of this run, before diff mode drops the
+            # unchanged ones
+            history_bids = (
+                self.bid_history.get_new_bids(all_clean_sheets)
+                if self.bid_history.enabled
+                else None
+            )
 
-                self.generation_stats["sheets_created"] += len(optimized_sheets)
+            # Diff mode - drop rows where the bid did not actually change
+            if changes_only:
+                all_clean_sheets = self._keep_changed_rows(all_clean_sheets)
 
-            except Exception as e:
-                self.generation_stats["errors"].append(
-                    f"Error processing {optimization_name}: {str(e)}"
-                )
-                # Use original data if optimization fails
-                fallback_df = cleaned_bulk_df.copy()
-                fallback_df["Operation"] = "Update"
-                all_clean_sheets[f"Clean {optimization_name}"] = fallback_df
-                all_working_sheets[f"Working {optimization_name}"] = fallback_df
+            # Split Clean sheets that do not fit in one upload file
+            clean_parts = self._plan_clean_parts(
+                all_clean_sheets, max_rows_per_file, max_bytes_per_file
+            )
 
-        # Generate Working file (all sheets)
-        working_file = self.output_writer.create_working_file(all_working_sheets)
+            # The Working file is only written now unless it is deferred
+            files = {} if defer_working else {"working": all_working_sheets}
+            write_rows = sum(
+                len(df)
+                for sheets in [all_clean_sheets] + list(files.values())
+                for df in sheets.values()
+            )
+            with progress.stage(
+                "Write Clean file" if defer_working else "Write Working + Clean files",
+                write_rows,
+            ):
+                if clean_parts is None:
+                    # Generate Working file (all sheets, unless deferred) and Clean
+                    # file (clean sheets only) concurrently - total time is set by
+                    # the larger workbook
+                    files["clean"] = all_clean_sheets
+                    output_files = self.writer_scheduler.write_files(
+                        files,
+                        formats={"clean": output_format},
+                        cancel_token=cancel_token,
+                    )
+                    clean_file = output_files["clean"]
+                else:
+                    # Write all parts in parallel and bundle them into one zip
+                    files.update({key: sheets for key, _, sheets in clean_parts})
+                    output_files = self.writer_scheduler.write_files(
+                        files,
+                        formats={key: output_format for key, _, _ in clean_parts},
+                        cancel_token=cancel_token,
+                    )
+                    clean_file = self.writer_scheduler.bundle_files(
+                        {
+                            f"{name}.{output_files[key].extension}": output_files[key]
+                            for key, name, _ in clean_parts
+                        },
+                        "clean",
+                    )
 
-        # Generate Clean file (clean sheets only)
-        clean_file = self.output_writer.create_clean_file(all_clean_sheets)
+            self._record_history(cleaned_bulk_df, history_bids, progress)
+
+            root_span["rows_out"] = write_rows
+
+        working_file = output_files.get("working")
+        self.deferred_working_sheets = all_working_sheets if defer_working else None
 
         # Calculate final stats
         self.generation_stats["end_time"] = datetime.now()
@@ -141,24 +324,380 @@ class FileGenerator:
             self.generation_stats["end_time"] - self.generation_stats["start_time"]
         ).total_seconds()
 
-        # Get file stats
-        working_stats = self.output_writer.get_file_stats(working_file)
-        clean_stats = self.output_writer.get_file_stats(clean_file)
-
-        self.generation_stats["working_file"] = working_stats
-        self.generation_stats["clean_file"] = clean_stats
+        # Get file stats from the write manifests - no reload needed
+        if working_file is not None:
+            self.generation_stats["working_file"] = self.output_writer.get_file_stats(
+                working_file
+            )
+        self.generation_stats["clean_file"] = self.output_writer.get_file_stats(
+            clean_file
+        )
+
+        self.generation_stats["timeline"] = progress.get_timeline()
+        self.generation_stats["spans"] = progress.instrumentation.get_spans(root_span)
+
+        # Runs with failed optimizations are not worth repeating
+        if cache_key is not None and not self.generation_stats["errors"]:
+            files = {"clean": clean_file}
+            if working_file is not None:
+                files["working"] = working_file
+            self.result_cache.put(
+                cache_key,
+                files,
+                {
+                    "stats": self.generation_stats,
+                    "deferred_working_sheets": self.deferred_working_sheets,
+                    "history_bids": history_bids,
+                },
+            )
+        if partition_key is not None and not self.generation_stats["errors"]:
+            self._store_partitions(partition_key, template_df, partition_sheets)
 
         return working_file, clean_file, self.generation_stats
 
-    def generate_filenames(self) -> Tuple[str, str]:
+    def _record_history(
+        self,
+        cleaned_bulk_df: pd.DataFrame,
+        new_bids: Optional[pd.DataFrame],
+        progress: ProgressReporter,
+    ):
+        """
+        Append the run to the bid history
+
+        A history that cannot be written is reported as a warning - the
+        output files are still good.
+
+        Args:
+            cleaned_bulk_df: Cleaned Bulk DataFrame
+            new_bids: New bids of the Clean sheets before diff mode, from
+                BidHistoryStore.get_new_bids (None if the history was
+                disabled when they were computed)
+            progress: Reporter whose instrumentation times the append
+        """
+        if not self.bid_history.enabled or new_bids is None:
+            return
+
+        with progress.instrumentation.span(
+            "Record bid history", len(cleaned_bulk_df)
+        ) as history_span:
+            try:
+                rows = self.bid_history.record_run(cleaned_bulk_df, new_bids=new_bids)
+            except (sqlite3.Error, OSError) as e:
+                debug("FileGen: Bid history not recorded: %s", e)
+                self.generation_stats["warnings"].append(
+                    f"Bid history not recorded: {e}"
+                )
+                rows = 0
+            history_span["rows_out"] = rows
+        self.generation_stats["history_rows"] = rows
+
+    def _get_cache_keys(
+        self,
+        cleaned_bulk_df: pd.DataFrame,
+        selected_optimizations: List[str],
+        template_df: Optional[pd.DataFrame],
+        **options: Any,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Build the result cache keys of a run
+
+        Args:
+            cleaned_bulk_df: Cleaned Bulk DataFrame
+            selected_optimizations: Optimization names
+            template_df: Template DataFrame (optional)
+            **options: Output options that change the files
+
+        Returns:
+            Tuple of (cache_key, partition_key). cache_key covers the input
+            hashes, the sorted optimization names, the package source
+            (plus that of plugin optimizations), and the options. partition_key
+            covers the same without the template and options, and is only
+            set when every optimization supports reoptimize. Either is None
+            when the run cannot be cached.
+        """
+        if not self.result_cache.enabled:
+            return None, None
+        if any(name not in OPTIMIZATION_REGISTRY for name in selected_optimizations):
+            return None, None
+
+        optimization_classes = [
+            OPTIMIZATION_REGISTRY[name] for name in sorted(set(selected_optimizations))
+        ]
+        code_version = get_code_version(*optimization_classes)
+        bulk_hash = hash_dataframe(cleaned_bulk_df)
+        template_hash = hash_dataframe(template_df)
+
+        if code_version is None or bulk_hash is None:
+            return None, None
+
+        run_parts = {
+            "bulk": bulk_hash,
+            "optimizations": sorted(set(selected_optimizations)),
+            "code_version": code_version,
+        }
+        partition_key = None
+        if all(cls.partition_column is not None for cls in optimization_classes):
+            partition_key = ResultCache.make_key(kind="partitions", **run_parts)
+        cache_key = None
+        if template_hash is not None:
+            cache_key = ResultCache.make_key(
+                template=template_hash, **run_parts, **options
+            )
+
+        return cache_key, partition_key
+
+    def _load_partitions(
+        self, partition_key: Optional[str], template_df: Optional[pd.DataFrame]
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get the stored sheets of an earlier run on the same bulk
+
+        Args:
+            partition_key: Partition key of this run (see _get_cache_keys)
+            template_df: Template DataFrame of this run
+
+        Returns:
+            Dictionary with "sheets" (optimization name -> sheets of the
+            earlier run) and "changed" (optimization name -> partitions
+            whose template rows differ from the earlier template), or None
+            if there is no earlier run
+        """
+        if partition_key is None or not self.result_cache.contains(partition_key):
+            return None
+        cached = self.result_cache.get(partition_key)
+        if cached is None:
+            return None
+
+        _, data = cached
+        changed = {}
+        for name, previous_index in data["template_indexes"].items():
+            index = TemplateIndex(template_df, previous_index.columns)
+            changed[name] = previous_index.diff(index)
+
+        debug(
+            "FileGen: Re-running changed partitions %s",
+            {name: len(partitions) for name, partitions in changed.items()},
+        )
+        return {"sheets": data["sheets"], "changed": changed}
+
+    def _store_partitions(
+        self,
+        partition_key: str,
+        template_df: Optional[pd.DataFrame],
+        partition_sheets: Dict[str, Dict[str, pd.DataFrame]],
+    ):
+        """
+        Keep a run's sheets and template for re-running it after edits
+
+        Args:
+            partition_key: Partition key of the run
+            template_df: Template DataFrame of the run
+            partition_sheets: Sheets by optimization name, as returned by
+                the optimizations
+        """
+        template_indexes = {
+            name: TemplateIndex(
+                template_df, OPTIMIZATION_REGISTRY[name].template_columns
+            )
+            for name in partition_sheets
+        }
+        # Replaces the record of the previous template
+        self.result_cache.discard(partition_key)
+        self.result_cache.put(
+            partition_key,
+            {},
+            {"template_indexes": template_indexes, "sheets": partition_sheets},
+        )
+
+    def _load_cached_result(
+        self, cache_key: str, cleaned_bulk_df: pd.DataFrame, progress: ProgressReporter
+    ) -> Optional[Tuple[Optional[OutputFileHandle], OutputFileHandle, Dict[str, Any]]]:
+        """
+        Return the files of an identical earlier run
+
+        The repeat is still a run of its own and is appended to the bid
+        history, with the new bids kept from the original run.
+
+        Args:
+            cache_key: Result cache key
+            cleaned_bulk_df: Cleaned Bulk DataFrame (for the bid history)
+            progress: Reporter for stage events
+
+        Returns:
+            Tuple of (working_file, clean_file, stats) as from
+            generate_output_files, or None on a miss
+        """
+        if not self.result_cache.contains(cache_key):
+            return None
+
+        rows = len(cleaned_bulk_df)
+        start_time = datetime.now()
+        progress.plan(1)
+        with progress.instrumentation.span("Generate output files", rows) as root_span:
+            with progress.stage("Load cached result", rows):
+                cached = self.result_cache.get(cache_key)
+            if cached is None:
+                # Evicted since the check
+                return None
+
+            files, data = cached
+            self.deferred_working_sheets = data["deferred_working_sheets"]
+
+            # Stats of the original run, timed as this one
+            self.generation_stats = dict(data["stats"])
+            self.generation_stats.update(
+                {
+                    "cached": True,
+                    "history_rows": 0,
+                    "warnings": list(self.generation_stats["warnings"]),
+                }
+            )
+            self._record_history(cleaned_bulk_df, data["history_bids"], progress)
+            root_span["rows_out"] = rows
+
+        end_time = datetime.now()
+        self.generation_stats.update(
+            {
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": (end_time - start_time).total_seconds(),
+                "timeline": progress.get_timeline(),
+                "spans": progress.instrumentation.get_spans(root_span),
+            }
+        )
+        debug("FileGen: Returning cached result %s", cache_key[:12])
+
+        return files.get("working"), files["clean"], self.generation_stats
+
+    def build_working_file(
+        self,
+        working_sheets: Optional[Dict[str, pd.DataFrame]] = None,
+        progress: Optional[ProgressReporter] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> OutputFileHandle:
+        """
+        Write a Working file that was deferred by generate_output_files
+
+        Args:
+            working_sheets: Working sheets to write
+                (default: deferred_working_sheets of the last generation)
+            progress: Reporter for stage events (optional)
+            cancel_token: Passed to the writer (optional)
+
+        Returns:
+            OutputFileHandle of the Working file
+        """
+        if working_sheets is None:
+            working_sheets = self.deferred_working_sheets
+        if working_sheets is None:
+            raise ValueError("No deferred Working sheets to build")
+
+        progress = progress or ProgressReporter()
+        rows = sum(len(df) for df in working_sheets.values())
+        with progress.stage("Write Working file", rows):
+            output_files = self.writer_scheduler.write_files(
+                {"working": working_sheets}, cancel_token=cancel_token
+            )
+        working_file = output_files["working"]
+
+        self.deferred_working_sheets = None
+        self.generation_stats["working_deferred"] = False
+        self.generation_stats["working_file"] = self.output_writer.get_file_stats(
+            working_file
+        )
+
+        return working_file
+
+    def _plan_clean_parts(
+        self,
+        sheets: Dict[str, pd.DataFrame],
+        max_rows: Optional[int],
+        max_bytes: Optional[int],
+    ) -> Optional[List[Tuple[str, str, Dict[str, pd.DataFrame]]]]:
+        """
+        Plan size-bounded Clean upload files
+
+        Args:
+            sheets: Dictionary of sheet_name: DataFrame
+            max_rows: Row budget per file (None for default)
+            max_bytes: Byte budget per file (None for default)
+
+        Returns:
+            None when every sheet fits in one file, otherwise a list of
+            (file_key, part_name, sheets_data) - one single-sheet file per
+            part, recorded in generation_stats["clean_parts"]
+        """
+        split_sheets = {
+            sheet_name: self.output_writer.split_sheet(df, max_rows, max_bytes)
+            for sheet_name, df in sheets.items()
+        }
+
+        if all(len(parts) == 1 for parts in split_sheets.values()):
+            return None
+
+        clean_parts = []
+        for sheet_name, parts in split_sheets.items():
+            for i, part_df in enumerate(parts, start=1):
+                part_name = (
+                    f"{sheet_name} - Part {i} of {len(parts)}"
+                    if len(parts) > 1
+                    else sheet_name
+                )
+                file_key = f"clean_part_{len(clean_parts) + 1:02d}"
+                clean_parts.append((file_key, part_name, {sheet_name: part_df}))
+                self.generation_stats["clean_parts"].append(
+                    {"name": part_name, "sheet": sheet_name, "rows": len(part_df)}
+                )
+
+        return clean_parts
+
+    def _keep_changed_rows(
+        self, sheets: Dict[str, pd.DataFrame]
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Remove rows whose new Bid equals Old Bid after rounding
+
+        Sheets without an Old Bid column (e.g. Bidding Adjustment) are
+        passed through unchanged. Suppressed counts are recorded in
+        generation_stats.
+
+        Args:
+            sheets: Dictionary of sheet_name: DataFrame
+
+        Returns:
+            Dictionary with the same sheets, unchanged rows removed
+        """
+        result = {}
+
+        for sheet_name, df in sheets.items():
+            if "Old Bid" not in df.columns or "Bid" not in df.columns:
+                result[sheet_name] = df
+                continue
+
+            new_bid = pd.to_numeric(df["Bid"], errors="coerce").round(2)
+            old_bid = pd.to_numeric(df["Old Bid"], errors="coerce").round(2)
+            unchanged = (new_bid == old_bid) | (new_bid.isna() & old_bid.isna())
+
+            suppressed = int(unchanged.sum())
+            self.generation_stats["suppressed_rows"] += suppressed
+            self.generation_stats["suppressed_rows_by_sheet"][sheet_name] = suppressed
+
+            result[sheet_name] = df[~unchanged]
+
+        return result
+
+    def generate_filenames(self, clean_extension: str = "xlsx") -> Tuple[str, str]:
         """
         Generate filenames for Working and Clean files
 
+        Args:
+            clean_extension: Extension of the Clean file (xlsx, csv or zip)
+
         Returns:
             Tuple of (working_filename, clean_filename)
         """
         working_filename = generate_output_filename("Working")
-        clean_filename = generate_output_filename("Clean")
+        clean_filename = generate_output_filename("Clean", extension=clean_extension)
 
         return working_filename, clean_filename
 
@@ -177,11 +716,29 @@ class FileGenerator:
         if summary.get("sheets_created", 0) > 0:
             messages.append(f"Created {summary['sheets_created']} sheets")
 
+        if summary.get("incremental"):
+            messages.append(
+                f"Template edit: re-ran {summary['changed_partitions']} "
+                "changed portfolios"
+            )
+
+        if summary.get("suppressed_rows", 0) > 0:
+            messages.append(
+                f"Clean file: {summary['suppressed_rows']:,} unchanged rows omitted"
+            )
+
         if "working_file" in summary:
             working_size = get_file_size_display(summary["working_file"]["size_bytes"])
             messages.append(
                 f"Working file: {working_size}, {summary['working_file']['sheet_count']} sheets"
             )
+        elif summary.get("working_deferred"):
+            messages.append("Working file: prepared on request")
+
+        if summary.get("clean_parts"):
+            messages.append(
+                f"Clean output split into {len(summary['clean_parts'])} upload files"
+            )
 
         if "clean_file" in summary:
             clean_size = get_file_size_display(summary["clean_file"]["size_bytes"])
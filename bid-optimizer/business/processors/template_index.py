@@ -0,0 +1,74 @@
+"""
+Template Index
+Template settings by portfolio, for finding the portfolios a template edit
+affects
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+
+class TemplateIndex:
+    """
+    Template values by portfolio name
+
+    Like the optimizations' template lookups, the first row of a portfolio
+    wins and missing values count as unset.
+    """
+
+    KEY_COLUMN = "Portfolio Name"
+
+    def __init__(self, template_df: Optional[pd.DataFrame], columns: List[str]):
+        """
+        Initialize index
+
+        Args:
+            template_df: Template DataFrame (None for an empty index)
+            columns: Template columns to index (absent columns are unset)
+        """
+        self.columns = list(columns)
+        self.rows: Dict[Any, Tuple[Any, ...]] = {}
+
+        if template_df is None or self.KEY_COLUMN not in template_df.columns:
+            return
+
+        first_rows = template_df.drop_duplicates(self.KEY_COLUMN, keep="first")
+        values = [
+            (
+                first_rows[col].tolist()
+                if col in first_rows.columns
+                else [None] * len(first_rows)
+            )
+            for col in self.columns
+        ]
+        for portfolio, *row in zip(first_rows[self.KEY_COLUMN].tolist(), *values):
+            self.rows[portfolio] = tuple(None if pd.isna(v) else v for v in row)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def diff(self, other: "TemplateIndex") -> Set[Any]:
+        """
+        Find portfolios whose indexed values differ
+
+        Args:
+            other: Index of another template over the same columns
+
+        Returns:
+            Portfolio names added, removed or changed between the indexes
+
+        Raises:
+            ValueError: If the indexes cover different columns
+        """
+        if self.columns != other.columns:
+            raise ValueError(
+                f"Cannot compare template indexes over {self.columns} "
+                f"and {other.columns}"
+            )
+
+        return {
+            portfolio
+            for portfolio in self.rows.keys() | other.rows.keys()
+            if self.rows.get(portfolio) != other.rows.get(portfolio)
+        }
@@ -4,5 +4,12 @@ Business logic orchestration
 """
 
 from .orchestrator import Orchestrator
+from .job_runner import JobQueueFullError, JobRunner, JobStatus, get_job_runner
 
-__all__ = ["Orchestrator"]
+__all__ = [
+    "Orchestrator",
+    "JobQueueFullError",
+    "JobRunner",
+    "JobStatus",
+    "get_job_runner",
+]
@@ -0,0 +1,513 @@
+"""
+Batch Runner
+Validates and optimizes many accounts in worker processes - biggest Bulk
+files first, admitted against a memory budget
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional
+
+from business.services.orchestrator import Orchestrator
+from data.writers.output_writer import OutputWriter
+from data.writers.writer_scheduler import WriterScheduler
+from utils.cancellation import CancellationToken, ProcessingCancelledError
+from utils.filename_generator import generate_output_filename
+from utils.instrumentation import debug
+from utils.progress import ProgressReporter
+
+# Account result states
+STATUS_DONE = "done"
+STATUS_VALID = "valid"  # validate_only run that passed
+STATUS_INVALID = "invalid"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+# Validation result keys copied into account results
+VALIDATION_KEYS = [
+    "is_valid",
+    "errors",
+    "warnings",
+    "missing_portfolios",
+    "ignored_portfolios",
+    "excess_portfolios",
+    "stats",
+]
+
+SPREADSHEET_EXTENSIONS = (".xlsx", ".csv")
+
+
+def process_account(
+    template_path: str,
+    bulk_path: str,
+    output_dir: Optional[str] = None,
+    optimizations: Optional[List[str]] = None,
+    output_format: str = OutputWriter.XLSX_FORMAT,
+    changes_only: bool = False,
+    validate_only: bool = False,
+    writer_workers: Optional[int] = None,
+    progress: Optional[ProgressReporter] = None,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Dict[str, Any]:
+    """
+    Validate and optimize one Template/Bulk pair from disk
+
+    Args:
+        template_path: Template file (xlsx/csv)
+        bulk_path: Bulk file (xlsx/csv)
+        output_dir: Directory for the Working and Clean files (required
+            unless validate_only)
+        optimizations: Optimization names (default: Zero Sales)
+        output_format: Clean file format - 'xlsx' or 'csv'
+        changes_only: Keep only rows with a changed Bid in the Clean file
+        validate_only: Stop after validation
+        writer_workers: Worker processes for writing (default: CPU count;
+            1 writes inline)
+        progress: Reporter for stage events (optional)
+        cancel_token: Token to abort processing (optional)
+
+    Returns:
+        Dictionary with status (done, valid, invalid, error, cancelled),
+        validation, outputs (file type -> path), stats (generation
+        summary) and error
+    """
+    result = {
+        "status": STATUS_ERROR,
+        "optimizations": optimizations or ["Zero Sales"],
+        "validation": None,
+        "outputs": {},
+        "stats": None,
+        "error": None,
+    }
+    orchestrator = Orchestrator()
+    if writer_workers is not None:
+        orchestrator.file_generator.writer_scheduler = WriterScheduler(
+            max_workers=writer_workers
+        )
+
+    try:
+        validation = orchestrator.validate_files(
+            _load_file(template_path), _load_file(bulk_path), progress, cancel_token
+        )
+        result["validation"] = {key: validation.get(key) for key in VALIDATION_KEYS}
+
+        if not validation["is_valid"]:
+            result["status"] = STATUS_INVALID
+            return result
+        if validate_only:
+            result["status"] = STATUS_VALID
+            return result
+
+        working_file, clean_file, _ = orchestrator.process_files(
+            validation["template_df"],
+            validation["separated_dataframes"],
+            result["optimizations"],
+            output_format=output_format,
+            changes_only=changes_only,
+            progress=progress,
+            cancel_token=cancel_token,
+        )
+
+        # Same names as the downloads in the app
+        os.makedirs(output_dir, exist_ok=True)
+        for file_type, output_file in (
+            ("Working", working_file),
+            ("Clean", clean_file),
+        ):
+            path = os.path.join(
+                output_dir,
+                generate_output_filename(file_type, extension=output_file.extension),
+            )
+            # Copied, not moved - temp files are private to the owner
+            shutil.copyfile(output_file.path, path)
+            output_file.cleanup()
+            result["outputs"][file_type.lower()] = path
+
+        result["stats"] = orchestrator.file_generator.get_generation_summary()
+        result["status"] = STATUS_DONE
+
+    except ProcessingCancelledError:
+        result["status"] = STATUS_CANCELLED
+    except Exception as e:
+        result["status"] = STATUS_ERROR
+        result["error"] = str(e)
+
+    return result
+
+
+class BatchRunner:
+    """
+    Runs accounts in parallel worker processes
+
+    Accounts are started biggest Bulk first. An account is only admitted
+    while the estimated memory of all running accounts stays within the
+    budget; when the biggest waiting account does not fit, smaller ones
+    that do fit go first. An account bigger than the whole budget runs
+    alone. Every worker handles one account and exits, so its memory is
+    returned to the system.
+    """
+
+    # Memory estimate per account: interpreter with pandas/openpyxl loaded,
+    # plus a multiple of the Bulk file size (measured peak RSS growth per MB
+    # of input, reading through writing both output files)
+    BASE_MEMORY_MB = 120
+    MEMORY_PER_INPUT_MB = {"xlsx": 65, "csv": 45}
+
+    # Share of physical memory used as the default budget
+    DEFAULT_BUDGET_SHARE = 0.75
+
+    # How often the scheduler checks for cancellation
+    CANCEL_POLL_SECONDS = 0.5
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        memory_budget_mb: Optional[float] = None,
+    ):
+        """
+        Initialize runner
+
+        Args:
+            max_workers: Accounts running at the same time (default: CPU
+                count)
+            memory_budget_mb: Memory budget for all running accounts
+                (default: 75% of physical memory, unbounded if unknown)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if memory_budget_mb is None:
+            total_mb = _get_total_memory_mb()
+            if total_mb:
+                memory_budget_mb = total_mb * self.DEFAULT_BUDGET_SHARE
+        self.memory_budget_mb = memory_budget_mb
+
+    def load_manifest(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Load accounts from a manifest file
+
+        JSON: a list (or {"accounts": [...]}) of objects with name,
+        template and bulk. CSV: columns name, template, bulk. Relative
+        paths are relative to the manifest.
+
+        Args:
+            path: Manifest file
+
+        Returns:
+            List of account dictionaries with name, template and bulk
+
+        Raises:
+            ValueError: If the manifest is malformed
+        """
+        with open(path, encoding="utf-8") as f:
+            if path.lower().endswith(".csv"):
+                entries = list(csv.DictReader(f))
+            else:
+                entries = json.load(f)
+                if isinstance(entries, dict):
+                    entries = entries.get("accounts", [])
+
+        base_dir = os.path.dirname(os.path.abspath(path))
+        accounts = []
+        for i, entry in enumerate(entries, start=1):
+            if not entry.get("template") or not entry.get("bulk"):
+                raise ValueError(f"Manifest entry {i} needs template and bulk")
+            accounts.append(
+                {
+                    "name": entry.get("name") or f"account-{i}",
+                    "template": os.path.join(base_dir, entry["template"]),
+                    "bulk": os.path.join(base_dir, entry["bulk"]),
+                }
+            )
+
+        return self._check_accounts(accounts)
+
+    def discover_accounts(self, directory: str) -> List[Dict[str, Any]]:
+        """
+        Find accounts in a directory of pairs
+
+        Every subdirectory is one account (named after it) holding two
+        spreadsheets: the one with "template" in its name and the Bulk.
+
+        Args:
+            directory: Parent directory
+
+        Returns:
+            List of account dictionaries with name, template and bulk
+
+        Raises:
+            ValueError: If a subdirectory does not hold exactly one pair
+        """
+        accounts = []
+        for name in sorted(os.listdir(directory)):
+            account_dir = os.path.join(directory, name)
+            if not os.path.isdir(account_dir):
+                continue
+
+            files = sorted(
+                file_name
+                for file_name in os.listdir(account_dir)
+                if file_name.lower().endswith(SPREADSHEET_EXTENSIONS)
+            )
+            templates = [f for f in files if "template" in f.lower()]
+            bulks = [f for f in files if "template" not in f.lower()]
+            if len(templates) != 1 or len(bulks) != 1:
+                raise ValueError(
+                    f"{account_dir}: expected one Template and one Bulk file, "
+                    f"found {files}"
+                )
+
+            accounts.append(
+                {
+                    "name": name,
+                    "template": os.path.join(account_dir, templates[0]),
+                    "bulk": os.path.join(account_dir, bulks[0]),
+                }
+            )
+
+        return self._check_accounts(accounts)
+
+    def estimate_memory_mb(self, account: Dict[str, Any]) -> float:
+        """
+        Estimate the peak memory of one account
+
+        Args:
+            account: Account dictionary
+
+        Returns:
+            Estimated peak memory in MB
+        """
+        extension = os.path.splitext(account["bulk"])[1].lower().lstrip(".")
+        factor = self.MEMORY_PER_INPUT_MB.get(
+            extension, max(self.MEMORY_PER_INPUT_MB.values())
+        )
+        input_mb = os.path.getsize(account["bulk"]) / (1024 * 1024)
+        return round(self.BASE_MEMORY_MB + input_mb * factor, 1)
+
+    def plan(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Order accounts biggest first and attach their estimates
+
+        Size is the estimated memory, so a CSV and an xlsx Bulk of the same
+        content rank alike.
+
+        Args:
+            accounts: Account dictionaries
+
+        Returns:
+            New account dictionaries with bulk_mb and estimated_memory_mb
+        """
+        planned = [
+            {
+                **account,
+                "bulk_mb": round(os.path.getsize(account["bulk"]) / (1024 * 1024), 2),
+                "estimated_memory_mb": self.estimate_memory_mb(account),
+            }
+            for account in accounts
+        ]
+        return sorted(planned, key=lambda account: -account["estimated_memory_mb"])
+
+    def run(
+        self,
+        accounts: List[Dict[str, Any]],
+        output_dir: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run all accounts
+
+        Args:
+            accounts: Account dictionaries with name, template and bulk
+            output_dir: Parent directory - every account writes to
+                <output_dir>/<name> (required unless validate_only)
+            options: Keyword arguments for process_account (optimizations,
+                output_format, changes_only, validate_only)
+            on_result: Called with every finished account result
+            cancel_token: Stops admitting accounts and terminates the
+                running ones; they are reported as cancelled
+
+        Returns:
+            Summary with accounts (results in input order), totals per
+            status, duration_seconds and the scheduling settings
+        """
+        options = dict(options or {})
+        pending = self.plan(accounts)
+        running = {}
+        results = {}
+        memory_in_use = 0.0
+        start = time.perf_counter()
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            max_tasks_per_child=1,
+        )
+        try:
+            while pending or running:
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
+
+                # Admit as many accounts as workers and memory allow
+                while pending and len(running) < self.max_workers:
+                    account = self._next_account(pending, memory_in_use, running)
+                    if account is None:
+                        break
+                    pending.remove(account)
+                    memory_in_use += account["estimated_memory_mb"]
+                    account["started"] = time.perf_counter()
+                    debug(
+                        "BatchRunner: Starting %s (%.0f MB estimated, %.0f MB in use)",
+                        account["name"],
+                        account["estimated_memory_mb"],
+                        memory_in_use,
+                    )
+                    future = executor.submit(
+                        process_account,
+                        account["template"],
+                        account["bulk"],
+                        _account_output_dir(output_dir, account["name"]),
+                        writer_workers=1,
+                        **options,
+                    )
+                    running[future] = account
+
+                done, _ = wait(
+                    running,
+                    timeout=self.CANCEL_POLL_SECONDS,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    account = running.pop(future)
+                    memory_in_use -= account["estimated_memory_mb"]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Worker died (e.g. killed for memory)
+                        result = {"status": STATUS_ERROR, "error": str(e) or repr(e)}
+                    result = self._account_result(account, result)
+                    results[account["name"]] = result
+                    if on_result is not None:
+                        on_result(result)
+
+            if running or pending:
+                # Cancelled - stop workers now so their memory is released
+                self._terminate_workers(executor)
+                for account in list(running.values()) + pending:
+                    result = self._account_result(account, {"status": STATUS_CANCELLED})
+                    results[account["name"]] = result
+                    if on_result is not None:
+                        on_result(result)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        ordered = [results[account["name"]] for account in accounts]
+        totals = {}
+        for result in ordered:
+            totals[result["status"]] = totals.get(result["status"], 0) + 1
+
+        return {
+            "accounts": ordered,
+            "totals": totals,
+            "duration_seconds": round(time.perf_counter() - start, 3),
+            "max_workers": self.max_workers,
+            "memory_budget_mb": self.memory_budget_mb,
+        }
+
+    def _next_account(
+        self,
+        pending: List[Dict[str, Any]],
+        memory_in_use: float,
+        running: Dict,
+    ) -> Optional[Dict[str, Any]]:
+        """Pick the biggest waiting account that fits the memory budget"""
+        if self.memory_budget_mb is None:
+            return pending[0]
+
+        for account in pending:
+            if memory_in_use + account["estimated_memory_mb"] <= self.memory_budget_mb:
+                return account
+
+        # Too big for the budget - run it alone
+        return pending[0] if not running else None
+
+    def _account_result(
+        self, account: Dict[str, Any], result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Combine an account with its process_account result"""
+        started = account.get("started")
+        return {
+            "name": account["name"],
+            "template": account["template"],
+            "bulk": account["bulk"],
+            "bulk_mb": account["bulk_mb"],
+            "estimated_memory_mb": account["estimated_memory_mb"],
+            "duration_seconds": (
+                round(time.perf_counter() - started, 3) if started else None
+            ),
+            **result,
+        }
+
+    def _check_accounts(self, accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Check that account names are unique and files exist"""
+        names = [account["name"] for account in accounts]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate account names: {', '.join(duplicates)}")
+
+        for account in accounts:
+            for key in ("template", "bulk"):
+                if not os.path.isfile(account[key]):
+                    raise ValueError(
+                        f"{account['name']}: {key} file not found: {account[key]}"
+                    )
+
+        return accounts
+
+    def _terminate_workers(self, executor: ProcessPoolExecutor):
+        """Stop worker processes mid-account"""
+        # ProcessPoolExecutor has no public API to stop running tasks
+        processes = getattr(executor, "_processes", None) or {}
+        for process in list(processes.values()):
+            if process.is_alive():
+                process.terminate()
+
+
+def _init_worker():
+    """
+    Prepare a worker process
+
+    Workers ignore Ctrl+C - the parent cancels and terminates them. Pipeline
+    prints go to stderr, as results travel back to the parent.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout = sys.stderr
+
+
+def _account_output_dir(output_dir: Optional[str], name: str) -> Optional[str]:
+    """Output directory of one account"""
+    return os.path.join(output_dir, name) if output_dir else None
+
+
+def _load_file(path: str) -> BytesIO:
+    """Read a file into a buffer, as an upload arrives in the app"""
+    with open(path, "rb") as f:
+        buffer = BytesIO(f.read())
+    buffer.name = os.path.basename(path)
+    return buffer
+
+
+def _get_total_memory_mb() -> Optional[float]:
+    """Physical memory in MB (None if unknown)"""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
@@ -0,0 +1,329 @@
+"""
+Job Runner
+Runs long processing jobs in background threads so the UI stays responsive
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.cancellation import CancellationToken, ProcessingCancelledError
+from utils.instrumentation import debug
+from utils.progress import ProgressReporter
+
+
+class JobStatus:
+    """Job lifecycle states"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = [COMPLETED, FAILED, CANCELLED]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised by JobRunner.submit when no more jobs may wait"""
+
+
+class Job:
+    """A submitted background job and its outcome"""
+
+    def __init__(self, job_id: str, name: str):
+        """
+        Initialize job
+
+        Args:
+            job_id: Unique job ID
+            name: Human readable job name
+        """
+        self.job_id = job_id
+        self.name = name
+        self.status = JobStatus.PENDING
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.progress: Optional[ProgressReporter] = None
+        self.cancel_token: Optional[CancellationToken] = None
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if the job completed, failed or was cancelled"""
+        return self.status in JobStatus.FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get job status without the result
+
+        Returns:
+            Dictionary with job_id, name, status, error, timing and - for
+            jobs submitted with track_progress - a progress snapshot
+        """
+        end = self.finished or time.time()
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed_seconds": round(end - self.started, 1) if self.started else 0.0,
+            "progress": self.progress.get_snapshot() if self.progress else None,
+        }
+
+
+class JobRunner:
+    """Executes jobs on a thread pool and keeps their results by job ID"""
+
+    # Finished jobs are forgotten after this long
+    DEFAULT_RESULT_TTL_SECONDS = 2 * 60 * 60  # 2 hours
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        result_ttl_seconds: int = DEFAULT_RESULT_TTL_SECONDS,
+        max_pending: Optional[int] = None,
+        on_forget: Optional[Callable[[Job], None]] = None,
+    ):
+        """
+        Initialize job runner
+
+        Args:
+            max_workers: Maximum jobs running at the same time
+            result_ttl_seconds: How long finished jobs are kept
+            max_pending: Maximum jobs waiting for a worker - submit raises
+                JobQueueFullError beyond it (default: unbounded)
+            on_forget: Called with every job that is discarded or expires,
+                e.g. to delete its output files
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bid_optimizer_job"
+        )
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.on_forget = on_forget
+        self.result_ttl_seconds = result_ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        name: str = "",
+        track_progress: bool = False,
+        cancellable: bool = False,
+        **kwargs,
+    ) -> str:
+        """
+        Submit a job
+
+        Args:
+            fn: Function to run - must not touch Streamlit session state
+            *args: Positional arguments for fn
+            name: Human readable job name
+            track_progress: Pass a ProgressReporter to fn as progress=...
+                and include its snapshot in the job status
+            cancellable: Pass a CancellationToken to fn as cancel_token=...
+                so the job can be stopped with cancel()
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Job ID
+
+        Raises:
+            JobQueueFullError: If max_pending jobs are already waiting
+        """
+        self._cleanup_expired()
+
+        job = Job(uuid.uuid4().hex, name or getattr(fn, "__name__", "job"))
+        if track_progress:
+            job.progress = ProgressReporter()
+            kwargs["progress"] = job.progress
+        if cancellable:
+            job.cancel_token = CancellationToken()
+            kwargs["cancel_token"] = job.cancel_token
+        with self._lock:
+            if self.max_pending is not None:
+                # Counted under the lock so concurrent submits cannot overshoot
+                unfinished = sum(
+                    1 for other in self._jobs.values() if not other.is_finished
+                )
+                if unfinished >= self.max_workers + self.max_pending:
+                    raise JobQueueFullError(
+                        f"{unfinished} jobs running or waiting - try again later"
+                    )
+            self._jobs[job.job_id] = job
+
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        debug("JobRunner: Submitted job %s (%s)", job.job_id, job.name)
+
+        return job.job_id
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get status of a job
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Status dictionary (see Job.to_dict) or None if unknown
+        """
+        job = self.get_job(job_id)
+        return job.to_dict() if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Get the status of all known jobs
+
+        Returns:
+            Status dictionaries (see Job.to_dict), oldest first
+        """
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.created)
+        return [job.to_dict() for job in jobs]
+
+    def get_load(self) -> Dict[str, Any]:
+        """
+        Get the number of running and waiting jobs
+
+        Returns:
+            Dictionary with running, pending, max_workers and max_pending
+        """
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "running": statuses.count(JobStatus.RUNNING),
+            "pending": statuses.count(JobStatus.PENDING),
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+        }
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID (None if unknown or expired)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_result(self, job_id: str) -> Any:
+        """
+        Get the result of a completed job
+
+        Raises:
+            KeyError: If the job is unknown
+            RuntimeError: If the job failed or has not finished
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        if job.status == JobStatus.FAILED:
+            raise RuntimeError(f"Job {job_id} failed: {job.error}")
+        if job.status == JobStatus.CANCELLED:
+            raise RuntimeError(f"Job {job_id} was cancelled")
+        if job.status != JobStatus.COMPLETED:
+            raise RuntimeError(f"Job {job_id} is still {job.status}")
+        return job.result
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a job
+
+        The job stops at its next checkpoint; poll get_status until it
+        reports CANCELLED (or COMPLETED if it finished first).
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            True if cancellation was requested, False if the job is
+            unknown, finished or was not submitted as cancellable
+        """
+        job = self.get_job(job_id)
+        if job is None or job.is_finished or job.cancel_token is None:
+            return False
+
+        job.cancel_token.cancel()
+        debug("JobRunner: Cancellation requested for job %s", job_id)
+        return True
+
+    def discard(self, job_id: str):
+        """Forget a job and its result"""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            self._forget(job)
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict):
+        """Execute a job in a worker thread and record its outcome"""
+        job.status = JobStatus.RUNNING
+        job.started = time.time()
+
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = JobStatus.COMPLETED
+        except ProcessingCancelledError:
+            job.status = JobStatus.CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            debug("JobRunner: Job %s failed", job.job_id)
+            traceback.print_exc()
+        finally:
+            job.finished = time.time()
+
+        debug(
+            "JobRunner: Job %s %s in %.1fs",
+            job.job_id,
+            job.status,
+            job.finished - job.started,
+        )
+
+    def _cleanup_expired(self):
+        """Forget finished jobs older than the result TTL"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.is_finished and now - job.finished > self.result_ttl_seconds
+            ]
+            expired_jobs = [self._jobs.pop(job_id) for job_id in expired]
+        for job in expired_jobs:
+            self._forget(job)
+
+    def _forget(self, job: Job):
+        """Run the on_forget hook for a job that was removed"""
+        if self.on_forget is None:
+            return
+        try:
+            self.on_forget(job)
+        except Exception:
+            debug("JobRunner: on_forget failed for job %s", job.job_id)
+            traceback.print_exc()
+
+
+# Process-wide runner shared by all sessions
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """
+    Get the process-wide job runner
+
+    Returns:
+        Shared JobRunner instance
+    """
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = JobRunner()
+        return _job_runner
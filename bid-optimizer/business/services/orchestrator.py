@@ -4,22 +4,20 @@ Coordinates validation and processing
 """
 
 import pandas as pd
-from typing import Dict, Any, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
 from io import BytesIO
-import sys
-import os
 import traceback
 
-# Add project root to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-business_dir = os.path.dirname(current_dir)
-project_root = os.path.dirname(business_dir)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
 from business.validators import FileValidator, PortfolioValidator
-from business.processors import BulkCleaner, FileGenerator
+from business.processors import BulkCleaner
 from data.readers import ExcelReader, CSVReader
+from utils.progress import ProgressReporter
+from utils.cancellation import CancellationToken, ProcessingCancelledError
+from utils.instrumentation import debug
+
+if TYPE_CHECKING:
+    from business.processors import FileGenerator
+    from data.writers.writer_scheduler import OutputFileHandle
 
 
 class Orchestrator:
@@ -30,12 +28,25 @@ class Orchestrator:
         self.file_validator = FileValidator()
         self.portfolio_validator = PortfolioValidator()
         self.bulk_cleaner = BulkCleaner()
-        self.file_generator = FileGenerator()
+        self._file_generator = None
         self.excel_reader = ExcelReader()
         self.csv_reader = CSVReader()
 
+    @property
+    def file_generator(self) -> "FileGenerator":
+        """File generator - loads the writers and optimizations on first use"""
+        if self._file_generator is None:
+            from business.processors import FileGenerator
+
+            self._file_generator = FileGenerator()
+        return self._file_generator
+
     def validate_files(
-        self, template_file: BytesIO, bulk_file: BytesIO
+        self,
+        template_file: BytesIO,
+        bulk_file: BytesIO,
+        progress: Optional[ProgressReporter] = None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> Dict[str, Any]:
         """
         Complete validation of Template and Bulk files
@@ -43,6 +54,8 @@ class Orchestrator:
         Args:
             template_file: Template file buffer
             bulk_file: Bulk file buffer
+            progress: Reporter for stage events (optional)
+            cancel_token: Passed to the readers and cleaner (optional)
 
         Returns:
             Complete validation result
@@ -61,21 +74,31 @@ class Orchestrator:
             "stats": {},
         }
 
+        progress = progress or ProgressReporter()
+        progress.plan(6)
+        instrumentation = progress.instrumentation
+        root_span = instrumentation.start_span("Validate files")
+
         try:
             # Read Template file
-            template_df = self._read_file(template_file, "template")
+            with progress.stage("Read Template") as stage:
+                template_df = self._read_file(template_file, "template", cancel_token)
+                stage["rows"] = len(template_df) if template_df is not None else 0
             if template_df is None:
                 result["errors"].append("Failed to read Template file")
                 return result
 
             # Read Bulk file
-            bulk_df = self._read_file(bulk_file, "bulk")
+            with progress.stage("Read Bulk") as stage:
+                bulk_df = self._read_file(bulk_file, "bulk", cancel_token)
+                stage["rows"] = len(bulk_df) if bulk_df is not None else 0
             if bulk_df is None:
                 result["errors"].append("Failed to read Bulk file")
                 return result
 
             # Validate Template structure
-            template_validation = self.file_validator.validate_template(template_df)
+            with progress.stage("Validate Template", len(template_df)):
+                template_validation = self.file_validator.validate_template(template_df)
             result["template_validation"] = template_validation
 
             if not template_validation["is_valid"]:
@@ -84,7 +107,8 @@ class Orchestrator:
                 return result
 
             # Validate Bulk structure
-            bulk_validation = self.file_validator.validate_bulk(bulk_df)
+            with progress.stage("Validate Bulk", len(bulk_df)):
+                bulk_validation = self.file_validator.validate_bulk(bulk_df)
             result["bulk_validation"] = bulk_validation
 
             if not bulk_validation["is_valid"]:
@@ -93,7 +117,9 @@ class Orchestrator:
                 return result
 
             # Clean Bulk data and separate into sheets
-            cleaned_targets_df = self.bulk_cleaner.clean_bulk(bulk_df)
+            with progress.stage("Clean Bulk", len(bulk_df)) as stage:
+                cleaned_targets_df = self.bulk_cleaner.clean_bulk(bulk_df, cancel_token)
+                stage["rows"] = len(cleaned_targets_df)
             cleaning_summary = self.bulk_cleaner.get_cleaning_summary()
             result["cleaning_summary"] = cleaning_summary
 
@@ -107,9 +133,10 @@ class Orchestrator:
                 return result
 
             # Validate portfolios (only on Targets sheet)
-            portfolio_validation = self.portfolio_validator.validate_portfolios(
-                template_df, cleaned_targets_df
-            )
+            with progress.stage("Validate Portfolios", len(cleaned_targets_df)):
+                portfolio_validation = self.portfolio_validator.validate_portfolios(
+                    template_df, cleaned_targets_df
+                )
             result["portfolio_validation"] = portfolio_validation
 
             # Extract results
@@ -142,6 +169,7 @@ class Orchestrator:
                 "bidding_adjustments_rows": cleaning_summary["stats"].get(
                     "bidding_adjustments_final", 0
                 ),
+                "timeline": progress.get_timeline(),
             }
 
             # If we got here, validation passed
@@ -155,18 +183,30 @@ class Orchestrator:
 
             return result
 
+        except ProcessingCancelledError:
+            instrumentation.finish_span(root_span, failed=True)
+            raise
         except Exception as e:
             result["errors"].append(f"Unexpected error: {str(e)}")
             print(f"Orchestrator validation error: {e}")
             traceback.print_exc()
             return result
+        finally:
+            # No-op if the span was already closed as failed
+            instrumentation.finish_span(root_span)
+            if result["stats"]:
+                result["stats"]["spans"] = instrumentation.get_spans(root_span)
 
     def process_files(
         self,
         template_df: pd.DataFrame,
         separated_dataframes: Dict[str, pd.DataFrame],
         selected_optimizations: list,
-    ) -> Tuple[BytesIO, BytesIO, Dict[str, Any]]:
+        output_format: str = "xlsx",
+        changes_only: bool = False,
+        progress: Optional[ProgressReporter] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Tuple["OutputFileHandle", "OutputFileHandle", Dict[str, Any]]:
         """
         Process files with selected optimizations
 
@@ -177,57 +217,111 @@ class Orchestrator:
                 - product_ads: Product Ads DataFrame
                 - bidding_adjustments: Bidding Adjustments DataFrame
             selected_optimizations: List of optimization names
+            output_format: Clean file format - 'xlsx' or 'csv'
+            changes_only: Keep only rows with a changed Bid in the Clean file
+            progress: Reporter for stage events (optional)
+            cancel_token: Token to abort processing (optional)
 
         Returns:
             Tuple of (working_file, clean_file, stats)
         """
         try:
-            # Generate output files with all separated dataframes
+            # Optimizations work on the targets and need the Bidding
+            # Adjustments next to them
+            cleaned_bulk_df = self.combine_for_processing(separated_dataframes)
+
             working_file, clean_file, stats = self.file_generator.generate_output_files(
-                separated_dataframes=separated_dataframes,
+                cleaned_bulk_df,
                 selected_optimizations=selected_optimizations,
                 template_df=template_df,
+                output_format=output_format,
+                changes_only=changes_only,
+                progress=progress,
+                cancel_token=cancel_token,
             )
 
             return working_file, clean_file, stats
 
+        except ProcessingCancelledError:
+            raise
         except Exception as e:
             print(f"Orchestrator processing error: {e}")
             traceback.print_exc()
             raise
 
-    def _read_file(self, file: BytesIO, file_type: str) -> Optional[pd.DataFrame]:
+    def combine_for_processing(
+        self, separated_dataframes: Dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Build the optimization input from the separated DataFrames
+
+        Args:
+            separated_dataframes: Result of BulkCleaner.get_separated_dataframes
+
+        Returns:
+            Targets followed by Bidding Adjustments
+        """
+        parts = [
+            separated_dataframes[name]
+            for name in ("targets", "bidding_adjustments")
+            if separated_dataframes.get(name) is not None
+            and len(separated_dataframes[name]) > 0
+        ]
+        if not parts:
+            targets_df = separated_dataframes.get("targets")
+            return targets_df if targets_df is not None else pd.DataFrame()
+
+        return pd.concat(parts, ignore_index=True)
+
+    def _read_file(
+        self,
+        file: BytesIO,
+        file_type: str,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Optional[pd.DataFrame]:
         """
         Read file and return DataFrame
 
         Args:
             file: File buffer
             file_type: 'template' or 'bulk'
+            cancel_token: Passed to the readers (optional)
 
         Returns:
             DataFrame or None if failed
         """
         try:
-            print(f"DEBUG: Reading {file_type} file")
-            print(f"DEBUG: File type: {type(file)}")
+            debug("Orchestrator: Reading %s file (%s)", file_type, type(file))
 
             # Reset file position to beginning
             if hasattr(file, "seek"):
                 file.seek(0)
 
+            # Named CSV files (uploads, CLI paths) skip the Excel attempt
+            if getattr(file, "name", "").lower().endswith(".csv"):
+                df = self.csv_reader.read(file, cancel_token=cancel_token)
+                debug("Orchestrator: Read CSV %s file with %d rows", file_type, len(df))
+                return df
+
             # Try to read as Excel first
             if file_type == "template":
-                df = self.excel_reader.read(file)
+                df = self.excel_reader.read(file, cancel_token=cancel_token)
             else:  # bulk
                 df = self.excel_reader.read(
-                    file, sheet_name="Sponsored Products Campaigns"
+                    file,
+                    sheet_name="Sponsored Products Campaigns",
+                    cancel_token=cancel_token,
                 )
 
-            print(
-                f"DEBUG: Successfully read {file_type} file with {len(df) if df is not None else 0} rows"
+            debug(
+                "Orchestrator: Successfully read %s file with %d rows",
+                file_type,
+                len(df) if df is not None else 0,
             )
             return df
 
+        except ProcessingCancelledError:
+            raise
         except Exception as e:
             print(f"ERROR: Failed to read {file_type} file: {e}")
             import traceback
@@ -236,10 +330,10 @@ class Orchestrator:
 
             # Try CSV as fallback
             try:
-                print(f"DEBUG: Trying to read as CSV")
+                debug("Orchestrator: Trying to read as CSV")
                 file.seek(0)
-                df = self.csv_reader.read(file)
-                print(f"DEBUG: Successfully read CSV with {len(df)} rows")
+                df = self.csv_reader.read(file, cancel_token=cancel_token)
+                debug("Orchestrator: Successfully read CSV with %d rows", len(df))
                 return df
             except Exception as csv_error:
                 print(f"ERROR: CSV read also failed: {csv_error}")
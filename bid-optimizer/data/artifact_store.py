@@ -0,0 +1,267 @@
+"""
+Artifact Store
+Keeps generated output files on disk with TTL cleanup, so session state
+only needs to hold small artifact IDs instead of file bytes
+"""
+
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Optional
+
+from utils.file_utils import get_private_temp_dir, is_owned_file, make_private_dir
+
+
+class ArtifactNotFoundError(Exception):
+    """Raised when an artifact does not exist or has expired"""
+
+    pass
+
+
+class ArtifactStore:
+    """Disk-backed store for downloadable artifacts"""
+
+    # Artifacts not accessed for this long are deleted
+    DEFAULT_TTL_SECONDS = 2 * 60 * 60  # 2 hours
+
+    # Minimum time between two expiry sweeps
+    CLEANUP_INTERVAL_SECONDS = 60
+
+    META_FILENAME = "meta.json"
+
+    def __init__(
+        self, root_dir: Optional[str] = None, ttl_seconds: int = DEFAULT_TTL_SECONDS
+    ):
+        """
+        Initialize artifact store
+
+        Args:
+            root_dir: Directory for artifacts (default: a directory of
+                this user in the system temp dir)
+            ttl_seconds: Idle time after which artifacts are deleted
+
+        Raises:
+            PermissionError: If root_dir belongs to another user or cannot
+                be made private - objects are unpickled from it
+        """
+        self.root_dir = root_dir or get_private_temp_dir("bid_optimizer_artifacts")
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+        make_private_dir(self.root_dir)
+
+    def put_file(self, path: str, filename: str, move: bool = True) -> str:
+        """
+        Add an existing file to the store
+
+        Args:
+            path: Path of the file to store
+            filename: Download filename to remember with the artifact
+            move: Move the file into the store (default) instead of copying
+
+        Returns:
+            Artifact ID
+        """
+        artifact_id, artifact_dir = self._new_artifact_dir()
+        data_path = os.path.join(artifact_dir, "data")
+
+        if move:
+            shutil.move(path, data_path)
+        else:
+            shutil.copyfile(path, data_path)
+
+        self._write_meta(artifact_dir, filename, os.path.getsize(data_path))
+        self.cleanup_expired()
+
+        return artifact_id
+
+    def put_bytes(self, data: bytes, filename: str) -> str:
+        """
+        Add in-memory content to the store
+
+        Args:
+            data: File content
+            filename: Download filename to remember with the artifact
+
+        Returns:
+            Artifact ID
+        """
+        artifact_id, artifact_dir = self._new_artifact_dir()
+
+        with open(os.path.join(artifact_dir, "data"), "wb") as f:
+            f.write(data)
+
+        self._write_meta(artifact_dir, filename, len(data))
+        self.cleanup_expired()
+
+        return artifact_id
+
+    def put_object(self, obj: Any, name: str) -> str:
+        """
+        Add a picklable object (e.g. a dict of DataFrames) to the store
+
+        Args:
+            obj: Object to store
+            name: Name to remember with the artifact
+
+        Returns:
+            Artifact ID
+        """
+        return self.put_bytes(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), name)
+
+    def get_object(self, artifact_id: str) -> Any:
+        """
+        Load an object stored with put_object
+
+        Raises:
+            ArtifactNotFoundError: If the artifact does not exist or expired
+            PermissionError: If another user owns the artifact file
+        """
+        with self.open(artifact_id) as f:
+            # Unpickling runs code - only load files this user wrote
+            if not is_owned_file(f):
+                raise PermissionError(f"Artifact not owned by this user: {artifact_id}")
+            return pickle.load(f)
+
+    def open(self, artifact_id: str) -> BinaryIO:
+        """
+        Open an artifact for streaming and refresh its TTL
+
+        Args:
+            artifact_id: Artifact ID
+
+        Returns:
+            Binary file object - caller must close it
+
+        Raises:
+            ArtifactNotFoundError: If the artifact does not exist or expired
+        """
+        path = self.get_path(artifact_id)
+        self._touch(artifact_id)
+        return open(path, "rb")
+
+    def get_path(self, artifact_id: str) -> str:
+        """
+        Get the on-disk path of an artifact
+
+        Raises:
+            ArtifactNotFoundError: If the artifact does not exist or expired
+        """
+        path = os.path.join(self._artifact_dir(artifact_id), "data")
+        if not os.path.exists(path):
+            raise ArtifactNotFoundError(f"Artifact not found: {artifact_id}")
+        return path
+
+    def get_info(self, artifact_id: str) -> Dict[str, Any]:
+        """
+        Get artifact metadata (filename, size_bytes, created)
+
+        Raises:
+            ArtifactNotFoundError: If the artifact does not exist or expired
+        """
+        meta_path = os.path.join(self._artifact_dir(artifact_id), self.META_FILENAME)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise ArtifactNotFoundError(f"Artifact not found: {artifact_id}")
+
+    def exists(self, artifact_id: str) -> bool:
+        """Check if an artifact is still available"""
+        return os.path.exists(os.path.join(self._artifact_dir(artifact_id), "data"))
+
+    def delete(self, artifact_id: str):
+        """Delete an artifact (no error if already gone)"""
+        shutil.rmtree(self._artifact_dir(artifact_id), ignore_errors=True)
+
+    def cleanup_expired(self, force: bool = False) -> int:
+        """
+        Delete artifacts idle for longer than the TTL
+
+        Sweeps run at most once per CLEANUP_INTERVAL_SECONDS unless forced.
+
+        Args:
+            force: Sweep even if the last sweep was recent
+
+        Returns:
+            Number of artifacts deleted
+        """
+        now = time.time()
+
+        with self._lock:
+            if not force and now - self._last_cleanup < self.CLEANUP_INTERVAL_SECONDS:
+                return 0
+            self._last_cleanup = now
+
+        deleted = 0
+        for artifact_id in os.listdir(self.root_dir):
+            artifact_dir = self._artifact_dir(artifact_id)
+            meta_path = os.path.join(artifact_dir, self.META_FILENAME)
+            try:
+                # mtime of meta.json is refreshed on every access
+                idle = now - os.path.getmtime(meta_path)
+            except OSError:
+                # Half-written artifact - use the directory age instead
+                try:
+                    idle = now - os.path.getmtime(artifact_dir)
+                except OSError:
+                    continue
+
+            if idle > self.ttl_seconds:
+                shutil.rmtree(artifact_dir, ignore_errors=True)
+                deleted += 1
+
+        return deleted
+
+    def _new_artifact_dir(self):
+        """Create a directory for a new artifact"""
+        artifact_id = uuid.uuid4().hex
+        artifact_dir = self._artifact_dir(artifact_id)
+        os.makedirs(artifact_dir)
+        return artifact_id, artifact_dir
+
+    def _artifact_dir(self, artifact_id: str) -> str:
+        """Get directory of an artifact (IDs are hex, no path separators)"""
+        return os.path.join(self.root_dir, os.path.basename(artifact_id))
+
+    def _write_meta(self, artifact_dir: str, filename: str, size_bytes: int):
+        """Write artifact metadata"""
+        meta = {
+            "filename": filename,
+            "size_bytes": size_bytes,
+            "created": time.time(),
+        }
+        with open(os.path.join(artifact_dir, self.META_FILENAME), "w") as f:
+            json.dump(meta, f)
+
+    def _touch(self, artifact_id: str):
+        """Refresh the TTL of an artifact"""
+        meta_path = os.path.join(self._artifact_dir(artifact_id), self.META_FILENAME)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+
+# Process-wide store shared by all sessions
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Get the process-wide artifact store
+
+    Returns:
+        Shared ArtifactStore instance
+    """
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore()
+        return _artifact_store
@@ -0,0 +1,397 @@
+"""
+Bid History
+Local SQLite store of every run's bids and performance per Keyword and
+Product Targeting ID, so optimizations can look at trends across runs
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import closing
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from data.writers.output_writer import OutputWriter
+from utils.instrumentation import debug
+
+# Environment switch for the database path (set it empty to disable)
+HISTORY_DB_ENV_VAR = "BID_OPTIMIZER_HISTORY_DB"
+
+
+class BidHistoryStore:
+    """
+    Per-run bid history, one row per entity and run
+
+    Rows are keyed by (entity_id, entity, run_id), so the primary key
+    doubles as the per-entity time-series index and every run is kept,
+    several on the same date included. The database runs in WAL mode, so
+    sessions and batch workers can append while others read.
+    """
+
+    DEFAULT_PATH = os.path.join(
+        os.path.expanduser("~"), ".bid_optimizer", "bid_history.sqlite3"
+    )
+
+    # Entities recorded, and the bulk column holding each one's ID
+    ENTITY_ID_COLUMNS = {
+        "Keyword": "Keyword ID",
+        "Product Targeting": "Product Targeting ID",
+    }
+
+    # History column -> bulk column
+    TEXT_COLUMNS = {
+        "campaign_id": "Campaign ID",
+        "ad_group_id": "Ad Group ID",
+        "portfolio": "Portfolio Name (Informational only)",
+    }
+    NUMBER_COLUMNS = {
+        "units": "Units",
+        "clicks": "Clicks",
+        "spend": "Spend",
+    }
+
+    COLUMNS = (
+        ["entity", "entity_id", "run_date", "run_id"]
+        + list(TEXT_COLUMNS)
+        + ["old_bid", "bid"]
+        + list(NUMBER_COLUMNS)
+        + ["recorded_at"]
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bid_history (
+            entity TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            run_date TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            campaign_id TEXT,
+            ad_group_id TEXT,
+            portfolio TEXT,
+            old_bid REAL,
+            bid REAL,
+            units REAL,
+            clicks REAL,
+            spend REAL,
+            recorded_at TEXT NOT NULL,
+            PRIMARY KEY (entity_id, entity, run_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS bid_history_run_date
+            ON bid_history (run_date);
+    """
+
+    # Bound parameters per IN (...) query, below SQLite's limit
+    QUERY_CHUNK_SIZE = 900
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize bid history
+
+        Args:
+            path: SQLite database file, "" to disable (default:
+                BID_OPTIMIZER_HISTORY_DB or ~/.bid_optimizer/bid_history.sqlite3)
+        """
+        if path is None:
+            path = os.environ.get(HISTORY_DB_ENV_VAR, self.DEFAULT_PATH)
+        self.path = path
+        self.output_writer = OutputWriter()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether runs are recorded at all"""
+        return bool(self.path)
+
+    def record_run(
+        self,
+        bulk_df: pd.DataFrame,
+        clean_sheets: Optional[Dict[str, pd.DataFrame]] = None,
+        run_date: Optional[date] = None,
+        new_bids: Optional[pd.DataFrame] = None,
+    ) -> int:
+        """
+        Append a run's Keyword and Product Targeting rows
+
+        Args:
+            bulk_df: Cleaned bulk DataFrame of the run (bids before, units,
+                clicks and spend)
+            clean_sheets: Clean sheets of the run - their Bid is the new
+                bid of the entities they contain; the rest keep theirs
+            run_date: Date to record the run under (default: today)
+            new_bids: New bids as from get_new_bids, instead of clean_sheets
+                (e.g. kept with a cached result)
+
+        Returns:
+            Number of rows recorded
+
+        Raises:
+            sqlite3.Error: If the database cannot be written
+        """
+        if not self.enabled:
+            return 0
+
+        if new_bids is None:
+            new_bids = self.get_new_bids(clean_sheets or {})
+        history_df = self._build_rows(bulk_df, new_bids)
+        if history_df.empty:
+            return 0
+
+        history_df["run_date"] = (run_date or date.today()).isoformat()
+        history_df["run_id"] = uuid.uuid4().hex
+        history_df["recorded_at"] = datetime.now().isoformat()
+        rows = history_df[self.COLUMNS].astype(object)
+        rows = rows.where(rows.notna(), None)
+
+        placeholders = ", ".join("?" * len(self.COLUMNS))
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT INTO bid_history ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                rows.to_numpy().tolist(),
+            )
+
+        debug(
+            "BidHistory: Recorded %d rows for %s",
+            len(rows),
+            history_df["run_date"].iat[0],
+        )
+        return len(rows)
+
+    def get_new_bids(self, clean_sheets: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Get the new bids a run's Clean sheets set
+
+        Args:
+            clean_sheets: Clean sheets of the run
+
+        Returns:
+            DataFrame with entity, entity_id and bid - one row per entity,
+            later sheets win, like uploads
+        """
+        sheet_frames = [self._entity_frame(df) for df in clean_sheets.values()]
+        sheet_frames = [frame for frame in sheet_frames if not frame.empty]
+        if not sheet_frames:
+            return pd.DataFrame(columns=["entity", "entity_id", "bid"])
+
+        new_bids = pd.concat(sheet_frames, ignore_index=True)
+        new_bids = new_bids.drop_duplicates(["entity", "entity_id"], keep="last")
+        return new_bids[["entity", "entity_id", "Bid"]].rename(columns={"Bid": "bid"})
+
+    def get_history(
+        self,
+        entity_ids: Optional[Iterable[Any]] = None,
+        entity: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> pd.DataFrame:
+        """
+        Get the time series of entities
+
+        Args:
+            entity_ids: Keyword / Product Targeting IDs (default: all)
+            entity: "Keyword" or "Product Targeting" (default: both)
+            start_date: First run date to include (optional)
+            end_date: Last run date to include (optional)
+
+        Returns:
+            DataFrame with COLUMNS, sorted by entity, entity_id and run
+            (run_date, then recorded_at)
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return pd.DataFrame(columns=self.COLUMNS)
+
+        conditions, params = [], []
+        if entity is not None:
+            conditions.append("entity = ?")
+            params.append(entity)
+        if start_date is not None:
+            conditions.append("run_date >= ?")
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            conditions.append("run_date <= ?")
+            params.append(end_date.isoformat())
+
+        if entity_ids is None:
+            id_chunks: List[Optional[List[str]]] = [None]
+        else:
+            ids = sorted(set(self._format_ids(entity_ids)))
+            if not ids:
+                return pd.DataFrame(columns=self.COLUMNS)
+            id_chunks = [
+                ids[i : i + self.QUERY_CHUNK_SIZE]
+                for i in range(0, len(ids), self.QUERY_CHUNK_SIZE)
+            ]
+
+        frames = []
+        with closing(self._connect()) as conn:
+            for chunk in id_chunks:
+                chunk_conditions = list(conditions)
+                chunk_params = list(params)
+                if chunk is not None:
+                    chunk_conditions.append(
+                        f"entity_id IN ({', '.join('?' * len(chunk))})"
+                    )
+                    chunk_params.extend(chunk)
+                where = (
+                    f"WHERE {' AND '.join(chunk_conditions)}"
+                    if chunk_conditions
+                    else ""
+                )
+                frames.append(
+                    pd.read_sql_query(
+                        f"SELECT {', '.join(self.COLUMNS)} FROM bid_history "
+                        f"{where} ORDER BY entity, entity_id, run_date, recorded_at",
+                        conn,
+                        params=chunk_params,
+                    )
+                )
+
+        if len(frames) == 1:
+            return frames[0]
+        return (
+            pd.concat(frames, ignore_index=True)
+            .sort_values(["entity", "entity_id", "run_date", "recorded_at"])
+            .reset_index(drop=True)
+        )
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get history usage
+
+        Returns:
+            Dictionary with path, enabled, rows, entities, runs and
+            first/last run date
+        """
+        info = {
+            "path": self.path,
+            "enabled": self.enabled,
+            "rows": 0,
+            "entities": 0,
+            "runs": 0,
+            "first_run_date": None,
+            "last_run_date": None,
+        }
+        if not self.enabled or not os.path.exists(self.path):
+            return info
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT entity || ':' || entity_id), "
+                "COUNT(DISTINCT run_id), MIN(run_date), MAX(run_date) "
+                "FROM bid_history"
+            ).fetchone()
+        info.update(
+            zip(
+                ["rows", "entities", "runs", "first_run_date", "last_run_date"],
+                row,
+            )
+        )
+        return info
+
+    def _build_rows(
+        self, bulk_df: pd.DataFrame, new_bids: pd.DataFrame
+    ) -> pd.DataFrame:
+        """One history row per Keyword / Product Targeting entity of the bulk"""
+        history_df = self._entity_frame(bulk_df)
+        if history_df.empty:
+            return history_df
+
+        history_df = history_df.drop_duplicates(["entity", "entity_id"], keep="last")
+        history_df = history_df.merge(new_bids, on=["entity", "entity_id"], how="left")
+        history_df["old_bid"] = pd.to_numeric(history_df["Bid"], errors="coerce")
+        history_df["bid"] = pd.to_numeric(history_df["bid"], errors="coerce")
+        history_df["bid"] = history_df["bid"].fillna(history_df["old_bid"])
+
+        for column, bulk_column in self.TEXT_COLUMNS.items():
+            history_df[column] = (
+                history_df[bulk_column] if bulk_column in history_df.columns else None
+            )
+        for column, bulk_column in self.NUMBER_COLUMNS.items():
+            history_df[column] = (
+                pd.to_numeric(history_df[bulk_column], errors="coerce")
+                if bulk_column in history_df.columns
+                else None
+            )
+
+        return history_df
+
+    def _entity_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Keyword / Product Targeting rows of df with entity and entity_id"""
+        if "Entity" not in df.columns or "Bid" not in df.columns:
+            return pd.DataFrame(columns=["entity", "entity_id", "Bid"])
+
+        frames = []
+        for entity, id_column in self.ENTITY_ID_COLUMNS.items():
+            if id_column not in df.columns:
+                continue
+            rows = df[df["Entity"] == entity]
+            if rows.empty:
+                continue
+            # IDs as text, the way the output files write them
+            rows = self.output_writer.prepare_sheet(rows)
+            rows = rows[rows[id_column].notna()]
+            frames.append(rows.assign(entity=entity, entity_id=rows[id_column]))
+
+        if not frames:
+            return pd.DataFrame(columns=["entity", "entity_id", "Bid"])
+        return pd.concat(frames)
+
+    def _format_ids(self, entity_ids: Iterable[Any]) -> List[str]:
+        """Render IDs the way stored IDs are rendered"""
+        ids_df = pd.DataFrame({"Keyword ID": list(entity_ids)})
+        return self.output_writer.prepare_sheet(ids_df)["Keyword ID"].tolist()
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Re-key a history from before run IDs - it kept one run per date"""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(bid_history)")]
+        if not columns or "run_id" in columns:
+            return
+
+        debug("BidHistory: Adding run IDs to %s", self.path)
+        old_columns = [column for column in self.COLUMNS if column != "run_id"]
+        conn.executescript(f"""
+            BEGIN;
+            ALTER TABLE bid_history RENAME TO bid_history_by_date;
+            DROP INDEX IF EXISTS bid_history_run_date;
+            {self.SCHEMA}
+            INSERT INTO bid_history ({', '.join(old_columns)}, run_id)
+                SELECT {', '.join(old_columns)}, run_date FROM bid_history_by_date;
+            DROP TABLE bid_history_by_date;
+            COMMIT;
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the database on first use"""
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    directory = os.path.dirname(os.path.abspath(self.path))
+                    os.makedirs(directory, exist_ok=True)
+                    with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        self._migrate(conn)
+                        conn.executescript(self.SCHEMA)
+                    self._initialized = True
+        return sqlite3.connect(self.path, timeout=30)
+
+
+# Process-wide store
+_bid_history = None
+_bid_history_lock = threading.Lock()
+
+
+def get_bid_history() -> BidHistoryStore:
+    """
+    Get the process-wide bid history
+
+    Returns:
+        Shared BidHistoryStore instance
+    """
+    global _bid_history
+    with _bid_history_lock:
+        if _bid_history is None:
+            _bid_history = BidHistoryStore()
+        return _bid_history
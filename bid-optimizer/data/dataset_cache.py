@@ -0,0 +1,269 @@
+"""
+Dataset Cache
+Keeps parsed uploads in memory once per server process, keyed by the hash
+of the uploaded files, so sessions working on the same account share one
+copy and session state only holds the key
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.instrumentation import debug
+
+# Environment switch for the memory budget in MB
+MEMORY_BUDGET_ENV_VAR = "BID_OPTIMIZER_DATASET_CACHE_MB"
+
+
+class DatasetCache:
+    """
+    Process-wide, memory-bounded store of immutable parsed datasets
+
+    A dataset is stored once under its key; sessions acquire it as owners
+    and release it when they move on. When the datasets outgrow the memory
+    budget, the least recently used ones no session holds are evicted.
+    Held datasets are never evicted, so the budget is only exceeded while
+    sessions hold more than it. Streamlit does not report closed sessions,
+    so an owner that has not touched a dataset for lease_ttl_seconds no
+    longer counts.
+
+    Datasets are shared between sessions and threads: never modify their
+    DataFrames in place.
+    """
+
+    DEFAULT_MEMORY_BUDGET_MB = 1024
+
+    # Owners idle for this long no longer hold their datasets
+    DEFAULT_LEASE_TTL_SECONDS = 2 * 60 * 60  # 2 hours
+
+    def __init__(
+        self,
+        memory_budget_mb: Optional[float] = None,
+        lease_ttl_seconds: int = DEFAULT_LEASE_TTL_SECONDS,
+    ):
+        """
+        Initialize cache
+
+        Args:
+            memory_budget_mb: Estimated size of all datasets before eviction
+                (default: BID_OPTIMIZER_DATASET_CACHE_MB or 1024)
+            lease_ttl_seconds: Idle time after which an owner is dropped
+        """
+        if memory_budget_mb is None:
+            memory_budget_mb = float(
+                os.environ.get(MEMORY_BUDGET_ENV_VAR, self.DEFAULT_MEMORY_BUDGET_MB)
+            )
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.lease_ttl_seconds = lease_ttl_seconds
+
+        # key -> {"dataset", "size_bytes", "owners": {owner: last access}},
+        # least recently used first
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a dataset key from the content it is parsed from
+
+        Args:
+            *parts: bytes or str values (e.g. file names and contents)
+
+        Returns:
+            Hex SHA-256 of all parts
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part.encode("utf-8") if isinstance(part, str) else bytes(part)
+            # Length prefix so ("ab", "c") and ("a", "bc") differ
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str, owner: Optional[str] = None) -> Optional[Any]:
+        """
+        Get a dataset
+
+        Args:
+            key: Dataset key
+            owner: Session acquiring the dataset (optional)
+
+        Returns:
+            The dataset, or None if it was never stored or was evicted
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+            self._entries.move_to_end(key)
+            if owner is not None:
+                entry["owners"][owner] = time.time()
+            return entry["dataset"]
+
+    def put(self, key: str, dataset: Any, owner: Optional[str] = None) -> Any:
+        """
+        Store a dataset
+
+        If another session stored the same key meanwhile, that dataset is
+        kept and returned, so both sessions share it.
+
+        Args:
+            key: Dataset key (see make_key)
+            dataset: DataFrame or dict/list of DataFrames and plain values
+            owner: Session acquiring the dataset (optional)
+
+        Returns:
+            The stored dataset
+        """
+        # Measured outside the lock - deep sizes scan string columns
+        size_bytes = estimate_size(dataset)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"dataset": dataset, "size_bytes": size_bytes, "owners": {}}
+                self._entries[key] = entry
+                self._size_bytes += size_bytes
+                debug(
+                    "DatasetCache: Stored %s (%.1f MB, %.1f MB total)",
+                    key[:12],
+                    size_bytes / (1024 * 1024),
+                    self._size_bytes / (1024 * 1024),
+                )
+            else:
+                self._entries.move_to_end(key)
+            if owner is not None:
+                entry["owners"][owner] = time.time()
+
+            self._evict(keep=key)
+            return entry["dataset"]
+
+    def release(self, key: str, owner: str):
+        """
+        Release a session's hold on a dataset
+
+        The dataset stays cached for other sessions until evicted.
+
+        Args:
+            key: Dataset key
+            owner: Session releasing the dataset
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["owners"].pop(owner, None)
+
+    def discard(self, key: str):
+        """Remove a dataset (no error if already gone)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size_bytes -= entry["size_bytes"]
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get cache usage
+
+        Returns:
+            Dictionary with datasets, size_mb, budget_mb, hits, misses,
+            evictions and per-dataset size_mb and owners
+        """
+        with self._lock:
+            self._expire_leases()
+            return {
+                "datasets": len(self._entries),
+                "size_mb": round(self._size_bytes / (1024 * 1024), 1),
+                "budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1),
+                **self.stats,
+                "entries": {
+                    key: {
+                        "size_mb": round(entry["size_bytes"] / (1024 * 1024), 1),
+                        "owners": len(entry["owners"]),
+                    }
+                    for key, entry in self._entries.items()
+                },
+            }
+
+    def _evict(self, keep: str):
+        """Evict least recently used unheld datasets until within the budget"""
+        if self._size_bytes <= self.memory_budget_bytes:
+            return
+
+        self._expire_leases()
+        unheld = [key for key, entry in self._entries.items() if not entry["owners"]]
+
+        for key in unheld:
+            if self._size_bytes <= self.memory_budget_bytes:
+                break
+            # The dataset just stored stays, even if it alone is too big
+            if key == keep:
+                continue
+            entry = self._entries.pop(key)
+            self._size_bytes -= entry["size_bytes"]
+            self.stats["evictions"] += 1
+            debug(
+                "DatasetCache: Evicted %s (%.1f MB)",
+                key[:12],
+                entry["size_bytes"] / (1024 * 1024),
+            )
+
+    def _expire_leases(self):
+        """Drop owners idle for longer than the lease TTL"""
+        cutoff = time.time() - self.lease_ttl_seconds
+        for entry in self._entries.values():
+            for owner, last_access in list(entry["owners"].items()):
+                if last_access < cutoff:
+                    del entry["owners"][owner]
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Estimate the memory of a dataset in bytes
+
+    Args:
+        obj: DataFrame, Series, or dict/list/tuple of them and plain values
+
+    Returns:
+        Estimated size in bytes
+    """
+    # No DataFrames exist before pandas is loaded - don't load it to find out
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if pd is not None and isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(key) + estimate_size(value) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+# Process-wide cache shared by all sessions
+_dataset_cache = None
+_dataset_cache_lock = threading.Lock()
+
+
+def get_dataset_cache() -> DatasetCache:
+    """
+    Get the process-wide dataset cache
+
+    Returns:
+        Shared DatasetCache instance
+    """
+    global _dataset_cache
+    with _dataset_cache_lock:
+        if _dataset_cache is None:
+            _dataset_cache = DatasetCache()
+        return _dataset_cache
@@ -7,6 +7,12 @@ import pandas as pd
 from io import BytesIO, StringIO
 from typing import Optional, List
 
+from utils.cancellation import (
+    CancellationToken,
+    ProcessingCancelledError,
+    check_cancelled,
+)
+
 
 class CSVReader:
     """Reads CSV files with automatic encoding detection"""
@@ -77,7 +83,11 @@ class CSVReader:
         self.detected_encoding = None
 
     def read(
-        self, file: BytesIO, file_type: str = "auto", encoding: Optional[str] = None
+        self,
+        file: BytesIO,
+        file_type: str = "auto",
+        encoding: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> pd.DataFrame:
         """
         Read CSV file and return DataFrame
@@ -86,6 +96,7 @@ class CSVReader:
             file: File buffer
             file_type: 'template', 'bulk', or 'auto' (auto-detect)
             encoding: File encoding (optional, will auto-detect if not provided)
+            cancel_token: Checked before and after parsing (optional)
 
         Returns:
             DataFrame with file contents
@@ -98,6 +109,8 @@ class CSVReader:
         self.errors = []
         self.warnings = []
 
+        check_cancelled(cancel_token)
+
         # Check file size
         file_content = file.getvalue()
         file_size = len(file_content)
@@ -122,6 +135,7 @@ class CSVReader:
 
             # Read CSV from string
             df = pd.read_csv(StringIO(text_content))
+            check_cancelled(cancel_token)
 
             # Check if empty
             if df.empty:
@@ -161,7 +175,9 @@ class CSVReader:
             # Try with different encoding
             if encoding != "latin-1":
                 self.warnings.append(f"Failed with {encoding}, trying latin-1")
-                return self.read(file, file_type, encoding="latin-1")
+                return self.read(
+                    file, file_type, encoding="latin-1", cancel_token=cancel_token
+                )
             raise FileReadError(f"Cannot decode CSV file: {str(e)}")
 
         except pd.errors.ParserError as e:
@@ -176,6 +192,7 @@ class CSVReader:
                     TooManyRowsError,
                     MissingColumnsError,
                     WrongColumnOrderError,
+                    ProcessingCancelledError,
                 ),
             ):
                 raise  # Re-raise our custom exceptions
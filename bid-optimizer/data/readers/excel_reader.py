@@ -6,7 +6,12 @@ Reads real Excel files for Template and Bulk data
 import pandas as pd
 from io import BytesIO
 from typing import Optional, List, Dict, Any
-import openpyxl
+
+from utils.cancellation import (
+    CancellationToken,
+    ProcessingCancelledError,
+    check_cancelled,
+)
 
 
 class ExcelReader:
@@ -80,7 +85,11 @@ class ExcelReader:
         self.warnings = []
 
     def read(
-        self, file: BytesIO, file_type: str = "auto", sheet_name: Optional[str] = None
+        self,
+        file: BytesIO,
+        file_type: str = "auto",
+        sheet_name: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> pd.DataFrame:
         """
         Read Excel file and return DataFrame
@@ -89,6 +98,7 @@ class ExcelReader:
             file: File buffer
             file_type: 'template', 'bulk', or 'auto' (auto-detect)
             sheet_name: Specific sheet to read (optional)
+            cancel_token: Checked before and after parsing (optional)
 
         Returns:
             DataFrame with file contents
@@ -101,6 +111,8 @@ class ExcelReader:
         self.errors = []
         self.warnings = []
 
+        check_cancelled(cancel_token)
+
         # Check file size
         file_size = len(file.getvalue())
         if file_size > self.MAX_FILE_SIZE:
@@ -143,6 +155,7 @@ class ExcelReader:
 
             # Read the selected sheet
             df = pd.read_excel(file, sheet_name=sheet_to_read)
+            check_cancelled(cancel_token)
 
             # Check if empty
             if df.empty:
@@ -173,6 +186,7 @@ class ExcelReader:
                     EmptyFileError,
                     TooManyRowsError,
                     MissingColumnsError,
+                    ProcessingCancelledError,
                 ),
             ):
                 raise  # Re-raise our custom exceptions
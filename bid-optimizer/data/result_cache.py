@@ -0,0 +1,400 @@
+"""
+Result Cache
+Keeps generated output files and their stats on disk, keyed by everything
+that determines them, so repeating a run returns the files it wrote before
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.writers.writer_scheduler import OutputFileHandle
+from utils.file_utils import get_private_temp_dir, is_owned_file, make_private_dir
+from utils.instrumentation import debug
+
+# Environment switches for the size budget in MB (0 disables the cache)
+# and the cache directory
+MAX_SIZE_ENV_VAR = "BID_OPTIMIZER_RESULT_CACHE_MB"
+CACHE_DIR_ENV_VAR = "BID_OPTIMIZER_RESULT_CACHE_DIR"
+
+
+class ResultCache:
+    """
+    Disk-backed, size-bounded LRU cache of output files
+
+    Every entry is a directory named by its key holding the files, a pickle
+    of accompanying data (stats, deferred sheets) and meta.json, whose mtime
+    is refreshed on every hit. Files move in and out as hard links where
+    the filesystem allows, so a hit costs no rewrite and callers may delete
+    or move the files they get. Entries are published with an atomic
+    rename, so processes can share one cache directory.
+    """
+
+    DEFAULT_MAX_SIZE_MB = 2048
+
+    META_FILENAME = "meta.json"
+    DATA_FILENAME = "data.pkl"
+
+    def __init__(self, root_dir: Optional[str] = None, max_size_mb: float = None):
+        """
+        Initialize result cache
+
+        Args:
+            root_dir: Directory for entries (default:
+                BID_OPTIMIZER_RESULT_CACHE_DIR or a directory of this user
+                in the system temp dir)
+            max_size_mb: Size of all entries before the least recently
+                used are evicted, 0 to disable (default:
+                BID_OPTIMIZER_RESULT_CACHE_MB or 2048)
+
+        Raises:
+            PermissionError: If root_dir belongs to another user or cannot
+                be made private - entries are unpickled from it
+        """
+        if max_size_mb is None:
+            max_size_mb = float(
+                os.environ.get(MAX_SIZE_ENV_VAR, self.DEFAULT_MAX_SIZE_MB)
+            )
+        self.root_dir = (
+            root_dir
+            or os.environ.get(CACHE_DIR_ENV_VAR)
+            or get_private_temp_dir("bid_optimizer_results")
+        )
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        if self.enabled:
+            make_private_dir(self.root_dir)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all"""
+        return self.max_size_bytes > 0
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """
+        Build an entry key
+
+        Args:
+            **parts: JSON-serializable values (hashes, names, options)
+
+        Returns:
+            Hex SHA-256 of the parts
+        """
+        data = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def contains(self, key: str) -> bool:
+        """Check if an entry exists (without counting a hit or miss)"""
+        return self.enabled and os.path.exists(
+            os.path.join(self._entry_dir(key), self.META_FILENAME)
+        )
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, OutputFileHandle], Any]]:
+        """
+        Get a cached result
+
+        Args:
+            key: Entry key (see make_key)
+
+        Returns:
+            Tuple of (files, data) with files as new OutputFileHandle
+            objects the caller owns, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self._entry_dir(key)
+        handles = {}
+        paths = []
+        try:
+            with open(os.path.join(entry_dir, self.META_FILENAME)) as f:
+                meta = json.load(f)
+            with open(os.path.join(entry_dir, self.DATA_FILENAME), "rb") as f:
+                # Unpickling runs code - only load files this user wrote
+                if not is_owned_file(f):
+                    raise PermissionError(f"Entry not owned by this user: {key}")
+                data = pickle.load(f)
+
+            for name, info in meta["files"].items():
+                path = self._new_temp_path(name, info["extension"])
+                paths.append(path)
+                _link_or_copy(os.path.join(entry_dir, info["stored_as"]), path)
+                handles[name] = OutputFileHandle(
+                    path, info["file_format"], info["sheet_names"], info["manifest"]
+                )
+
+            # Refresh the LRU position
+            os.utime(os.path.join(entry_dir, self.META_FILENAME))
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+            # Missing, evicted while reading, or not ours
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self.stats["hits"] += 1
+        debug("ResultCache: Hit %s", key[:12])
+        return handles, data
+
+    def put(self, key: str, files: Dict[str, OutputFileHandle], data: Any = None):
+        """
+        Store a result
+
+        The files stay where they are - the cache keeps its own links or
+        copies. Results larger than the whole budget are not stored.
+
+        Args:
+            key: Entry key (see make_key)
+            files: Output files by name
+            data: Picklable data returned with the files (e.g. stats)
+        """
+        if not self.enabled:
+            return
+
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        size_bytes = len(payload) + sum(handle.size_bytes for handle in files.values())
+        if size_bytes > self.max_size_bytes:
+            debug("ResultCache: Result %s too large to cache", key[:12])
+            return
+
+        # Build the entry aside, then publish it in one rename
+        staging_dir = os.path.join(self.root_dir, f".staging-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(staging_dir)
+            meta_files = {}
+            for index, (name, handle) in enumerate(files.items()):
+                stored_as = f"file{index}.{handle.extension}"
+                _link_or_copy(handle.path, os.path.join(staging_dir, stored_as))
+                meta_files[name] = {
+                    "stored_as": stored_as,
+                    "extension": handle.extension,
+                    "file_format": handle.file_format,
+                    "sheet_names": handle.sheet_names,
+                    "manifest": handle.manifest,
+                }
+            with open(os.path.join(staging_dir, self.DATA_FILENAME), "wb") as f:
+                f.write(payload)
+            with open(os.path.join(staging_dir, self.META_FILENAME), "w") as f:
+                json.dump(
+                    {
+                        "files": meta_files,
+                        "size_bytes": size_bytes,
+                        "created": time.time(),
+                    },
+                    f,
+                    default=str,
+                )
+            os.rename(staging_dir, self._entry_dir(key))
+        except OSError as e:
+            # Another process stored the same key first, or the disk is full
+            debug("ResultCache: Not storing %s (%s)", key[:12], e)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return
+
+        with self._lock:
+            self.stats["stores"] += 1
+        debug("ResultCache: Stored %s (%.1f MB)", key[:12], size_bytes / (1024 * 1024))
+        self._evict(keep=key)
+
+    def discard(self, key: str):
+        """Remove an entry (no error if already gone)"""
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get cache usage
+
+        Returns:
+            Dictionary with entries, size_mb, budget_mb, hits, misses,
+            stores and evictions
+        """
+        entries = self._list_entries()
+        return {
+            "entries": len(entries),
+            "size_mb": round(sum(size for _, size, _ in entries) / (1024 * 1024), 1),
+            "budget_mb": round(self.max_size_bytes / (1024 * 1024), 1),
+            **self.stats,
+        }
+
+    def _evict(self, keep: str):
+        """Delete least recently used entries until within the budget"""
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+
+        for key, size_bytes, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_size_bytes:
+                break
+            if key == keep:
+                continue
+            self.discard(key)
+            total -= size_bytes
+            with self._lock:
+                self.stats["evictions"] += 1
+            debug("ResultCache: Evicted %s", key[:12])
+
+    def _list_entries(self) -> List[Tuple[str, int, float]]:
+        """(key, size_bytes, last_access) of every complete entry"""
+        entries = []
+        for key in os.listdir(self.root_dir) if self.enabled else []:
+            meta_path = os.path.join(self.root_dir, key, self.META_FILENAME)
+            try:
+                last_access = os.path.getmtime(meta_path)
+                with open(meta_path) as f:
+                    size_bytes = json.load(f)["size_bytes"]
+            except (OSError, ValueError, KeyError):
+                # Staging directory, or an entry being evicted
+                continue
+            entries.append((key, size_bytes, last_access))
+        return entries
+
+    def _entry_dir(self, key: str) -> str:
+        """Get directory of an entry (keys are hex, no path separators)"""
+        return os.path.join(self.root_dir, os.path.basename(key))
+
+    def _new_temp_path(self, name: str, extension: str) -> str:
+        """Create an empty temp file and return its path"""
+        fd, path = tempfile.mkstemp(
+            prefix=f"bid_optimizer_{name}_", suffix=f".{extension}"
+        )
+        os.close(fd)
+        return path
+
+
+def _link_or_copy(source: str, destination: str):
+    """Hard link a file, or copy it where links are not possible"""
+    try:
+        if os.path.exists(destination):
+            os.remove(destination)
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def hash_dataframe(df: Any) -> Optional[str]:
+    """
+    Hash the content of a DataFrame
+
+    Args:
+        df: DataFrame, or None
+
+    Returns:
+        Hex SHA-256 of columns, dtypes and values ("" for None), or None
+        if a column cannot be hashed
+    """
+    if df is None:
+        return ""
+
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update(
+        repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode()
+    )
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts)
+        return None
+    return digest.hexdigest()
+
+
+# Root of the package - every source file below it is part of the code
+# version, except in these directories
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNVERSIONED_DIRS = {"tests", "__pycache__"}
+
+# Source hashes by file path and modification time
+_source_hashes: Dict[Tuple[str, float], str] = {}
+
+
+def get_code_version(*objects: Any) -> Optional[str]:
+    """
+    Hash the source code results depend on
+
+    Every Python file of the package counts (tests excepted), so editing
+    any module - an imported helper, a constant, a reader - gives a new
+    version. Classes or modules from outside the package (optimization
+    plugins) add their source files and those of their base classes.
+
+    Args:
+        *objects: Classes or modules whose source counts too
+
+    Returns:
+        Hex SHA-256 over the source files, or None if the source of an
+        outside class or module cannot be found
+    """
+    paths = []
+    for dir_path, dir_names, file_names in os.walk(PACKAGE_ROOT):
+        dir_names[:] = sorted(
+            name
+            for name in dir_names
+            if name not in UNVERSIONED_DIRS and not name.startswith(".")
+        )
+        paths.extend(
+            os.path.join(dir_path, name)
+            for name in sorted(file_names)
+            if name.endswith(".py")
+        )
+
+    for obj in objects:
+        classes = inspect.getmro(obj) if inspect.isclass(obj) else [obj]
+        for cls in classes:
+            module = inspect.getmodule(cls)
+            if module is None or module.__name__ == "builtins":
+                continue
+            if module.__name__ in sys.stdlib_module_names:
+                continue
+            path = getattr(module, "__file__", None)
+            if not path or not os.path.exists(path):
+                return None
+            path = os.path.abspath(path)
+            if not path.startswith(PACKAGE_ROOT + os.sep) and path not in paths:
+                paths.append(path)
+
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            source_key = (path, os.path.getmtime(path))
+            if source_key not in _source_hashes:
+                with open(path, "rb") as f:
+                    _source_hashes[source_key] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            # Deleted while walking
+            continue
+        digest.update(os.path.relpath(path, PACKAGE_ROOT).encode("utf-8"))
+        digest.update(_source_hashes[source_key].encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Process-wide cache
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Get the process-wide result cache
+
+    Returns:
+        Shared ResultCache instance
+    """
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
@@ -1,6 +1,7 @@
-import pandas as pd
 from io import BytesIO
 
+from config.constants import TEMPLATE_COLUMNS
+
 
 class TemplateGenerator:
     """Generate empty template file"""
@@ -9,26 +10,35 @@ class TemplateGenerator:
         """
         Create empty template file with required columns
 
+        Written with openpyxl alone - the upload page offers this file on
+        first render, before pandas is needed.
+
         Returns:
             Excel file as bytes
         """
-        # Create empty DataFrame with required columns
-        df = pd.DataFrame(columns=["Portfolio Name", "Base Bid", "Target CPA"])
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, Border, Font, Side
 
-        # Create Excel file in memory
-        output = BytesIO()
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = "Template"
 
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="Template", index=False)
+        # Header row styled like pandas' to_excel header
+        thin = Side(style="thin")
+        for column, name in enumerate(TEMPLATE_COLUMNS, start=1):
+            cell = worksheet.cell(row=1, column=column, value=name)
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal="center", vertical="top")
 
-            # Set column widths
-            worksheet = writer.sheets["Template"]
-            worksheet.column_dimensions["A"].width = 20  # Portfolio Name
-            worksheet.column_dimensions["B"].width = 12  # Base Bid
-            worksheet.column_dimensions["C"].width = 12  # Target CPA
+        # Set column widths
+        worksheet.column_dimensions["A"].width = 20  # Portfolio Name
+        worksheet.column_dimensions["B"].width = 12  # Base Bid
+        worksheet.column_dimensions["C"].width = 12  # Target CPA
 
-        # Return file as bytes
-        output.seek(0)
+        # Create Excel file in memory
+        output = BytesIO()
+        workbook.save(output)
         return output.getvalue()
 
     def create_sample_template(self) -> bytes:
@@ -38,6 +48,8 @@ class TemplateGenerator:
         Returns:
             Excel file with examples
         """
+        import pandas as pd
+
         # Create DataFrame with sample data
         df = pd.DataFrame(
             {
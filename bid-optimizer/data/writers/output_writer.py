@@ -3,13 +3,19 @@ Output Writer
 Writes optimized data to Excel files with proper formatting
 """
 
+import numpy as np
 import pandas as pd
+import time
+import zipfile
 from io import BytesIO
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 import openpyxl
 from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
 
+from utils.cancellation import CancellationToken, check_cancelled
+from utils.instrumentation import span
+
 
 class OutputWriter:
     """Handles writing output Excel files"""
@@ -27,6 +33,17 @@ class OutputWriter:
     # Define uniform column width
     UNIFORM_COLUMN_WIDTH = 15  # Set all columns to same width
 
+    # Supported output formats
+    XLSX_FORMAT = "xlsx"
+    CSV_FORMAT = "csv"  # One CSV per sheet, zipped when there are several
+    OUTPUT_FORMATS = [XLSX_FORMAT, CSV_FORMAT]
+
+    # Upload file size budget - larger sheets are split into parts
+    EXCEL_MAX_ROWS = 1048576  # Excel sheet limit including header row
+    MAX_ROWS_PER_PART = EXCEL_MAX_ROWS - 1
+    MAX_BYTES_PER_PART = 100 * 1024 * 1024  # Estimated uncompressed size
+    SIZE_SAMPLE_ROWS = 1000  # Rows serialized to estimate bytes per row
+
     def __init__(self):
         """Initialize output writer"""
         self.pink_fill = PatternFill(
@@ -45,49 +62,334 @@ class OutputWriter:
         """
         output = BytesIO()
 
-        # Format DataFrames
-        sheets_data_formatted = {}
-        for sheet_name, df in sheets_data.items():
-            df_copy = df.copy()
-
-            # Replace NaN values with empty strings BEFORE any other processing
-            df_copy = df_copy.fillna("")
-
-            # Convert ID columns to string to prevent scientific notation
-            for col in self.ID_COLUMNS:
-                if col in df_copy.columns:
-                    # For ID columns, only convert non-empty values to string
-                    mask = df_copy[col] != ""
-                    if mask.any():
-                        df_copy.loc[mask, col] = df_copy.loc[mask, col].astype(str)
-                        # Remove any .0 from the end if it exists
-                        df_copy.loc[mask, col] = df_copy.loc[mask, col].str.replace(
-                            r"\.0$", "", regex=True
-                        )
-
-            # Ensure Operation column is set to "Update"
-            if "Operation" in df_copy.columns:
-                df_copy["Operation"] = "Update"
-
-            sheets_data_formatted[sheet_name] = df_copy
-
-        # Create Excel writer with specific options
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            for sheet_name, df in sheets_data_formatted.items():
+        self.write_excel_file(sheets_data, output)
+
+        # Reset buffer position
+        output.seek(0)
+
+        return output
+
+    def write_excel_file(
+        self,
+        sheets_data: Dict[str, pd.DataFrame],
+        target: Union[str, BytesIO],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write Excel file with multiple sheets to a path or buffer
+
+        Args:
+            sheets_data: Dictionary mapping sheet names to DataFrames
+            target: File path or writable buffer
+            cancel_token: Checked between sheets and row chunks (optional)
+
+        Returns:
+            Write manifest - see _new_manifest
+        """
+        manifest = self._new_manifest(self.XLSX_FORMAT)
+        write_start = time.perf_counter()
+
+        # Own the file handle: on failure it is closed without the writer
+        # serializing the partial workbook - the caller discards the file
+        handle = open(target, "wb") if isinstance(target, str) else None
+        try:
+            # Create Excel writer with specific options
+            writer = pd.ExcelWriter(
+                handle if handle is not None else target, engine="openpyxl"
+            )
+            for sheet_name, df in sheets_data.items():
+                check_cancelled(cancel_token)
+                sheet_start = time.perf_counter()
+
+                # Format DataFrame - numeric columns keep their dtype
+                df = self.prepare_sheet(df)
+
                 # Write DataFrame to sheet
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+                with span(f"Write sheet {sheet_name}", len(df)):
+                    df.to_excel(writer, sheet_name=sheet_name, index=False)
 
                 # Get the worksheet for additional formatting
                 worksheet = writer.sheets[sheet_name]
 
                 # Apply additional formatting
-                self._format_worksheet(worksheet, df)
+                with span(f"Format sheet {sheet_name}", len(df)):
+                    self._format_worksheet(worksheet, df, cancel_token)
+
+                manifest["sheets"].append(
+                    self._sheet_manifest(sheet_name, df, sheet_start)
+                )
+
+            check_cancelled(cancel_token)
+
+            # The workbook is serialized when the writer closes
+            save_start = time.perf_counter()
+            with span("Save workbook"):
+                writer.close()
+        finally:
+            if handle is not None:
+                handle.close()
+
+        manifest["save_seconds"] = round(time.perf_counter() - save_start, 3)
+        manifest["write_seconds"] = round(time.perf_counter() - write_start, 3)
+
+        return manifest
+
+    def create_csv_file(self, sheets_data: Dict[str, pd.DataFrame]) -> BytesIO:
+        """
+        Create bulk-upload CSV output (single CSV or zip of CSVs)
+
+        Args:
+            sheets_data: Dictionary mapping sheet names to DataFrames
+
+        Returns:
+            BytesIO buffer containing the CSV or zip file
+        """
+        output = BytesIO()
+
+        self.write_csv_file(sheets_data, output)
 
         # Reset buffer position
         output.seek(0)
 
         return output
 
+    def write_csv_file(
+        self,
+        sheets_data: Dict[str, pd.DataFrame],
+        target: Union[str, BytesIO],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write sheets as upload-ready CSV to a path or buffer
+
+        A single sheet is written as a plain CSV; several sheets are written
+        as a zip archive with one "<sheet name>.csv" per sheet. Sheets get
+        the same preparation as the Excel output (IDs as text, Operation =
+        Update), and missing values are written as empty fields.
+
+        Args:
+            sheets_data: Dictionary mapping sheet names to DataFrames
+            target: File path or writable buffer
+            cancel_token: Checked between sheets (optional)
+
+        Returns:
+            Write manifest - see _new_manifest
+        """
+        check_cancelled(cancel_token)
+        manifest = self._new_manifest(self.CSV_FORMAT)
+        write_start = time.perf_counter()
+
+        if len(sheets_data) == 1:
+            sheet_name, df = next(iter(sheets_data.items()))
+            sheet_start = time.perf_counter()
+            df = self.prepare_sheet(df)
+            data = self._to_csv_bytes(df)
+            if isinstance(target, str):
+                with open(target, "wb") as f:
+                    f.write(data)
+            else:
+                target.write(data)
+            manifest["sheets"].append(self._sheet_manifest(sheet_name, df, sheet_start))
+        else:
+            with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for sheet_name, df in sheets_data.items():
+                    check_cancelled(cancel_token)
+                    sheet_start = time.perf_counter()
+                    df = self.prepare_sheet(df)
+                    zf.writestr(f"{sheet_name}.csv", self._to_csv_bytes(df))
+                    manifest["sheets"].append(
+                        self._sheet_manifest(sheet_name, df, sheet_start)
+                    )
+
+        manifest["write_seconds"] = round(time.perf_counter() - write_start, 3)
+
+        return manifest
+
+    def _new_manifest(self, file_format: str) -> Dict[str, Any]:
+        """
+        Create an empty write manifest
+
+        The manifest describes a written file so callers do not need to
+        reopen it: format, one entry per sheet (name, rows, columns,
+        seconds), total write_seconds and - for xlsx - save_seconds spent
+        serializing the workbook. size_bytes is added by whoever knows the
+        final file size.
+        """
+        return {"format": file_format, "sheets": [], "write_seconds": 0.0}
+
+    def _sheet_manifest(
+        self, sheet_name: str, df: pd.DataFrame, start: float
+    ) -> Dict[str, Any]:
+        """Create manifest entry for a sheet written since start"""
+        return {
+            "name": sheet_name,
+            "rows": len(df),
+            "columns": len(df.columns),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def get_csv_extension(self, sheets_data: Dict[str, pd.DataFrame]) -> str:
+        """
+        Get file extension write_csv_file will produce for these sheets
+
+        Returns:
+            'csv' for a single sheet, 'zip' otherwise
+        """
+        return "csv" if len(sheets_data) == 1 else "zip"
+
+    def _to_csv_bytes(self, df: pd.DataFrame) -> bytes:
+        """Serialize prepared DataFrame to UTF-8 CSV bytes"""
+        return df.to_csv(index=False).encode("utf-8")
+
+    def split_sheet(
+        self,
+        df: pd.DataFrame,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> List[pd.DataFrame]:
+        """
+        Split a sheet into parts that each fit the row and byte budget
+
+        Parts are cut along Campaign ID boundaries so a campaign's rows
+        stay in one upload file; rows of each campaign are grouped together
+        (in order of first appearance). Only a campaign that is larger than
+        the budget on its own is split by rows; its last, partial chunk
+        starts a part that following campaigns may share, as that campaign
+        spans several files anyway.
+
+        Args:
+            df: Sheet DataFrame
+            max_rows: Maximum data rows per part (default: MAX_ROWS_PER_PART)
+            max_bytes: Maximum estimated bytes per part (default:
+                MAX_BYTES_PER_PART)
+
+        Returns:
+            List of DataFrames - a single element when no split is needed
+        """
+        rows_budget = self.get_rows_budget(df, max_rows, max_bytes)
+
+        if len(df) <= rows_budget:
+            return [df]
+
+        if "Campaign ID" not in df.columns:
+            return [
+                df.iloc[start : start + rows_budget]
+                for start in range(0, len(df), rows_budget)
+            ]
+
+        # Group rows by campaign, keeping campaigns in first-appearance order
+        codes, _ = pd.factorize(df["Campaign ID"], use_na_sentinel=False)
+        ordered = df.iloc[np.argsort(codes, kind="stable")]
+        campaign_sizes = np.bincount(codes)
+
+        # Greedily pack whole campaigns into parts
+        boundaries = [0]
+        part_rows = 0
+        position = 0
+        for size in campaign_sizes:
+            if part_rows > 0 and part_rows + size > rows_budget:
+                boundaries.append(position)
+                part_rows = 0
+            # Oversized campaign - cut it into budget-sized chunks
+            while size > rows_budget:
+                position += rows_budget
+                size -= rows_budget
+                boundaries.append(position)
+            position += size
+            part_rows += size
+        boundaries.append(position)
+
+        return [
+            ordered.iloc[start:end]
+            for start, end in zip(boundaries[:-1], boundaries[1:])
+            if end > start
+        ]
+
+    def get_rows_budget(
+        self,
+        df: pd.DataFrame,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> int:
+        """
+        Get the maximum rows per part for a sheet
+
+        The byte budget is converted to rows using the CSV size of a sample
+        of rows, which is an upper bound for the compressed xlsx size.
+
+        Returns:
+            Rows per part (at least 1)
+        """
+        max_rows = min(max_rows or self.MAX_ROWS_PER_PART, self.MAX_ROWS_PER_PART)
+        max_bytes = max_bytes or self.MAX_BYTES_PER_PART
+
+        if len(df) == 0:
+            return max_rows
+
+        sample = self.prepare_sheet(df.head(self.SIZE_SAMPLE_ROWS))
+        sample_bytes = len(self._to_csv_bytes(sample))
+        bytes_per_row = max(sample_bytes / len(sample), 1)
+
+        return max(1, min(max_rows, int(max_bytes / bytes_per_row)))
+
+    def prepare_sheet(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prepare DataFrame for output while keeping native dtypes
+
+        NaN values are left in place: pandas writes them as empty cells,
+        which is exactly what filling with "" produced, without turning
+        numeric columns into object dtype.
+
+        Args:
+            df: DataFrame to prepare (not modified)
+
+        Returns:
+            Shallow copy with ID columns as text and Operation = "Update"
+        """
+        # Shallow copy - replaced columns get new arrays, the rest is shared
+        df_out = df.copy(deep=False)
+
+        # Convert ID columns to text to prevent scientific notation
+        for col in self.ID_COLUMNS:
+            if col in df_out.columns:
+                df_out[col] = self._format_id_column(df_out[col])
+
+        # Ensure Operation column is set to "Update"
+        if "Operation" in df_out.columns:
+            df_out["Operation"] = "Update"
+
+        return df_out
+
+    def _format_id_column(self, series: pd.Series) -> pd.Series:
+        """
+        Render an ID column as text, leaving missing values missing
+
+        Args:
+            series: ID column in any dtype
+
+        Returns:
+            Series of digit strings (no trailing .0) with NaN kept as missing
+        """
+        if pd.api.types.is_integer_dtype(series):
+            return series.astype("string")
+
+        valid = series.notna()
+        result = series.astype(object)
+
+        if not valid.any():
+            return result
+
+        if pd.api.types.is_float_dtype(series):
+            values = series[valid]
+            # IDs are whole numbers - render through int64 to drop the .0
+            if (values % 1 == 0).all():
+                result[valid] = values.astype("int64").astype(str)
+                return result
+
+        # Mixed/object column: stringify and drop a trailing .0 from floats
+        result[valid] = series[valid].astype(str).str.removesuffix(".0")
+        return result
+
     def create_working_file(self, sheets_dict: Dict[str, pd.DataFrame]) -> BytesIO:
         """
         Create Working file with all sheets
@@ -112,14 +414,19 @@ class OutputWriter:
         """
         return self.create_excel_file(sheets_dict)
 
-    def _format_worksheet(self, worksheet, df):
+    def _format_worksheet(
+        self, worksheet, df, cancel_token: Optional[CancellationToken] = None
+    ):
         """
         Apply formatting to worksheet
 
         Args:
             worksheet: Openpyxl worksheet object
             df: DataFrame for reference
+            cancel_token: Checked every CHECK_EVERY_ROWS rows (optional)
         """
+        check_every = CancellationToken.CHECK_EVERY_ROWS
+
         # Set uniform column width for ALL columns
         for col_idx in range(1, len(df.columns) + 1):
             column_letter = get_column_letter(col_idx)
@@ -130,55 +437,128 @@ class OutputWriter:
             cell.font = Font(bold=True)
             cell.alignment = Alignment(horizontal="center", vertical="center")
 
-        # Apply pink highlighting for bid violations if Bid column exists
+        # Apply pink highlighting for bid violations if Bid column exists.
+        # Rows are picked from the DataFrame - the sheet holds the same
+        # values - so only highlighted rows are touched cell by cell
         if "Bid" in df.columns:
-            bid_col_idx = df.columns.get_loc("Bid") + 1  # Excel is 1-indexed
-            bid_col_letter = get_column_letter(bid_col_idx)
-
-            for row_idx in range(2, len(df) + 2):  # Skip header, Excel is 1-indexed
-                cell = worksheet[f"{bid_col_letter}{row_idx}"]
-                try:
-                    if cell.value and cell.value != "":
-                        bid_value = float(cell.value)
-                        # Highlight if bid is out of range
-                        if bid_value < 0.02 or bid_value > 1.25:
-                            for col_idx in range(1, len(df.columns) + 1):
-                                worksheet.cell(
-                                    row=row_idx, column=col_idx
-                                ).fill = self.pink_fill
-                except (ValueError, TypeError):
-                    # If bid value is not a number, highlight the row
-                    if cell.value and cell.value != "":
-                        for col_idx in range(1, len(df.columns) + 1):
-                            worksheet.cell(
-                                row=row_idx, column=col_idx
-                            ).fill = self.pink_fill
+            violations = self._get_bid_violations(df["Bid"])
+            pink_rows = (np.flatnonzero(violations) + 2).tolist()  # header, 1-based
+            for i, row_idx in enumerate(pink_rows):
+                if i % check_every == 0:
+                    check_cancelled(cancel_token)
+                for col_idx in range(1, len(df.columns) + 1):
+                    worksheet.cell(row=row_idx, column=col_idx).fill = self.pink_fill
 
         # Format ID columns as text to prevent Excel from converting to numbers
         for col_name in self.ID_COLUMNS:
             if col_name in df.columns:
                 col_idx = df.columns.get_loc(col_name) + 1
-                col_letter = get_column_letter(col_idx)
-                for row_idx in range(2, len(df) + 2):
-                    cell = worksheet[f"{col_letter}{row_idx}"]
-                    if cell.value and cell.value != "":
-                        cell.number_format = "@"  # Text format
-
-        # Set alignment for all cells
-        for row in worksheet.iter_rows(min_row=2):
+                filled_rows = np.flatnonzero(self._is_filled(df[col_name])) + 2
+                for row_idx in filled_rows.tolist():
+                    worksheet.cell(row=row_idx, column=col_idx).number_format = "@"
+
+        # Set alignment for all cells - one shared style object
+        alignment = Alignment(horizontal="left", vertical="center")
+        for row_idx, row in enumerate(worksheet.iter_rows(min_row=2)):
+            if row_idx % check_every == 0:
+                check_cancelled(cancel_token)
             for cell in row:
-                cell.alignment = Alignment(horizontal="left", vertical="center")
+                cell.alignment = alignment
+
+    def _get_bid_violations(self, bids: pd.Series) -> np.ndarray:
+        """
+        Find rows whose bid needs pink highlighting
+
+        Empty and zero bids are not highlighted; numbers outside [0.02, 1.25]
+        and non-numeric text are.
+
+        Args:
+            bids: Bid column as written to the sheet
+
+        Returns:
+            Boolean array aligned with bids
+        """
+        filled = self._is_filled(bids)
+
+        if _is_number_column(bids):
+            values = bids.to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid="ignore"):
+                return filled & ((values < 0.02) | (values > 1.25))
+
+        # Mixed column - check the filled cells one by one like Excel sees them
+        def is_violation(value) -> bool:
+            try:
+                bid_value = float(value)
+            except (ValueError, TypeError):
+                return True
+            return bid_value < 0.02 or bid_value > 1.25
+
+        violations = np.zeros(len(bids), dtype=bool)
+        for i in np.flatnonzero(filled):
+            violations[i] = is_violation(bids.iat[i])
+        return violations
+
+    def _is_filled(self, values: pd.Series) -> np.ndarray:
+        """
+        Find cells that are not empty, zero or blank text
+
+        Args:
+            values: Column as written to the sheet
+
+        Returns:
+            Boolean array aligned with values
+        """
+        if _is_number_column(values):
+            numbers = values.to_numpy(dtype=float, na_value=np.nan)
+            return ~np.isnan(numbers) & (numbers != 0)
+
+        return np.fromiter(
+            (not _is_missing(value) and bool(value) for value in values),
+            dtype=bool,
+            count=len(values),
+        )
 
     def get_file_stats(self, file_buffer: BytesIO) -> Dict[str, Any]:
         """
         Get statistics about the generated file
 
+        Files written by the WriterScheduler are described from their write
+        manifest, or the sheet names they were written with, without being
+        reopened; only plain buffers are loaded to count sheets.
+
         Args:
-            file_buffer: BytesIO buffer containing Excel file
+            file_buffer: BytesIO buffer or OutputFileHandle containing Excel file
 
         Returns:
-            Dictionary with file statistics
+            Dictionary with file statistics (per-sheet rows, columns and
+            write seconds in "sheets" when a manifest is available)
         """
+        # Files written by the WriterScheduler carry their write manifest
+        manifest = getattr(file_buffer, "manifest", None)
+        if manifest is not None:
+            sheets = manifest["sheets"]
+            return {
+                "size_bytes": file_buffer.size_bytes,
+                "size_mb": round(file_buffer.size_bytes / (1024 * 1024), 2),
+                "sheet_count": len(sheets),
+                "sheet_names": [sheet["name"] for sheet in sheets],
+                "format": manifest["format"],
+                "total_rows": sum(sheet["rows"] for sheet in sheets),
+                "sheets": sheets,
+                "write_seconds": manifest["write_seconds"],
+            }
+
+        # Other handles (e.g. cached without a manifest) - sheet names are
+        # known from writing, the file is not reopened
+        if hasattr(file_buffer, "path"):
+            return {
+                "size_bytes": file_buffer.size_bytes,
+                "size_mb": round(file_buffer.size_bytes / (1024 * 1024), 2),
+                "sheet_count": len(file_buffer.sheet_names),
+                "sheet_names": file_buffer.sheet_names,
+                "format": file_buffer.file_format,
+            }
+
         # Get file size
         file_buffer.seek(0, 2)  # Seek to end
         size_bytes = file_buffer.tell()
@@ -199,3 +579,17 @@ class OutputWriter:
             "sheet_count": sheet_count,
             "sheet_names": sheet_names,
         }
+
+
+def _is_number_column(values: pd.Series) -> bool:
+    """Check if a column holds only numbers (bool columns excluded)"""
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(
+        values
+    )
+
+
+def _is_missing(value) -> bool:
+    """Check if a cell value is written as an empty cell"""
+    return (
+        value is None or value is pd.NA or (isinstance(value, float) and value != value)
+    )
@@ -0,0 +1,341 @@
+"""
+Writer Scheduler
+Builds output Excel files concurrently in worker processes
+"""
+
+import multiprocessing
+import os
+import tempfile
+import zipfile
+import pandas as pd
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+from data.writers.output_writer import OutputWriter
+from utils.cancellation import (
+    CancellationToken,
+    ProcessingCancelledError,
+    check_cancelled,
+)
+from utils.instrumentation import debug
+
+
+class OutputFileHandle:
+    """Handle to an output file written to a temp file on disk"""
+
+    def __init__(
+        self,
+        path: str,
+        file_format: str = OutputWriter.XLSX_FORMAT,
+        sheet_names: Optional[List[str]] = None,
+        manifest: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize handle
+
+        Args:
+            path: Path of the written file
+            file_format: Output format the file was written in
+            sheet_names: Names of the sheets contained in the file
+            manifest: Write manifest returned by OutputWriter (optional)
+        """
+        self.path = path
+        self.file_format = file_format
+        self.sheet_names = sheet_names or []
+        self.size_bytes = os.path.getsize(path)
+        self.manifest = manifest
+        if manifest is not None:
+            manifest["size_bytes"] = self.size_bytes
+
+    @property
+    def extension(self) -> str:
+        """File extension without the dot (xlsx, csv or zip)"""
+        return os.path.splitext(self.path)[1].lstrip(".")
+
+    def open(self):
+        """Open the file for binary reading"""
+        return open(self.path, "rb")
+
+    def getvalue(self) -> bytes:
+        """Read the whole file (BytesIO compatible)"""
+        with self.open() as f:
+            return f.read()
+
+    def to_buffer(self) -> BytesIO:
+        """Load the file into a BytesIO buffer"""
+        return BytesIO(self.getvalue())
+
+    def cleanup(self):
+        """Delete the temp file"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __repr__(self) -> str:
+        return f"OutputFileHandle({self.path!r}, {self.size_bytes} bytes)"
+
+
+# Cancel event shared with the parent, set in worker processes only
+_worker_cancel_event = None
+
+
+def _init_worker(cancel_event):
+    """Prepare a worker process - keep the parent's cancel event"""
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+
+def _write_workbook(
+    sheets_data: Dict[str, pd.DataFrame],
+    path: str,
+    file_format: str = OutputWriter.XLSX_FORMAT,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Dict[str, Any]:
+    """
+    Worker entry point - write one output file to path
+
+    Must stay at module level so it can be pickled for worker processes.
+    Worker processes get no cancel_token; they check the cancel event the
+    parent sets instead.
+
+    Returns:
+        Write manifest of the file
+    """
+    if cancel_token is None and _worker_cancel_event is not None:
+        cancel_token = CancellationToken(_worker_cancel_event)
+    writer = OutputWriter()
+    if file_format == OutputWriter.CSV_FORMAT:
+        return writer.write_csv_file(sheets_data, path, cancel_token)
+    return writer.write_excel_file(sheets_data, path, cancel_token)
+
+
+class WriterScheduler:
+    """Schedules workbook writes across worker processes"""
+
+    # Below this many rows (all files together) pool startup costs more
+    # than it saves, so files are written inline
+    MIN_PARALLEL_ROWS = 20000
+
+    # How often a parallel write checks for cancellation
+    CANCEL_POLL_SECONDS = 0.2
+
+    def __init__(
+        self, max_workers: Optional[int] = None, temp_dir: Optional[str] = None
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            max_workers: Maximum worker processes (default: CPU count)
+            temp_dir: Directory for output temp files (default: system temp)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.temp_dir = temp_dir
+
+    def write_files(
+        self,
+        files: Dict[str, Dict[str, pd.DataFrame]],
+        formats: Optional[Dict[str, str]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, OutputFileHandle]:
+        """
+        Write several workbooks, in parallel where worthwhile
+
+        openpyxl builds a workbook as a single in-memory object, so the
+        unit of parallelism is a whole file - sheets of one file are
+        written by the same worker.
+
+        Args:
+            files: Dictionary mapping file key (e.g. 'working') to sheets_data
+            formats: Optional output format per file key (default: xlsx)
+            cancel_token: On cancellation worker processes stop at their
+                next checkpoint (optional)
+
+        Returns:
+            Dictionary mapping file key to OutputFileHandle
+
+        Raises:
+            ProcessingCancelledError: If cancel_token was cancelled
+
+        If the write fails or is cancelled, all temp files are deleted
+        before the error propagates.
+        """
+        check_cancelled(cancel_token)
+
+        formats = {
+            key: (formats or {}).get(key, OutputWriter.XLSX_FORMAT) for key in files
+        }
+        total_rows = sum(len(df) for sheets in files.values() for df in sheets.values())
+        workers = min(self.max_workers, len(files))
+
+        paths = {}
+        try:
+            for key in files:
+                paths[key] = self._new_temp_path(
+                    key, self._get_extension(files[key], formats[key])
+                )
+
+            if workers > 1 and total_rows >= self.MIN_PARALLEL_ROWS:
+                try:
+                    manifests = self._write_parallel(
+                        files, paths, formats, workers, cancel_token
+                    )
+                except (BrokenProcessPool, OSError) as e:
+                    # Process pools can be unavailable (restricted hosts, frozen apps)
+                    debug("WriterScheduler: parallel write failed (%s)", e)
+                    manifests = self._write_inline(files, paths, formats, cancel_token)
+            else:
+                manifests = self._write_inline(files, paths, formats, cancel_token)
+
+            return {
+                key: OutputFileHandle(
+                    paths[key], formats[key], list(files[key].keys()), manifests[key]
+                )
+                for key in files
+            }
+        except BaseException as e:
+            # Release partially written temp files right away
+            for path in paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            debug(
+                "WriterScheduler: write %s, temp files removed",
+                "cancelled" if isinstance(e, ProcessingCancelledError) else "failed",
+            )
+            raise
+
+    def bundle_files(
+        self, handles: Dict[str, OutputFileHandle], key: str
+    ) -> OutputFileHandle:
+        """
+        Zip several written files into one bundle and delete the originals
+
+        Args:
+            handles: Dictionary mapping name inside the zip to OutputFileHandle
+            key: File key used for the bundle temp file name
+
+        Returns:
+            OutputFileHandle of the zip bundle; its sheet_names and manifest
+            sheets are the bundled files
+        """
+        path = self._new_temp_path(key, "zip")
+        file_format = next(iter(handles.values())).file_format if handles else ""
+        manifest = {"format": file_format, "sheets": [], "write_seconds": 0.0}
+
+        with zipfile.ZipFile(path, "w") as zf:
+            for name, handle in handles.items():
+                if handle.manifest is not None:
+                    sheets = handle.manifest["sheets"]
+                    manifest["sheets"].append(
+                        {
+                            "name": name,
+                            "rows": sum(sheet["rows"] for sheet in sheets),
+                            "columns": max(
+                                (sheet["columns"] for sheet in sheets), default=0
+                            ),
+                            "seconds": handle.manifest["write_seconds"],
+                        }
+                    )
+                    manifest["write_seconds"] += handle.manifest["write_seconds"]
+
+                # xlsx is already compressed, CSV is not
+                compression = (
+                    zipfile.ZIP_STORED
+                    if handle.extension == OutputWriter.XLSX_FORMAT
+                    else zipfile.ZIP_DEFLATED
+                )
+                zf.write(handle.path, arcname=name, compress_type=compression)
+                handle.cleanup()
+
+        return OutputFileHandle(path, file_format, list(handles.keys()), manifest)
+
+    def _write_parallel(
+        self,
+        files: Dict[str, Dict[str, pd.DataFrame]],
+        paths: Dict[str, str],
+        formats: Dict[str, str],
+        workers: int,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Write files in worker processes, largest first
+
+        Workers are spawned, not forked - a fork would copy the parent's
+        threads' locks and its whole heap. They share a cancel event with
+        this process, set on cancellation or when any write fails, so the
+        other workers stop at their next checkpoint.
+        """
+        order = sorted(
+            files, key=lambda key: -sum(len(df) for df in files[key].values())
+        )
+
+        context = multiprocessing.get_context("spawn")
+        cancel_event = context.Event()
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(cancel_event,),
+        )
+        try:
+            futures = {
+                key: executor.submit(
+                    _write_workbook, files[key], paths[key], formats[key]
+                )
+                for key in order
+            }
+
+            # Wait in short slices so a cancel request is noticed promptly
+            pending = set(futures.values())
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=self.CANCEL_POLL_SECONDS,
+                    return_when=FIRST_EXCEPTION,
+                )
+                failed = next((future for future in done if future.exception()), None)
+                if failed is not None:
+                    # Stop the other writes now, not after they finished
+                    cancel_event.set()
+                    raise failed.exception()
+                check_cancelled(cancel_token)
+
+            return {key: future.result() for key, future in futures.items()}
+
+        except BaseException:
+            # Stop the writes still running; waiting ones are cancelled below
+            cancel_event.set()
+            raise
+
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _write_inline(
+        self,
+        files: Dict[str, Dict[str, pd.DataFrame]],
+        paths: Dict[str, str],
+        formats: Dict[str, str],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Write files one after the other in this process"""
+        return {
+            key: _write_workbook(sheets_data, paths[key], formats[key], cancel_token)
+            for key, sheets_data in files.items()
+        }
+
+    def _get_extension(
+        self, sheets_data: Dict[str, pd.DataFrame], file_format: str
+    ) -> str:
+        """Get the extension the written file will have"""
+        if file_format == OutputWriter.CSV_FORMAT:
+            return OutputWriter().get_csv_extension(sheets_data)
+        return "xlsx"
+
+    def _new_temp_path(self, key: str, extension: str = "xlsx") -> str:
+        """Create an empty temp file and return its path"""
+        fd, path = tempfile.mkstemp(
+            prefix=f"bid_optimizer_{key}_", suffix=f".{extension}", dir=self.temp_dir
+        )
+        os.close(fd)
+        return path
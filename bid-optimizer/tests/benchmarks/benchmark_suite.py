@@ -0,0 +1,518 @@
+"""
+Benchmark Suite
+Times every pipeline stage on synthetic Bulk files and compares the results
+with a JSON baseline
+
+Run from the bid-optimizer directory:
+
+    python -m tests.benchmarks.benchmark_suite --sizes 10k,100k
+    python -m tests.benchmarks.benchmark_suite --sizes 10k --update-baseline
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from business.optimizations import get_optimization
+from business.processors import BulkCleaner
+from business.validators import FileValidator, PortfolioValidator
+from data.readers import CSVReader, ExcelReader
+from data.writers.output_writer import OutputWriter
+from data.writers.writer_scheduler import WriterScheduler
+from tests.fixtures.synthetic_bulk import SyntheticBulkData
+from utils.instrumentation import Instrumentation
+
+BASELINE_PATH = os.path.join(current_dir, "baseline.json")
+
+# Sizes the suite is designed for
+STANDARD_SIZES = [10000, 100000, 500000, 2000000]
+
+
+class BenchmarkSuite:
+    """Runs the pipeline stage by stage and records time and peak memory"""
+
+    # Stages in pipeline order - later stages use earlier results
+    STAGES = [
+        "read_xlsx",
+        "read_csv",
+        "validate",
+        "clean",
+        "validate_portfolios",
+        "zero_sales",
+        "write_output",
+    ]
+
+    def __init__(
+        self,
+        generator: Optional[SyntheticBulkData] = None,
+        measure_memory: bool = True,
+        repeat: int = 1,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Initialize suite
+
+        Args:
+            generator: Synthetic Bulk generator (default settings if None)
+            measure_memory: Run every stage a second time under tracemalloc
+                to record its peak (timings come from the untraced run)
+            repeat: Timed runs per stage - the fastest one is recorded
+            cache_dir: Directory for generated xlsx/csv inputs, which are
+                slow to create at large sizes (default: system temp dir)
+        """
+        self.generator = generator or SyntheticBulkData()
+        self.measure_memory = measure_memory
+        self.repeat = max(repeat, 1)
+        self.cache_dir = cache_dir or os.path.join(
+            tempfile.gettempdir(), "bid_optimizer_benchmarks"
+        )
+
+    def run(
+        self, sizes: List[int], stages: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Benchmark all sizes
+
+        Args:
+            sizes: Bulk row counts
+            stages: Stages to record (default: all). Stages that are not
+                recorded still run untimed when later stages need them.
+
+        Returns:
+            Results dictionary (see save_results)
+        """
+        results = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "environment": get_environment(),
+            "generator": dict(vars(self.generator)),
+            "results": {},
+        }
+
+        for rows in sizes:
+            print(f"Benchmarking {rows:,} rows")
+            results["results"][str(rows)] = self.run_size(rows, stages)
+
+        return results
+
+    def run_size(
+        self, rows: int, stages: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Benchmark one Bulk size
+
+        Args:
+            rows: Bulk row count
+            stages: Stages to record (default: all)
+
+        Returns:
+            Dictionary mapping stage name to its measurement
+        """
+        stages = stages or self.STAGES
+        context = {"rows": rows, "template_df": self.generator.generate_template()}
+        measurements = {}
+
+        for stage in self.STAGES:
+            if stage not in stages and not self._needed_later(stage, stages):
+                continue
+
+            run = getattr(self, f"_stage_{stage}")
+            if stage in ("read_xlsx", "read_csv"):
+                # Input files are generated (or loaded) outside the timing
+                file_format = stage.split("_")[1]
+                if stage == "read_csv" or rows < OutputWriter.EXCEL_MAX_ROWS:
+                    context[file_format] = self.get_input_file(rows, file_format)
+            if stage not in stages:
+                run(context)
+                continue
+
+            measurement = self.measure(run, context)
+            measurements[stage] = measurement
+            print(
+                f"  {stage:<20} {measurement['seconds']:>8.2f}s "
+                f"{measurement['rows_per_second'] or 0:>12,.0f} rows/s "
+                f"{measurement['peak_mb'] or 0:>8.1f} MB"
+                + (" (skipped)" if measurement.get("skipped") else "")
+            )
+
+        return measurements
+
+    def measure(self, run, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Measure one stage
+
+        Args:
+            run: Stage function - takes the context, returns the input row
+                count, or None if the stage does not apply at this size
+            context: Shared stage context
+
+        Returns:
+            Dictionary with rows, seconds, cpu_seconds, rows_per_second and
+            peak_mb (None without measure_memory)
+        """
+        best = None
+        for _ in range(self.repeat):
+            instrumentation = Instrumentation(trace_memory=False, trace_file="")
+            with instrumentation.span("stage") as span:
+                span["rows_in"] = run(context)
+            if best is None or span["wall_seconds"] < best["wall_seconds"]:
+                best = span
+
+        measurement = {
+            "rows": best["rows_in"],
+            "seconds": best["wall_seconds"],
+            "cpu_seconds": best["cpu_seconds"],
+            "rows_per_second": (
+                round(best["rows_in"] / best["wall_seconds"])
+                if best["rows_in"] and best["wall_seconds"]
+                else None
+            ),
+            "peak_mb": None,
+        }
+        if best["rows_in"] is None:
+            measurement["skipped"] = True
+            return measurement
+
+        if self.measure_memory:
+            instrumentation = Instrumentation(trace_memory=True, trace_file="")
+            with instrumentation.span("stage") as span:
+                run(context)
+            measurement["peak_mb"] = span["memory_peak_mb"]
+
+        return measurement
+
+    def get_input_file(self, rows: int, file_format: str) -> bytes:
+        """
+        Get a synthetic Bulk file, generated once per size and settings
+
+        Args:
+            rows: Bulk row count
+            file_format: 'xlsx' or 'csv'
+
+        Returns:
+            File content
+        """
+        settings = json.dumps(vars(self.generator), sort_keys=True)
+        key = hashlib.sha1(settings.encode()).hexdigest()[:10]
+        path = os.path.join(self.cache_dir, f"bulk_{rows}_{key}.{file_format}")
+
+        if not os.path.exists(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            print(f"  generating {os.path.basename(path)}")
+            content = self.generator.create_bulk_file(rows, file_format).getvalue()
+            with open(path + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+            return content
+
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _needed_later(self, stage: str, stages: List[str]) -> bool:
+        """Check if a recorded stage depends on this stage's result"""
+        # The reads are independent - the rest of the pipeline uses the
+        # generated DataFrame directly
+        if stage in ("read_xlsx", "read_csv"):
+            return False
+        index = self.STAGES.index(stage)
+        return any(self.STAGES.index(s) > index for s in stages)
+
+    def _get_bulk_df(self, context: Dict[str, Any]) -> pd.DataFrame:
+        """Get the generated Bulk DataFrame"""
+        if "bulk_df" not in context:
+            context["bulk_df"] = self.generator.generate_bulk(context["rows"])
+        return context["bulk_df"]
+
+    # Stages - each returns the number of rows it processed
+
+    def _stage_read_xlsx(self, context: Dict[str, Any]) -> Optional[int]:
+        """Parse the Bulk xlsx file"""
+        if context["rows"] >= OutputWriter.EXCEL_MAX_ROWS:
+            return None  # does not fit in one sheet
+
+        reader = ExcelReader()
+        reader.MAX_FILE_SIZE = float("inf")  # measure parsing, not the limit
+        df = reader.read(
+            BytesIO(context["xlsx"]), sheet_name="Sponsored Products Campaigns"
+        )
+        return len(df)
+
+    def _stage_read_csv(self, context: Dict[str, Any]) -> int:
+        """Parse the Bulk csv file"""
+        reader = CSVReader()
+        reader.MAX_FILE_SIZE = float("inf")
+        df = reader.read(BytesIO(context["csv"]))
+        return len(df)
+
+    def _stage_validate(self, context: Dict[str, Any]) -> int:
+        """Validate Template and Bulk structure"""
+        bulk_df = self._get_bulk_df(context)
+
+        validator = FileValidator()
+        validator.MAX_ROWS = float("inf")
+        validator.validate_template(context["template_df"])
+        validator.validate_bulk(bulk_df)
+        return len(bulk_df)
+
+    def _stage_clean(self, context: Dict[str, Any]) -> int:
+        """Filter and separate the Bulk"""
+        bulk_df = self._get_bulk_df(context)
+
+        cleaner = BulkCleaner()
+        context["targets_df"] = cleaner.clean_bulk(bulk_df)
+        separated = cleaner.get_separated_dataframes()
+        # Zero Sales needs the Bidding Adjustments next to the targets
+        context["optimization_input_df"] = pd.concat(
+            [separated["targets"], separated["bidding_adjustments"]],
+            ignore_index=True,
+        )
+        return len(bulk_df)
+
+    def _stage_validate_portfolios(self, context: Dict[str, Any]) -> int:
+        """Check Bulk portfolios against the Template"""
+        PortfolioValidator().validate_portfolios(
+            context["template_df"], context["targets_df"]
+        )
+        return len(context["targets_df"])
+
+    def _stage_zero_sales(self, context: Dict[str, Any]) -> int:
+        """Run the Zero Sales optimization"""
+        input_df = context["optimization_input_df"]
+        sheets, _ = get_optimization("Zero Sales").optimize(
+            input_df, context["template_df"]
+        )
+        context["optimized_sheets"] = sheets
+        return len(input_df)
+
+    def _stage_write_output(self, context: Dict[str, Any]) -> Optional[int]:
+        """Write the Working and Clean xlsx files"""
+        sheets = context["optimized_sheets"]
+        if any(len(df) >= OutputWriter.EXCEL_MAX_ROWS for df in sheets.values()):
+            return None  # a sheet does not fit - the app splits such files
+
+        # Same routing as FileGenerator
+        files = {
+            "working": sheets,
+            "clean": {name: df for name, df in sheets.items() if "Working" not in name},
+        }
+        handles = WriterScheduler().write_files(files)
+        for handle in handles.values():
+            handle.cleanup()
+
+        return sum(len(df) for file in files.values() for df in file.values())
+
+
+def get_environment() -> Dict[str, Any]:
+    """Describe the machine and library versions behind a result"""
+    import numpy
+    import openpyxl
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": numpy.__version__,
+        "openpyxl": openpyxl.__version__,
+    }
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load a results or baseline file"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """
+    Save results as JSON
+
+    Layout: {"created", "environment", "generator", "results": {rows:
+    {stage: {rows, seconds, cpu_seconds, rows_per_second, peak_mb}}}}
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def merge_results(baseline: Dict[str, Any], results: Dict[str, Any]) -> Dict:
+    """Replace the measured sizes/stages in a baseline, keep the rest"""
+    merged = dict(baseline) if baseline else {"results": {}}
+    merged["created"] = results["created"]
+    merged["environment"] = results["environment"]
+    merged["generator"] = results["generator"]
+    merged_results = dict(merged.get("results", {}))
+    for size, stages in results["results"].items():
+        merged_results[size] = {**merged_results.get(size, {}), **stages}
+    merged["results"] = merged_results
+    return merged
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+    min_seconds: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline
+
+    Args:
+        current: Results of this run
+        baseline: Stored baseline
+        time_tolerance: Allowed relative slowdown (0.25 = 25%)
+        memory_tolerance: Allowed relative peak memory growth
+        min_seconds: Slowdowns smaller than this many seconds never count
+            as regressions (timer noise on fast stages)
+
+    Returns:
+        One dictionary per measured metric with size, stage, metric,
+        baseline, current, change (relative) and regressed
+    """
+    comparisons = []
+    baseline_results = baseline.get("results", {})
+
+    for size, stages in current.get("results", {}).items():
+        for stage, measurement in stages.items():
+            reference = baseline_results.get(size, {}).get(stage)
+            if not reference or measurement.get("skipped"):
+                continue
+
+            for metric, tolerance in (
+                ("seconds", time_tolerance),
+                ("peak_mb", memory_tolerance),
+            ):
+                old, new = reference.get(metric), measurement.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                regressed = change > tolerance
+                if metric == "seconds" and new - old < min_seconds:
+                    regressed = False
+                comparisons.append(
+                    {
+                        "size": int(size),
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(change, 3),
+                        "regressed": regressed,
+                    }
+                )
+
+    return comparisons
+
+
+def parse_sizes(value: str) -> List[int]:
+    """Parse '10k,100k,2M' into row counts"""
+    multipliers = {"k": 1000, "m": 1000000}
+    sizes = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        multiplier = multipliers.get(item[-1], 1)
+        number = item[:-1] if item[-1] in multipliers else item
+        sizes.append(int(float(number) * multiplier))
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point - returns the exit code"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in STANDARD_SIZES),
+        help="Comma separated Bulk sizes, e.g. 10k,100k,500k,2M",
+    )
+    parser.add_argument(
+        "--stages",
+        default="all",
+        help=f"Comma separated stages ({', '.join(BenchmarkSuite.STAGES)})",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per stage")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracemalloc runs"
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument(
+        "--baseline", default=BASELINE_PATH, help="Baseline JSON to compare with"
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the measured sizes/stages in the baseline",
+    )
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.0,
+        help="Ignore slowdowns below this many seconds",
+    )
+    parser.add_argument("--cache-dir", help="Directory for generated input files")
+    args = parser.parse_args(argv)
+
+    stages = None if args.stages == "all" else args.stages.split(",")
+    for stage in stages or []:
+        if stage not in BenchmarkSuite.STAGES:
+            parser.error(f"Unknown stage: {stage}")
+
+    suite = BenchmarkSuite(
+        measure_memory=not args.no_memory,
+        repeat=args.repeat,
+        cache_dir=args.cache_dir,
+    )
+    results = suite.run(parse_sizes(args.sizes), stages)
+
+    if args.output:
+        save_results(results, args.output)
+
+    baseline = load_results(args.baseline) if os.path.exists(args.baseline) else {}
+
+    if args.update_baseline:
+        save_results(merge_results(baseline, results), args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not baseline:
+        return 0
+
+    comparisons = compare_results(
+        results,
+        baseline,
+        args.time_tolerance,
+        args.memory_tolerance,
+        args.min_seconds,
+    )
+    if comparisons:
+        print("\nCompared with baseline:")
+    for item in comparisons:
+        print(
+            f"  {item['size']:>9,} {item['stage']:<20} {item['metric']:<8} "
+            f"{item['baseline']:>9} -> {item['current']:>9} "
+            f"({item['change']:+.0%}){'  REGRESSED' if item['regressed'] else ''}"
+        )
+
+    return 1 if any(item["regressed"] for item in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Startup Benchmark
+Measures time-to-first-render of app/main.py in fresh interpreters and
+which heavy modules the first render loads
+
+Run from the bid-optimizer directory:
+
+    python -m tests.benchmarks.startup_benchmark
+    python -m tests.benchmarks.startup_benchmark --repeat 10 --output startup.json
+
+Every run starts a new Python process (imports are cached per process), so
+the numbers include the app's own imports. Importing Streamlit itself is
+reported separately as framework_seconds.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+MAIN_SCRIPT = os.path.join(project_root, "app", "main.py")
+
+# Modules the upload page should render without (openpyxl, for the template
+# download, is expected - and brings numpy along)
+HEAVY_MODULES = [
+    "pandas",
+    "data.writers.output_writer",
+    "business.optimizations.zero_sales",
+    "business.services.orchestrator",
+    "state.mock_data",
+]
+
+# Runs in the child process - prints one JSON line
+_CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+framework_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+first_render_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+app.run()
+rerun_seconds = time.perf_counter() - start
+
+print(json.dumps({
+    "framework_seconds": framework_seconds,
+    "first_render_seconds": first_render_seconds,
+    "rerun_seconds": rerun_seconds,
+    "exceptions": [exception.value for exception in app.exception],
+    "loaded_modules": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def measure_startup(
+    script: str = MAIN_SCRIPT, modules: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Render a Streamlit script once in a fresh interpreter
+
+    Args:
+        script: Path of the Streamlit script
+        modules: Module names to report as loaded after the first render
+            (default: HEAVY_MODULES)
+
+    Returns:
+        Dictionary with framework_seconds, first_render_seconds,
+        rerun_seconds, exceptions and loaded_modules
+
+    Raises:
+        RuntimeError: If the child process fails
+    """
+    # Same module resolution as run_app.command - streamlit run also adds
+    # the script's directory, AppTest does not
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(
+            None,
+            [project_root, os.path.dirname(script), env.get("PYTHONPATH")],
+        )
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD_SCRIPT, script, *(modules or HEAVY_MODULES)],
+        cwd=project_root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(repeat: int = 5, script: str = MAIN_SCRIPT) -> Dict[str, Any]:
+    """
+    Measure startup several times
+
+    Args:
+        repeat: Number of fresh interpreters
+        script: Path of the Streamlit script
+
+    Returns:
+        Dictionary with min/median per timing, and the exceptions and
+        loaded modules of the first run
+    """
+    runs = [measure_startup(script) for _ in range(max(repeat, 1))]
+
+    summary: Dict[str, Any] = {"runs": len(runs)}
+    for key in ["framework_seconds", "first_render_seconds", "rerun_seconds"]:
+        values = [run[key] for run in runs]
+        summary[key] = {
+            "min": round(min(values), 4),
+            "median": round(statistics.median(values), 4),
+        }
+    summary["exceptions"] = runs[0]["exceptions"]
+    summary["loaded_modules"] = runs[0]["loaded_modules"]
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Fresh interpreters (default: 5)"
+    )
+    parser.add_argument("--script", default=MAIN_SCRIPT, help="Streamlit script")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    summary = run_benchmark(args.repeat, args.script)
+    output = json.dumps(summary, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    return 1 if summary["exceptions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
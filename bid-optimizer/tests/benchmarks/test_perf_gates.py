@@ -0,0 +1,164 @@
+"""
+Performance Gates
+Hot paths must stay vectorized, the first page render must not load the
+heavy modules, and pipeline stages must not regress against
+tests/benchmarks/baseline.json
+
+The guard tests always run. The stage gates are marked perf and only run
+with --run-perf:
+
+    pytest tests/benchmarks --run-perf
+    pytest tests/benchmarks --run-perf --perf-time-tolerance 1.0
+
+Timings in the baseline are machine specific. After a deliberate change, or
+on a new machine, refresh it with:
+
+    python -m tests.benchmarks.benchmark_suite --sizes 3000 \\
+        --stages clean,zero_sales,write_output --update-baseline
+"""
+
+import os
+import warnings
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from business.optimizations.zero_sales import ZeroSalesOptimization
+from business.processors import BulkCleaner
+from data.writers.output_writer import OutputWriter
+from tests.benchmarks.benchmark_suite import (
+    BASELINE_PATH,
+    BenchmarkSuite,
+    compare_results,
+    get_environment,
+    load_results,
+)
+from tests.benchmarks.startup_benchmark import measure_startup
+from tests.fixtures.synthetic_bulk import SyntheticBulkData
+
+# Fixed gate workload - small enough for a test run, large enough that
+# row-by-row code shows up in the timings
+GATE_ROWS = 3000
+GATE_STAGES = ["clean", "zero_sales", "write_output"]
+
+# Slowdowns below this are timer noise, not regressions
+GATE_MIN_SECONDS = 0.05
+
+# Rows for the guard tests
+GUARD_ROWS = 2000
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    """Synthetic Bulk, Template and the Zero Sales input"""
+    generator = SyntheticBulkData()
+    bulk_df = generator.generate_bulk(GUARD_ROWS)
+    cleaner = BulkCleaner()
+    cleaner.clean_bulk(bulk_df)
+    separated = cleaner.get_separated_dataframes()
+
+    return {
+        "template_df": generator.generate_template(),
+        "targets_df": separated["targets"],
+        "bidding_adjustments_df": separated["bidding_adjustments"],
+    }
+
+
+def test_add_helper_columns_is_vectorized(synthetic, row_iteration_guard, monkeypatch):
+    """Template lookups run once per portfolio, never once per row"""
+    optimization = ZeroSalesOptimization()
+    lookups = []
+    original_lookup = optimization.get_portfolio_value
+
+    def counted_lookup(portfolio, *args, **kwargs):
+        lookups.append(portfolio)
+        return original_lookup(portfolio, *args, **kwargs)
+
+    monkeypatch.setattr(optimization, "get_portfolio_value", counted_lookup)
+
+    main_df = synthetic["targets_df"]
+    result = optimization._add_helper_columns(
+        main_df, synthetic["bidding_adjustments_df"], synthetic["template_df"]
+    )
+
+    assert len(result) == len(main_df)
+    # Base Bid and Target CPA, for each portfolio plus missing values
+    portfolios = main_df["Portfolio Name (Informational only)"].nunique()
+    assert len(lookups) <= 2 * (portfolios + 1)
+
+
+def test_format_worksheet_touches_only_needed_cells(synthetic, row_iteration_guard):
+    """Only highlighted rows and filled ID cells are visited cell by cell"""
+    optimization = ZeroSalesOptimization()
+    sheets = optimization.apply_optimization(
+        pd.concat(
+            [synthetic["targets_df"], synthetic["bidding_adjustments_df"]],
+            ignore_index=True,
+        ),
+        synthetic["template_df"],
+    )
+    df = sheets["Working Zero Sales"]
+
+    writer = OutputWriter()
+    with pd.ExcelWriter(BytesIO(), engine="openpyxl") as excel_writer:
+        df.to_excel(excel_writer, sheet_name="Sheet", index=False)
+        worksheet = excel_writer.sheets["Sheet"]
+
+        row_iteration_guard["cell"] = 0
+        row_iteration_guard["getitem"] = 0
+        writer._format_worksheet(worksheet, df)
+
+    pink_rows = int(writer._get_bid_violations(df["Bid"]).sum())
+    filled_ids = sum(
+        int(writer._is_filled(df[col]).sum())
+        for col in writer.ID_COLUMNS
+        if col in df.columns
+    )
+
+    assert pink_rows < len(df)  # otherwise the check proves nothing
+    assert row_iteration_guard["cell"] <= pink_rows * len(df.columns) + filled_ids
+    assert row_iteration_guard["getitem"] <= 1  # the header row
+
+
+def test_first_render_defers_heavy_imports():
+    """The upload page renders without pandas, the writers or the optimizations"""
+    pytest.importorskip("streamlit")
+    startup = measure_startup()
+
+    assert startup["exceptions"] == []
+    assert startup["loaded_modules"] == []
+
+
+@pytest.mark.perf
+def test_stages_within_baseline(perf_tolerances, tmp_path):
+    """Gate stages stay within tolerance of the stored baseline"""
+    if not os.path.exists(BASELINE_PATH):
+        pytest.skip("No baseline - create it with --update-baseline")
+    baseline = load_results(BASELINE_PATH)
+    if str(GATE_ROWS) not in baseline.get("results", {}):
+        pytest.skip(f"Baseline has no {GATE_ROWS} row results")
+
+    suite = BenchmarkSuite(repeat=3, cache_dir=str(tmp_path))
+    results = suite.run([GATE_ROWS], GATE_STAGES)
+
+    comparisons = compare_results(
+        results,
+        baseline,
+        min_seconds=GATE_MIN_SECONDS,
+        **perf_tolerances,
+    )
+
+    # Timings only compare on the machine that recorded them
+    if baseline.get("environment", {}).get("platform") != get_environment()["platform"]:
+        warnings.warn("Baseline recorded on another platform - only checking memory")
+        comparisons = [item for item in comparisons if item["metric"] != "seconds"]
+
+    assert comparisons, "Nothing to compare with the baseline"
+    regressions = [
+        f"{item['stage']} {item['metric']}: {item['baseline']} -> "
+        f"{item['current']} ({item['change']:+.0%})"
+        for item in comparisons
+        if item["regressed"]
+    ]
+    assert not regressions, "Stage regressions:\n" + "\n".join(regressions)
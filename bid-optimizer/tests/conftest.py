@@ -0,0 +1,133 @@
+"""
+Shared pytest setup
+Performance gate and golden corpus options, a guard against row-by-row
+pandas/openpyxl code, and no bid history or shared result cache
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+from openpyxl.worksheet import worksheet as worksheet_module
+from openpyxl.worksheet.worksheet import Worksheet
+
+from data.bid_history import HISTORY_DB_ENV_VAR
+from data.result_cache import MAX_SIZE_ENV_VAR
+
+# Keep test runs out of the operator's bid history and the shared result
+# cache (and stop them from reading earlier results back) - tests of either
+# pass their own BidHistoryStore / ResultCache
+os.environ[HISTORY_DB_ENV_VAR] = ""
+os.environ[MAX_SIZE_ENV_VAR] = "0"
+
+
+def pytest_addoption(parser):
+    """Add the performance gate and golden corpus options"""
+    group = parser.getgroup("perf", "performance regression gates")
+    group.addoption(
+        "--run-perf",
+        action="store_true",
+        default=False,
+        help="Run tests marked perf (stage benchmarks against the baseline)",
+    )
+    group.addoption(
+        "--perf-time-tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed relative slowdown per stage (default: 0.5 = 50%%)",
+    )
+    group.addoption(
+        "--perf-memory-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative peak memory growth per stage (default: 0.25)",
+    )
+
+    group = parser.getgroup("golden", "golden output equivalence")
+    group.addoption(
+        "--golden-against",
+        metavar="REVISION",
+        help="Run tests marked golden: compare the corpus outputs of the "
+        "working tree with this git revision (e.g. HEAD)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip perf and golden tests unless their option is given"""
+    skips = {}
+    if not config.getoption("--run-perf"):
+        skips["perf"] = pytest.mark.skip(reason="performance gate - use --run-perf")
+    if not config.getoption("--golden-against"):
+        skips["golden"] = pytest.mark.skip(
+            reason="golden corpus - use --golden-against REVISION"
+        )
+
+    for item in items:
+        for marker, skip in skips.items():
+            if item.get_closest_marker(marker):
+                item.add_marker(skip)
+
+
+@pytest.fixture
+def perf_tolerances(request):
+    """Time and memory tolerances for the performance gates"""
+    return {
+        "time_tolerance": request.config.getoption("--perf-time-tolerance"),
+        "memory_tolerance": request.config.getoption("--perf-memory-tolerance"),
+    }
+
+
+class RowIterationError(AssertionError):
+    """Raised when guarded code iterates over DataFrame rows"""
+
+
+@pytest.fixture
+def row_iteration_guard(monkeypatch):
+    """
+    Fail on row-by-row DataFrame code and count worksheet cell access
+
+    DataFrame.iterrows, itertuples and apply(axis=1) raise
+    RowIterationError. Worksheet cell lookups (ws.cell() and ws["A1"]) are
+    counted, so a test can check that only the needed cells are touched.
+    Cells visited through ws.iter_rows() are not counted - it walks the
+    sheet in one pass.
+
+    Returns:
+        Dictionary with "cell" and "getitem" access counts
+    """
+    counts = {"cell": 0, "getitem": 0}
+
+    def forbid(name):
+        def guarded(*args, **kwargs):
+            raise RowIterationError(f"DataFrame.{name} used in a hot path")
+
+        return guarded
+
+    original_apply = pd.DataFrame.apply
+
+    def guarded_apply(self, func, axis=0, *args, **kwargs):
+        if axis in (1, "columns"):
+            raise RowIterationError("DataFrame.apply(axis=1) used in a hot path")
+        return original_apply(self, func, axis, *args, **kwargs)
+
+    original_cell = Worksheet.cell
+    original_getitem = Worksheet.__getitem__
+
+    def counted_cell(self, *args, **kwargs):
+        # Calls from inside openpyxl (iter_rows) are not lookups by our code
+        if sys._getframe(1).f_code.co_filename != worksheet_module.__file__:
+            counts["cell"] += 1
+        return original_cell(self, *args, **kwargs)
+
+    def counted_getitem(self, key):
+        counts["getitem"] += 1
+        return original_getitem(self, key)
+
+    monkeypatch.setattr(pd.DataFrame, "iterrows", forbid("iterrows"))
+    monkeypatch.setattr(pd.DataFrame, "itertuples", forbid("itertuples"))
+    monkeypatch.setattr(pd.DataFrame, "apply", guarded_apply)
+    monkeypatch.setattr(Worksheet, "cell", counted_cell)
+    monkeypatch.setattr(Worksheet, "__getitem__", counted_getitem)
+
+    return counts
@@ -0,0 +1,286 @@
+"""
+Synthetic Bulk Data
+Scalable, realistic 48-column Bulk files for benchmarks (10K - 2M rows)
+"""
+
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from typing import Dict, Optional
+
+from .mock_bulk import MockBulkData
+
+
+class SyntheticBulkData:
+    """
+    Vectorized Bulk generator with a configurable data shape
+
+    Unlike MockBulkData every column is built with numpy, so millions of rows
+    take seconds. The same seed and settings always give the same data.
+    """
+
+    # Default Entity mix (fractions of all rows, Bidding Adjustment excluded -
+    # see bidding_adjustment_density)
+    DEFAULT_ENTITY_MIX = {
+        "Keyword": 0.50,
+        "Product Targeting": 0.30,
+        "Product Ad": 0.12,
+        "Campaign": 0.04,
+        "Ad Group": 0.04,
+    }
+
+    PLACEMENTS = [
+        "Placement Top",
+        "Placement Product Page",
+        "Placement Rest Of Search",
+    ]
+
+    # Portfolios the Zero Sales optimization skips
+    FLAT_PORTFOLIOS = ["Flat 30", "Flat 25", "Flat 40", "Flat 20", "Flat 15"]
+
+    def __init__(
+        self,
+        portfolio_count: int = 50,
+        entity_mix: Optional[Dict[str, float]] = None,
+        zero_units_ratio: float = 0.6,
+        bidding_adjustment_density: float = 0.05,
+        flat_portfolio_ratio: float = 0.05,
+        enabled_ratio: float = 0.85,
+        rows_per_campaign: int = 200,
+        seed: int = 42,
+    ):
+        """
+        Initialize generator
+
+        Args:
+            portfolio_count: Number of distinct portfolios
+            entity_mix: Entity name -> fraction of rows (normalized)
+            zero_units_ratio: Fraction of rows with Units = 0
+            bidding_adjustment_density: Fraction of rows that are Bidding
+                Adjustments (spread over the campaigns)
+            flat_portfolio_ratio: Fraction of rows in Flat portfolios
+            enabled_ratio: Fraction of rows with all three states enabled
+            rows_per_campaign: Average rows per campaign
+            seed: Random seed
+        """
+        self.portfolio_count = portfolio_count
+        self.entity_mix = entity_mix or dict(self.DEFAULT_ENTITY_MIX)
+        self.zero_units_ratio = zero_units_ratio
+        self.bidding_adjustment_density = bidding_adjustment_density
+        self.flat_portfolio_ratio = flat_portfolio_ratio
+        self.enabled_ratio = enabled_ratio
+        self.rows_per_campaign = rows_per_campaign
+        self.seed = seed
+
+    def get_portfolio_names(self) -> list:
+        """Get the regular (non-Flat) portfolio names"""
+        return [f"Portfolio-{i:04d}" for i in range(self.portfolio_count)]
+
+    def generate_template(self) -> pd.DataFrame:
+        """
+        Generate a Template covering every portfolio of the Bulk
+
+        Returns:
+            DataFrame with Portfolio Name, Base Bid and Target CPA
+        """
+        rng = np.random.default_rng(self.seed + 1)
+        names = self.get_portfolio_names() + self.FLAT_PORTFOLIOS
+        count = len(names)
+
+        target_cpa = np.round(rng.uniform(2.0, 40.0, count), 2).astype(object)
+        # Some portfolios have no Target CPA
+        target_cpa[rng.random(count) < 0.2] = np.nan
+
+        return pd.DataFrame(
+            {
+                "Portfolio Name": names,
+                "Base Bid": np.round(rng.uniform(0.1, 2.5, count), 2),
+                "Target CPA": target_cpa,
+            }
+        )
+
+    def generate_bulk(self, num_rows: int) -> pd.DataFrame:
+        """
+        Generate a Bulk DataFrame
+
+        Args:
+            num_rows: Number of rows
+
+        Returns:
+            DataFrame with the 48 Bulk columns
+        """
+        rng = np.random.default_rng(self.seed)
+        n = num_rows
+
+        # Entity - Bidding Adjustments first, the rest follows the mix
+        entity_names = list(self.entity_mix)
+        weights = np.array([self.entity_mix[name] for name in entity_names], float)
+        entity = rng.choice(entity_names, n, p=weights / weights.sum()).astype(object)
+        is_ba = rng.random(n) < self.bidding_adjustment_density
+        entity[is_ba] = "Bidding Adjustment"
+        is_target = np.isin(entity, ["Keyword", "Product Targeting"])
+        is_keyword = entity == "Keyword"
+
+        # Campaigns and their portfolios
+        campaign_count = max(n // self.rows_per_campaign, 1)
+        campaign_idx = rng.integers(0, campaign_count, n)
+        campaign_id = 100000000000000 + campaign_idx
+        ad_group_idx = campaign_idx * 10 + rng.integers(0, 10, n)
+
+        portfolios = np.array(self.get_portfolio_names(), dtype=object)
+        flat = np.array(self.FLAT_PORTFOLIOS, dtype=object)
+        campaign_portfolio = portfolios[
+            np.arange(campaign_count) % len(portfolios)
+        ].copy()
+        is_flat_campaign = rng.random(campaign_count) < self.flat_portfolio_ratio
+        campaign_portfolio[is_flat_campaign] = rng.choice(
+            flat, int(is_flat_campaign.sum())
+        )
+        portfolio = campaign_portfolio[campaign_idx]
+
+        # States - enabled_ratio of rows pass all three state filters
+        fully_enabled = rng.random(n) < self.enabled_ratio
+        state = np.full(n, "enabled", dtype=object)
+        campaign_state = state.copy()
+        ad_group_state = state.copy()
+        disabled_column = rng.integers(0, 3, n)
+        not_enabled = ~fully_enabled
+        state[not_enabled & (disabled_column == 0)] = "paused"
+        campaign_state[not_enabled & (disabled_column == 1)] = "paused"
+        ad_group_state[not_enabled & (disabled_column == 2)] = "archived"
+
+        # Performance - zero_units_ratio of rows have no units
+        impressions = rng.integers(0, 20000, n)
+        clicks = np.minimum(rng.integers(0, 400, n), impressions)
+        spend = np.round(clicks * rng.uniform(0.2, 2.5, n), 2)
+        has_units = rng.random(n) >= self.zero_units_ratio
+        units = np.where(has_units, rng.integers(1, 60, n), 0)
+        orders = np.where(has_units, np.maximum(units // 2, 1), 0)
+        sales = np.where(has_units, np.round(units * rng.uniform(8, 60, n), 2), 0.0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ctr = np.where(impressions > 0, np.round(clicks / impressions, 4), 0.0)
+            conversion = np.where(clicks > 0, np.round(orders / clicks, 4), 0.0)
+            acos = np.where(sales > 0, np.round(spend / sales * 100, 2), 0.0)
+            cpc = np.where(clicks > 0, np.round(spend / clicks, 3), 0.0)
+            roas = np.where(spend > 0, np.round(sales / spend, 2), 0.0)
+
+        # IDs only where Amazon fills them
+        row_ids = 500000000000 + np.arange(n)
+        keyword_id = np.where(is_keyword, row_ids, np.nan)
+        targeting_id = np.where(entity == "Product Targeting", row_ids, np.nan)
+        ad_id = np.where(entity == "Product Ad", row_ids, np.nan)
+
+        bid = np.round(rng.uniform(0.05, 3.0, n), 2)
+        bid = np.where(is_target, bid, np.nan)
+
+        percentage = np.where(is_ba, rng.integers(0, 900, n), np.nan)
+        placement = np.where(is_ba, rng.choice(self.PLACEMENTS, n), "").astype(object)
+
+        empty = np.full(n, "", dtype=object)
+        campaign_name = np.char.add("Campaign-", campaign_idx.astype(str)).astype(
+            object
+        )
+        ad_group_name = np.char.add("AdGroup-", ad_group_idx.astype(str)).astype(object)
+        match_type = np.where(
+            is_keyword, rng.choice(["BROAD", "PHRASE", "EXACT"], n), ""
+        ).astype(object)
+
+        data = {
+            "Product": np.full(n, "Sponsored Products", dtype=object),
+            "Entity": entity,
+            "Operation": empty,
+            "Campaign ID": campaign_id,
+            "Ad Group ID": 200000000000000 + ad_group_idx,
+            "Portfolio ID": 300000000000000 + campaign_idx % len(portfolios),
+            "Ad ID": ad_id,
+            "Keyword ID": keyword_id,
+            "Product Targeting ID": targeting_id,
+            "Campaign Name": campaign_name,
+            "Ad Group Name": ad_group_name,
+            "Campaign Name (Informational only)": campaign_name,
+            "Ad Group Name (Informational only)": ad_group_name,
+            "Portfolio Name (Informational only)": portfolio,
+            "Start Date": np.full(n, "20240101", dtype=object),
+            "End Date": empty,
+            "Targeting Type": np.where(campaign_idx % 3 == 0, "AUTO", "MANUAL"),
+            "State": state,
+            "Campaign State (Informational only)": campaign_state,
+            "Ad Group State (Informational only)": ad_group_state,
+            "Daily Budget": np.round(rng.uniform(5, 500, n), 2),
+            "SKU": np.where(
+                entity == "Product Ad",
+                np.char.add("SKU-", (row_ids % 100000).astype(str)),
+                "",
+            ).astype(object),
+            "ASIN": empty,
+            "Eligibility Status (Informational only)": empty,
+            "Reason for Ineligibility (Informational only)": empty,
+            "Ad Group Default Bid": np.round(rng.uniform(0.2, 2.0, n), 2),
+            "Ad Group Default Bid (Informational only)": np.round(
+                rng.uniform(0.2, 2.0, n), 2
+            ),
+            "Bid": bid,
+            "Keyword Text": np.where(
+                is_keyword, np.char.add("keyword ", (row_ids % 50000).astype(str)), ""
+            ).astype(object),
+            "Native Language Keyword": empty,
+            "Native Language Locale": empty,
+            "Match Type": match_type,
+            "Bidding Strategy": np.where(is_ba, "Dynamic bids - down only", "").astype(
+                object
+            ),
+            "Placement": placement,
+            "Percentage": percentage,
+            "Product Targeting Expression": np.where(
+                entity == "Product Targeting", "close-match", ""
+            ).astype(object),
+            "Resolved Product Targeting Expression (Informational only)": empty,
+            "Impressions": impressions,
+            "Clicks": clicks,
+            "Click-through Rate": ctr,
+            "Spend": spend,
+            "Sales": sales,
+            "Orders": orders,
+            "Units": units,
+            "Conversion Rate": conversion,
+            "ACOS": acos,
+            "CPC": cpc,
+            "ROAS": roas,
+        }
+
+        return pd.DataFrame(data, columns=MockBulkData.BULK_COLUMNS)
+
+    def create_bulk_file(self, num_rows: int, file_format: str = "xlsx") -> BytesIO:
+        """
+        Create a Bulk file as it is uploaded
+
+        Args:
+            num_rows: Number of rows
+            file_format: 'xlsx' or 'csv'
+
+        Returns:
+            BytesIO with the file content
+        """
+        df = self.generate_bulk(num_rows)
+        output = BytesIO()
+
+        if file_format == "csv":
+            df.to_csv(output, index=False)
+        else:
+            with pd.ExcelWriter(output, engine="openpyxl") as writer:
+                df.to_excel(
+                    writer, sheet_name="Sponsored Products Campaigns", index=False
+                )
+
+        output.seek(0)
+        return output
+
+    def create_template_file(self) -> BytesIO:
+        """Create the Template as an xlsx file"""
+        output = BytesIO()
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
+            self.generate_template().to_excel(writer, index=False)
+
+        output.seek(0)
+        return output
@@ -0,0 +1,518 @@
+"""
+Golden Corpus Runner
+Runs the Zero Sales pipeline on a corpus of synthetic Bulk files with a
+reference version of the code and with the working tree, and compares the
+Working and Clean workbooks
+
+Run from the bid-optimizer directory:
+
+    # Working tree against the last commit (uncommitted changes only)
+    python tests/golden/golden_runner.py check
+    # ... against any git revision
+    python tests/golden/golden_runner.py check --against main
+
+    # Or record a reference once and compare later runs with it
+    python tests/golden/golden_runner.py run --output /tmp/golden_ref
+    python tests/golden/golden_runner.py run --output /tmp/golden_new
+    python tests/golden/golden_runner.py compare /tmp/golden_ref /tmp/golden_new
+
+The reference revision is checked out in a temporary git worktree and run in
+a separate process, at the same time as the candidate run. Both runs read
+the same pickled inputs, so generator changes do not show up as differences.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Add project root to path - a --project-root given to the run command is
+# put in front of it, so the pipeline is imported from there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Corpus - small Bulks with different shapes, each hitting other branches of
+# the cleaner, the optimization and the writer
+GOLDEN_CASES = [
+    {"name": "default", "rows": 800, "generator": {"seed": 1}},
+    {
+        "name": "no_bidding_adjustments",
+        "rows": 500,
+        "generator": {"seed": 2, "bidding_adjustment_density": 0.0},
+    },
+    {
+        "name": "dense_bidding_adjustments",
+        "rows": 500,
+        "generator": {"seed": 3, "bidding_adjustment_density": 0.3},
+    },
+    {
+        "name": "all_zero_units",
+        "rows": 500,
+        "generator": {"seed": 4, "zero_units_ratio": 1.0},
+    },
+    {
+        "name": "no_zero_units",
+        "rows": 300,
+        "generator": {"seed": 5, "zero_units_ratio": 0.0},
+    },
+    {
+        "name": "many_portfolios",
+        "rows": 800,
+        "generator": {"seed": 6, "portfolio_count": 400, "rows_per_campaign": 4},
+    },
+    {
+        "name": "single_portfolio",
+        "rows": 400,
+        "generator": {"seed": 7, "portfolio_count": 1},
+    },
+    {
+        "name": "mostly_flat",
+        "rows": 400,
+        "generator": {"seed": 8, "flat_portfolio_ratio": 0.8},
+    },
+    {
+        "name": "mostly_paused",
+        "rows": 500,
+        "generator": {"seed": 9, "enabled_ratio": 0.3},
+    },
+    {
+        "name": "keywords_only",
+        "rows": 400,
+        "generator": {"seed": 10, "entity_mix": {"Keyword": 1.0}},
+    },
+    {
+        "name": "product_targeting_only",
+        "rows": 400,
+        "generator": {"seed": 11, "entity_mix": {"Product Targeting": 1.0}},
+    },
+]
+
+OPTIMIZATIONS = ["Zero Sales"]
+OUTPUT_FILES = ["working.xlsx", "clean.xlsx"]
+
+
+def select_cases(names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Pick corpus cases by name
+
+    Args:
+        names: Case names (default: all)
+
+    Returns:
+        Case dictionaries in corpus order
+
+    Raises:
+        ValueError: If a name is not in the corpus
+    """
+    if not names:
+        return list(GOLDEN_CASES)
+
+    known = {case["name"]: case for case in GOLDEN_CASES}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown golden cases: {', '.join(unknown)}")
+
+    return [case for case in GOLDEN_CASES if case["name"] in names]
+
+
+def write_inputs(inputs_dir: str, cases: List[Dict[str, Any]]):
+    """
+    Generate the corpus inputs with the synthetic generator of this tree
+
+    Writes <inputs_dir>/<case>/bulk.pkl and template.pkl.
+
+    Args:
+        inputs_dir: Target directory
+        cases: Corpus cases
+    """
+    from tests.fixtures.synthetic_bulk import SyntheticBulkData
+
+    for case in cases:
+        generator = SyntheticBulkData(**case["generator"])
+        case_dir = os.path.join(inputs_dir, case["name"])
+        os.makedirs(case_dir, exist_ok=True)
+        generator.generate_bulk(case["rows"]).to_pickle(
+            os.path.join(case_dir, "bulk.pkl")
+        )
+        generator.generate_template().to_pickle(os.path.join(case_dir, "template.pkl"))
+
+
+def run_corpus(inputs_dir: str, output_dir: str, cases: List[Dict[str, Any]]):
+    """
+    Run the pipeline on every case and write its output workbooks
+
+    Writes <output_dir>/<case>/working.xlsx, clean.xlsx and messages.json
+    (errors and warnings of the generation). Uses only APIs that exist in
+    every revision, so older checkouts can be run through it.
+
+    Args:
+        inputs_dir: Directory written by write_inputs
+        output_dir: Target directory
+        cases: Corpus cases
+    """
+    import pandas as pd
+    from business.processors.bulk_cleaner import BulkCleaner
+
+    for case in cases:
+        case_inputs = os.path.join(inputs_dir, case["name"])
+        bulk_df = pd.read_pickle(os.path.join(case_inputs, "bulk.pkl"))
+        template_df = pd.read_pickle(os.path.join(case_inputs, "template.pkl"))
+
+        # Same hand-off as the app: targets plus Bidding Adjustments
+        cleaner = BulkCleaner()
+        cleaner.clean_bulk(bulk_df)
+        separated = cleaner.get_separated_dataframes()
+        cleaned_df = pd.concat(
+            [separated["targets"], separated["bidding_adjustments"]],
+            ignore_index=True,
+        )
+
+        working_file, clean_file, stats = _new_file_generator().generate_output_files(
+            cleaned_df, OPTIMIZATIONS, template_df
+        )
+
+        case_dir = os.path.join(output_dir, case["name"])
+        os.makedirs(case_dir, exist_ok=True)
+        for name, output_file in zip(OUTPUT_FILES, (working_file, clean_file)):
+            with open(os.path.join(case_dir, name), "wb") as f:
+                f.write(output_file.getvalue())
+            if hasattr(output_file, "cleanup"):
+                output_file.cleanup()
+
+        messages = {
+            "errors": stats.get("errors", []),
+            "warnings": stats.get("warnings", []),
+        }
+        with open(os.path.join(case_dir, "messages.json"), "w") as f:
+            json.dump(messages, f, indent=2)
+
+
+def _new_file_generator():
+    """
+    FileGenerator that really runs the pipeline
+
+    Revisions with a result cache get a private, disabled one - a result
+    cached by another run (or revision) would hide the code under test -
+    and revisions with a bid history get a disabled one.
+    """
+    from business.processors.file_generator import FileGenerator
+
+    try:
+        from data.result_cache import ResultCache
+    except ImportError:
+        # Before the result cache
+        return FileGenerator()
+
+    options = {"result_cache": ResultCache(max_size_mb=0)}
+    try:
+        from data.bid_history import BidHistoryStore
+    except ImportError:
+        pass
+    else:
+        options["bid_history"] = BidHistoryStore("")
+    return FileGenerator(**options)
+
+
+def compare_outputs(
+    reference_dir: str,
+    candidate_dir: str,
+    cases: Optional[List[Dict[str, Any]]] = None,
+    rel_tolerance: float = 1e-9,
+    abs_tolerance: float = 1e-9,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare the outputs of two corpus runs
+
+    Args:
+        reference_dir: Output directory of the reference run
+        candidate_dir: Output directory of the candidate run
+        cases: Cases to compare (default: every case in reference_dir)
+        rel_tolerance: Relative tolerance for numeric cells
+        abs_tolerance: Absolute tolerance for numeric cells
+
+    Returns:
+        Dictionary mapping case name to its differences (see
+        WorkbookComparator.compare); each difference also has a file key
+    """
+    from tests.golden.workbook_compare import WorkbookComparator
+
+    comparator = WorkbookComparator(rel_tolerance, abs_tolerance)
+    names = (
+        [case["name"] for case in cases]
+        if cases
+        else sorted(
+            name
+            for name in os.listdir(reference_dir)
+            if os.path.exists(os.path.join(reference_dir, name, OUTPUT_FILES[0]))
+        )
+    )
+
+    report = {}
+    for name in names:
+        differences = []
+        for file_name in OUTPUT_FILES + ["messages.json"]:
+            reference_path = os.path.join(reference_dir, name, file_name)
+            candidate_path = os.path.join(candidate_dir, name, file_name)
+            if not os.path.exists(candidate_path):
+                differences.append(
+                    {
+                        "kind": "missing_file",
+                        "sheet": None,
+                        "message": "Candidate file missing",
+                    }
+                )
+            elif file_name == "messages.json":
+                differences.extend(_compare_messages(reference_path, candidate_path))
+            else:
+                differences.extend(comparator.compare(reference_path, candidate_path))
+
+            for difference in differences:
+                difference.setdefault("file", file_name)
+
+        report[name] = differences
+
+    return report
+
+
+def print_report(report: Dict[str, List[Dict[str, Any]]]) -> bool:
+    """
+    Print a comparison report
+
+    Returns:
+        True if every case matched
+    """
+    for name, differences in report.items():
+        if not differences:
+            print(f"  {name:<28} OK")
+            continue
+        print(f"  {name:<28} {len(differences)} differences")
+        for difference in differences:
+            location = difference["file"]
+            if difference.get("sheet"):
+                location += f" / {difference['sheet']}"
+            print(f"      [{difference['kind']}] {location}: {difference['message']}")
+
+    return not any(report.values())
+
+
+def check(
+    against: str = "HEAD",
+    reference_root: Optional[str] = None,
+    cases: Optional[List[Dict[str, Any]]] = None,
+    keep: bool = False,
+    rel_tolerance: float = 1e-9,
+    abs_tolerance: float = 1e-9,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare the working tree with a reference revision on the whole corpus
+
+    Args:
+        against: Git revision of the reference
+        reference_root: bid-optimizer directory of an existing reference
+            checkout (skips the git worktree)
+        cases: Corpus cases (default: all)
+        keep: Keep the temporary directory with inputs and outputs
+        rel_tolerance: Relative tolerance for numeric cells
+        abs_tolerance: Absolute tolerance for numeric cells
+
+    Returns:
+        Comparison report (see compare_outputs)
+
+    Raises:
+        RuntimeError: If the reference run fails
+    """
+    cases = cases or select_cases()
+    work_dir = tempfile.mkdtemp(prefix="bid_optimizer_golden_")
+    inputs_dir = os.path.join(work_dir, "inputs")
+    reference_dir = os.path.join(work_dir, "reference")
+    candidate_dir = os.path.join(work_dir, "candidate")
+    worktree = None
+
+    try:
+        write_inputs(inputs_dir, cases)
+
+        if reference_root is None:
+            worktree = os.path.join(work_dir, "worktree")
+            reference_root = _add_worktree(against, worktree)
+
+        # Reference runs in its own process while the candidate runs here
+        log_path = os.path.join(work_dir, "reference.log")
+        with open(log_path, "w") as log:
+            reference = subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "run",
+                    "--project-root",
+                    reference_root,
+                    "--inputs",
+                    inputs_dir,
+                    "--output",
+                    reference_dir,
+                    "--cases",
+                    ",".join(case["name"] for case in cases),
+                ],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+            try:
+                run_corpus(inputs_dir, candidate_dir, cases)
+            finally:
+                reference.wait()
+
+        if reference.returncode != 0:
+            with open(log_path) as log:
+                tail = log.read()[-2000:]
+            raise RuntimeError(f"Reference run failed:\n{tail}")
+
+        return compare_outputs(
+            reference_dir, candidate_dir, cases, rel_tolerance, abs_tolerance
+        )
+    finally:
+        if worktree is not None:
+            _remove_worktree(worktree)
+        if keep:
+            print(f"Golden run kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _add_worktree(revision: str, path: str) -> str:
+    """
+    Check out a revision in a detached git worktree
+
+    Returns:
+        bid-optimizer directory inside the worktree
+    """
+    toplevel = subprocess.run(
+        ["git", "-C", project_root, "rev-parse", "--show-toplevel"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    subprocess.run(
+        ["git", "-C", toplevel, "worktree", "add", "--detach", path, revision],
+        check=True,
+        capture_output=True,
+    )
+    return os.path.join(path, os.path.relpath(project_root, toplevel))
+
+
+def _remove_worktree(path: str):
+    """Remove a worktree created by _add_worktree"""
+    subprocess.run(
+        ["git", "-C", project_root, "worktree", "remove", "--force", path],
+        capture_output=True,
+    )
+
+
+def _compare_messages(reference_path: str, candidate_path: str) -> List[Dict]:
+    """Compare generation errors and warnings"""
+    with open(reference_path) as f:
+        reference = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+
+    return [
+        {
+            "kind": "messages",
+            "sheet": None,
+            "message": f"{key}: {reference.get(key)} != {candidate.get(key)}",
+        }
+        for key in ("errors", "warnings")
+        if reference.get(key) != candidate.get(key)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point - returns the exit code"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = commands.add_parser(
+        "check", help="Compare the working tree with a git revision"
+    )
+    check_parser.add_argument("--against", default="HEAD", help="Reference revision")
+    check_parser.add_argument(
+        "--reference-root",
+        help="bid-optimizer directory of a reference checkout (instead of git)",
+    )
+    check_parser.add_argument(
+        "--keep", action="store_true", help="Keep inputs and outputs"
+    )
+
+    run_parser = commands.add_parser("run", help="Write the corpus outputs")
+    run_parser.add_argument("--output", required=True, help="Output directory")
+    run_parser.add_argument(
+        "--inputs", help="Inputs from an earlier run (default: generate them)"
+    )
+    run_parser.add_argument(
+        "--project-root", help="Import the pipeline from this bid-optimizer directory"
+    )
+
+    compare_parser = commands.add_parser("compare", help="Compare two run outputs")
+    compare_parser.add_argument("reference")
+    compare_parser.add_argument("candidate")
+
+    for command_parser in (check_parser, run_parser, compare_parser):
+        command_parser.add_argument("--cases", help="Comma separated case names")
+    for command_parser in (check_parser, compare_parser):
+        command_parser.add_argument("--rel-tolerance", type=float, default=1e-9)
+        command_parser.add_argument("--abs-tolerance", type=float, default=1e-9)
+
+    args = parser.parse_args(argv)
+
+    try:
+        cases = select_cases(args.cases.split(",") if args.cases else None)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+
+    if args.command == "run":
+        if args.project_root:
+            sys.path.insert(0, os.path.abspath(args.project_root))
+        inputs_dir = args.inputs
+        if inputs_dir is None:
+            inputs_dir = os.path.join(args.output, "inputs")
+            write_inputs(inputs_dir, cases)
+        run_corpus(inputs_dir, args.output, cases)
+        print(f"Wrote {len(cases)} cases to {args.output}")
+        return 0
+
+    if args.command == "compare":
+        report = compare_outputs(
+            args.reference,
+            args.candidate,
+            cases if args.cases else None,
+            args.rel_tolerance,
+            args.abs_tolerance,
+        )
+    else:
+        print(f"Golden corpus: {len(cases)} cases against {args.against}")
+        report = check(
+            args.against,
+            args.reference_root,
+            cases,
+            args.keep,
+            args.rel_tolerance,
+            args.abs_tolerance,
+        )
+
+    matched = print_report(report)
+    print(
+        f"{'All cases match' if matched else 'Outputs differ'} "
+        f"({time.perf_counter() - start:.1f}s)"
+    )
+    return 0 if matched else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Golden Output Tests
+Workbook comparator checks, and the golden corpus against a git revision
+(run with --golden-against REVISION)
+"""
+
+import pandas as pd
+import pytest
+
+from data.writers.output_writer import OutputWriter
+from tests.golden.golden_runner import check, print_report
+from tests.golden.workbook_compare import WorkbookComparator, check_helper_layout
+
+
+def make_sheet(**changes) -> pd.DataFrame:
+    """Small Zero Sales-like sheet; keyword arguments replace columns"""
+    data = {
+        "Entity": ["Keyword", "Keyword", "Product Targeting"],
+        "Keyword ID": ["101", "102", ""],
+        "Max BA": [0, 50, 0],
+        "Base Bid": [0.5, 0.5, 0.3],
+        "Target CPA": [None, 10.0, None],
+        "Adj. CPA": [None, 15.0, None],
+        "calc1": [0.375, 1.5, 0.0],
+        "calc2": [0.5, 0.5, 0.3],
+        "Old Bid": [0.5, 2.0, 0.0],
+        "Bid": [0.5, 1.5, 0.3],
+    }
+    data.update(changes)
+    return pd.DataFrame(data)
+
+
+def write_workbook(sheets) -> bytes:
+    """Write sheets like the app does"""
+    return OutputWriter().create_excel_file(sheets).getvalue()
+
+
+@pytest.fixture
+def reference():
+    return write_workbook({"Clean Zero Sales": make_sheet()})
+
+
+def test_identical_workbooks_match(reference):
+    candidate = write_workbook({"Clean Zero Sales": make_sheet()})
+    assert WorkbookComparator().compare(reference, candidate) == []
+
+
+def test_numbers_compare_with_tolerance(reference):
+    candidate = write_workbook(
+        {"Clean Zero Sales": make_sheet(calc1=[0.375 + 1e-12, 1.5, 0.0])}
+    )
+    assert WorkbookComparator().compare(reference, candidate) == []
+
+    candidate = write_workbook(
+        {"Clean Zero Sales": make_sheet(calc1=[0.376, 1.5, 0.0])}
+    )
+    differences = WorkbookComparator().compare(reference, candidate)
+    assert [(d["kind"], d["row"], d["column"]) for d in differences] == [
+        ("value", 1, "calc1")
+    ]
+
+
+def test_highlighted_rows_are_compared(reference):
+    # Row 1 moves above 1.25 - value and pink highlight both change
+    candidate = write_workbook({"Clean Zero Sales": make_sheet(Bid=[1.3, 1.5, 0.3])})
+    kinds = [d["kind"] for d in WorkbookComparator().compare(reference, candidate)]
+    assert kinds == ["value", "highlight"]
+
+
+def test_sheet_and_column_changes(reference):
+    renamed = write_workbook({"Zero Sales": make_sheet()})
+    assert WorkbookComparator().compare(reference, renamed)[0]["kind"] == "sheets"
+
+    moved = make_sheet()
+    moved = moved[[c for c in moved.columns if c != "Max BA"] + ["Max BA"]]
+    kinds = [
+        d["kind"]
+        for d in WorkbookComparator().compare(
+            reference, write_workbook({"Clean Zero Sales": moved})
+        )
+    ]
+    assert kinds == ["layout", "columns"]
+
+
+def test_check_helper_layout():
+    columns = list(make_sheet().columns)
+    assert check_helper_layout(columns) is None
+    assert check_helper_layout(["Entity", "Bid"]) is None
+
+    swapped = columns.copy()
+    swapped[2], swapped[3] = swapped[3], swapped[2]
+    assert "directly left of Bid" in check_helper_layout(swapped)
+
+
+@pytest.mark.golden
+def test_golden_corpus(request):
+    """Working tree outputs match the given revision on the whole corpus"""
+    report = check(request.config.getoption("--golden-against"))
+    assert print_report(report), "Golden outputs differ - see report above"
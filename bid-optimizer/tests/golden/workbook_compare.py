@@ -0,0 +1,335 @@
+"""
+Workbook Comparator
+Compares two output workbooks the way an Amazon upload sees them: sheet
+names, column order, cell values (numbers with tolerance) and the
+pink-highlighted rows
+"""
+
+import math
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Union
+
+import openpyxl
+
+# Zero Sales helper columns, in the order they sit directly left of Bid
+HELPER_COLUMNS = [
+    "Max BA",
+    "Base Bid",
+    "Target CPA",
+    "Adj. CPA",
+    "calc1",
+    "calc2",
+    "Old Bid",
+]
+
+WorkbookSource = Union[str, bytes, BytesIO]
+
+
+def load_workbook_snapshot(source: WorkbookSource) -> Dict[str, Dict[str, Any]]:
+    """
+    Read a workbook into a plain snapshot
+
+    Args:
+        source: File path, file content or buffer
+
+    Returns:
+        Dictionary mapping sheet name (in workbook order) to a dictionary
+        with columns (header row), rows (value tuples below the header) and
+        highlighted (row number -> (fill color, filled cell count) for rows
+        with solid-filled cells; row 1 is the first data row)
+    """
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+
+    workbook = openpyxl.load_workbook(source, read_only=True)
+    snapshot = {}
+
+    try:
+        for worksheet in workbook.worksheets:
+            columns: List[Any] = []
+            rows: List[tuple] = []
+            highlighted: Dict[int, tuple] = {}
+
+            for row_number, row in enumerate(worksheet.iter_rows()):
+                values = tuple(cell.value for cell in row)
+                if row_number == 0:
+                    columns = list(values)
+                    continue
+
+                colors = [
+                    cell.fill.fgColor.rgb
+                    for cell in row
+                    if cell.has_style and cell.fill.fill_type == "solid"
+                ]
+                if colors:
+                    highlighted[row_number] = (colors[0], len(colors))
+                rows.append(values)
+
+            snapshot[worksheet.title] = {
+                "columns": columns,
+                "rows": rows,
+                "highlighted": highlighted,
+            }
+    finally:
+        workbook.close()
+
+    return snapshot
+
+
+def check_helper_layout(columns: List[Any]) -> Optional[str]:
+    """
+    Check that helper columns sit directly left of Bid, in order
+
+    Args:
+        columns: Header row of a sheet
+
+    Returns:
+        Problem description, or None if the layout is right (or the sheet
+        has no helper columns)
+    """
+    present = [column for column in HELPER_COLUMNS if column in columns]
+    if not present:
+        return None
+    if "Bid" not in columns:
+        return "Helper columns without a Bid column"
+
+    bid_index = columns.index("Bid")
+    expected = columns[bid_index - len(present) : bid_index]
+    if expected != present:
+        return f"Expected {present} directly left of Bid, found {expected}"
+
+    return None
+
+
+class WorkbookComparator:
+    """Finds differences between a reference and a candidate workbook"""
+
+    def __init__(
+        self,
+        rel_tolerance: float = 1e-9,
+        abs_tolerance: float = 1e-9,
+        max_differences: int = 20,
+    ):
+        """
+        Initialize comparator
+
+        Args:
+            rel_tolerance: Relative tolerance for numeric cells
+            abs_tolerance: Absolute tolerance for numeric cells
+            max_differences: Value differences reported per sheet (the
+                rest are counted in one summary difference)
+        """
+        self.rel_tolerance = rel_tolerance
+        self.abs_tolerance = abs_tolerance
+        self.max_differences = max_differences
+
+    def compare(
+        self, reference: WorkbookSource, candidate: WorkbookSource
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare two workbooks
+
+        Args:
+            reference: Reference workbook (path, content or buffer)
+            candidate: Candidate workbook
+
+        Returns:
+            List of differences - dictionaries with kind, sheet, message and,
+            for cell differences, row, column, reference and candidate.
+            Empty if the workbooks are equivalent.
+        """
+        return self.compare_snapshots(
+            load_workbook_snapshot(reference), load_workbook_snapshot(candidate)
+        )
+
+    def compare_snapshots(
+        self, reference: Dict[str, Dict], candidate: Dict[str, Dict]
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare two workbook snapshots
+
+        Args:
+            reference: Snapshot from load_workbook_snapshot
+            candidate: Snapshot from load_workbook_snapshot
+
+        Returns:
+            List of differences (see compare)
+        """
+        if list(reference) != list(candidate):
+            return [
+                {
+                    "kind": "sheets",
+                    "sheet": None,
+                    "message": f"Sheets {list(reference)} != {list(candidate)}",
+                }
+            ]
+
+        differences = []
+        for sheet_name in reference:
+            differences.extend(
+                self.compare_sheets(
+                    sheet_name, reference[sheet_name], candidate[sheet_name]
+                )
+            )
+
+        return differences
+
+    def compare_sheets(
+        self, sheet_name: str, reference: Dict, candidate: Dict
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare one sheet of two snapshots
+
+        Args:
+            sheet_name: Sheet name for the report
+            reference: Reference sheet snapshot
+            candidate: Candidate sheet snapshot
+
+        Returns:
+            List of differences (see compare)
+        """
+        differences = []
+
+        layout_problem = check_helper_layout(candidate["columns"])
+        if layout_problem:
+            differences.append(
+                {"kind": "layout", "sheet": sheet_name, "message": layout_problem}
+            )
+
+        if reference["columns"] != candidate["columns"]:
+            differences.append(
+                {
+                    "kind": "columns",
+                    "sheet": sheet_name,
+                    "message": _describe_column_change(
+                        reference["columns"], candidate["columns"]
+                    ),
+                }
+            )
+            # Cells cannot be matched by position any more
+            return differences
+
+        if len(reference["rows"]) != len(candidate["rows"]):
+            differences.append(
+                {
+                    "kind": "row_count",
+                    "sheet": sheet_name,
+                    "message": f"{len(reference['rows'])} rows != "
+                    f"{len(candidate['rows'])} rows",
+                }
+            )
+
+        differences.extend(self._compare_values(sheet_name, reference, candidate))
+        differences.extend(self._compare_highlighting(sheet_name, reference, candidate))
+
+        return differences
+
+    def values_equal(self, reference: Any, candidate: Any) -> bool:
+        """
+        Check if two cell values are equivalent
+
+        Numbers (not bools) match within the tolerances; everything else,
+        including the type of the value, must match exactly.
+        """
+        if _is_number(reference) and _is_number(candidate):
+            return math.isclose(
+                reference,
+                candidate,
+                rel_tol=self.rel_tolerance,
+                abs_tol=self.abs_tolerance,
+            )
+        return type(reference) is type(candidate) and reference == candidate
+
+    def _compare_values(
+        self, sheet_name: str, reference: Dict, candidate: Dict
+    ) -> List[Dict[str, Any]]:
+        """Compare cell values row by row"""
+        differences = []
+        columns = reference["columns"]
+        mismatches = 0
+
+        for row_number, (reference_row, candidate_row) in enumerate(
+            zip(reference["rows"], candidate["rows"]), start=1
+        ):
+            # Fast path - most rows are identical
+            if reference_row == candidate_row:
+                continue
+
+            for column, reference_value, candidate_value in zip(
+                columns, reference_row, candidate_row
+            ):
+                if self.values_equal(reference_value, candidate_value):
+                    continue
+                mismatches += 1
+                if mismatches <= self.max_differences:
+                    differences.append(
+                        {
+                            "kind": "value",
+                            "sheet": sheet_name,
+                            "row": row_number,
+                            "column": column,
+                            "reference": reference_value,
+                            "candidate": candidate_value,
+                            "message": f"Row {row_number} {column}: "
+                            f"{reference_value!r} != {candidate_value!r}",
+                        }
+                    )
+
+        if mismatches > self.max_differences:
+            differences.append(
+                {
+                    "kind": "value",
+                    "sheet": sheet_name,
+                    "message": f"{mismatches - self.max_differences} more "
+                    "value differences",
+                }
+            )
+
+        return differences
+
+    def _compare_highlighting(
+        self, sheet_name: str, reference: Dict, candidate: Dict
+    ) -> List[Dict[str, Any]]:
+        """Compare which rows are highlighted, and how"""
+        reference_rows = reference["highlighted"]
+        candidate_rows = candidate["highlighted"]
+        if reference_rows == candidate_rows:
+            return []
+
+        only_reference = sorted(set(reference_rows) - set(candidate_rows))
+        only_candidate = sorted(set(candidate_rows) - set(reference_rows))
+        changed = sorted(
+            row
+            for row in set(reference_rows) & set(candidate_rows)
+            if reference_rows[row] != candidate_rows[row]
+        )
+
+        parts = []
+        for label, rows in (
+            ("no longer highlighted", only_reference),
+            ("newly highlighted", only_candidate),
+            ("highlighted differently", changed),
+        ):
+            if rows:
+                parts.append(f"{len(rows)} rows {label} (first: {rows[:5]})")
+
+        return [{"kind": "highlight", "sheet": sheet_name, "message": "; ".join(parts)}]
+
+
+def _describe_column_change(reference: List[Any], candidate: List[Any]) -> str:
+    """Describe how a header row changed"""
+    missing = [column for column in reference if column not in candidate]
+    added = [column for column in candidate if column not in reference]
+    if missing or added:
+        return f"Columns removed: {missing}, added: {added}"
+
+    for index, (old, new) in enumerate(zip(reference, candidate), start=1):
+        if old != new:
+            return f"Column order differs from position {index}: {old!r} != {new!r}"
+
+    return "Column order differs"
+
+
+def _is_number(value: Any) -> bool:
+    """Check for int/float cell values (bools excluded)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,103 @@
+"""
+Batch Runner Tests
+Admission control: accounts wait for workers and memory, biggest first
+"""
+
+import pytest
+
+from business.services.batch_runner import STATUS_VALID, BatchRunner
+from tests.fixtures.synthetic_bulk import SyntheticBulkData
+
+BULK_ROWS = 300
+
+
+@pytest.fixture(scope="module")
+def accounts(tmp_path_factory):
+    generator = SyntheticBulkData(portfolio_count=5, rows_per_campaign=30)
+    template = generator.create_template_file().getvalue()
+    accounts = []
+    for name, rows in [
+        ("small", BULK_ROWS),
+        ("large", 4 * BULK_ROWS),
+        ("mid", 2 * BULK_ROWS),
+    ]:
+        account_dir = tmp_path_factory.mktemp(name)
+        (account_dir / "template.xlsx").write_bytes(template)
+        (account_dir / "bulk.csv").write_bytes(
+            generator.create_bulk_file(rows, "csv").getvalue()
+        )
+        accounts.append(
+            {
+                "name": name,
+                "template": str(account_dir / "template.xlsx"),
+                "bulk": str(account_dir / "bulk.csv"),
+            }
+        )
+    return accounts
+
+
+def test_admission_waits_for_memory(accounts):
+    runner = BatchRunner(max_workers=3, memory_budget_mb=1000)
+    planned = runner.plan(accounts)
+    assert [account["name"] for account in planned] == ["large", "mid", "small"]
+    large, mid, small = planned
+    for account, estimate in zip(planned, [600, 300, 200]):
+        account["estimated_memory_mb"] = estimate
+
+    # Biggest first while it fits
+    assert runner._next_account(planned, 0, {}) is large
+    # The biggest waiting one does not fit - a smaller one that does goes first
+    assert runner._next_account([mid, small], 750, {"large": large}) is small
+    # Nothing fits - wait for a running account to finish
+    assert runner._next_account([mid, small], 900, {"large": large}) is None
+    # Bigger than the whole budget - runs alone once nothing else runs
+    large["estimated_memory_mb"] = 1500
+    assert runner._next_account([large], 200, {"small": small}) is None
+    assert runner._next_account([large], 0, {}) is large
+
+    # Without a budget only the worker count limits admission
+    assert BatchRunner(memory_budget_mb=None)._next_account([mid], 10**6, {}) is mid
+
+
+def test_run_holds_accounts_back_under_memory_budget(accounts, monkeypatch):
+    # Budget for one account at a time, though two workers are free
+    runner = BatchRunner(max_workers=2)
+    runner.memory_budget_mb = max(
+        account["estimated_memory_mb"] for account in runner.plan(accounts)
+    )
+    admitted_with_running = []
+    next_account = BatchRunner._next_account
+
+    def record_admission(self, pending, memory_in_use, running):
+        account = next_account(self, pending, memory_in_use, running)
+        if account is not None:
+            admitted_with_running.append((account["name"], len(running)))
+        return account
+
+    monkeypatch.setattr(BatchRunner, "_next_account", record_admission)
+    summary = runner.run(accounts, options={"validate_only": True})
+
+    assert admitted_with_running == [("large", 0), ("mid", 0), ("small", 0)]
+    assert summary["totals"] == {STATUS_VALID: 3}
+    # Results come back in input order
+    assert [result["name"] for result in summary["accounts"]] == [
+        "small",
+        "large",
+        "mid",
+    ]
+
+
+def test_run_bounds_running_accounts_by_workers(accounts, monkeypatch):
+    runner = BatchRunner(max_workers=2, memory_budget_mb=None)
+    running_counts = []
+    next_account = BatchRunner._next_account
+
+    def record_admission(self, pending, memory_in_use, running):
+        running_counts.append(len(running))
+        return next_account(self, pending, memory_in_use, running)
+
+    monkeypatch.setattr(BatchRunner, "_next_account", record_admission)
+    summary = runner.run(accounts, options={"validate_only": True})
+
+    assert max(running_counts) < runner.max_workers
+    assert summary["totals"] == {STATUS_VALID: 3}
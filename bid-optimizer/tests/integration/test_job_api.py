@@ -0,0 +1,122 @@
+"""
+HTTP Job API Tests
+Drives the WSGI application in-process through LocalApiClient
+"""
+
+import os
+import threading
+from io import BytesIO
+
+import pytest
+
+from app.api import JobApi, LocalApiClient
+from tests.fixtures.synthetic_bulk import SyntheticBulkData
+
+BULK_ROWS = 400
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return SyntheticBulkData(portfolio_count=10, rows_per_campaign=40)
+
+
+@pytest.fixture(scope="module")
+def bulk(generator):
+    return ("bulk.csv", generator.create_bulk_file(BULK_ROWS, "csv").getvalue())
+
+
+@pytest.fixture(scope="module")
+def template(generator):
+    return ("template.xlsx", generator.create_template_file().getvalue())
+
+
+@pytest.fixture
+def api():
+    api = JobApi(max_workers=1, max_pending=1)
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def client(api):
+    return LocalApiClient(api)
+
+
+def test_job_lifecycle(api, client, template, bulk):
+    response = client.submit(template, bulk, format="csv")
+    assert response.status == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    job = client.wait(job_id)
+    assert job["status"] == "completed"
+    assert job["result"]["status"] == "done"
+    assert job["result"]["validation"]["missing_portfolios"] == []
+    assert job["progress"]["timeline"]
+
+    # CSV output with several sheets comes as a zip of CSV files
+    clean_output = job["result"]["outputs"]["clean"]
+    assert clean_output["format"] in ("csv", "zip")
+    clean = client.get(clean_output["url"])
+    assert clean.status == 200
+    assert "| Clean |" in clean.headers["Content-Disposition"]
+    assert clean.headers["Content-Disposition"].endswith(f'.{clean_output["format"]}"')
+    assert len(clean.body) == clean_output["size_bytes"]
+
+    working = client.get(f"/jobs/{job_id}/files/working")
+    assert working.body[:2] == b"PK"
+
+    path = api.runner.get_job(job_id).result["outputs"]["working"].path
+    assert client.delete(f"/jobs/{job_id}").json()["status"] == "discarded"
+    assert not os.path.exists(path)
+    assert client.get(f"/jobs/{job_id}").status == 404
+
+
+def test_validation_result(client, generator, bulk):
+    # Template without the first portfolios of the Bulk
+    output = BytesIO()
+    generator.generate_template().iloc[3:].to_excel(output, index=False)
+
+    job_id = client.submit(("template.xlsx", output.getvalue()), bulk).json()["job_id"]
+    client.wait(job_id)
+    validation = client.get(f"/jobs/{job_id}/validation").json()
+    assert set(validation["missing_portfolios"]) == set(
+        generator.get_portfolio_names()[:3]
+    )
+    assert "Flat 30" in validation["excess_portfolios"]
+
+    job_id = client.submit(
+        ("template.xlsx", output.getvalue()), ("bulk.csv", b"x,y\n")
+    ).json()["job_id"]
+    job = client.wait(job_id)
+    assert job["result"]["status"] == "invalid"
+    assert job["result"]["validation"]["errors"]
+    assert client.get(f"/jobs/{job_id}/files/clean").status == 404
+
+
+def test_queue_full_returns_429(api, client, template, bulk):
+    release = threading.Event()
+    # One job running and one waiting fill max_workers=1 + max_pending=1
+    api.runner.submit(release.wait)
+    api.runner.submit(release.wait)
+    try:
+        response = client.submit(template, bulk)
+        assert response.status == 429
+        assert response.headers["Retry-After"] == str(JobApi.RETRY_AFTER_SECONDS)
+        assert client.get("/health").json()["jobs"]["pending"] == 1
+    finally:
+        release.set()
+
+
+def test_bad_requests(client, template, bulk):
+    assert client.request("POST", "/jobs", b"{}", "application/json").status == 415
+
+    response = client.submit(template, bulk, optimization="Nope")
+    assert response.status == 400
+    assert "Unknown optimization" in response.json()["error"]
+
+    assert client.get("/missing").status == 404
+    response = client.request("PUT", "/jobs")
+    assert response.status == 405
+    assert set(response.headers["Allow"].split(", ")) == {"GET", "POST"}
+    assert client.get("/jobs/unknown/files/clean").status == 404
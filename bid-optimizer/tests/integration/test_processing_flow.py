@@ -0,0 +1,123 @@
+"""
+Processing Flow Tests
+Cancelling a processing job stops its work, reports it as cancelled and
+leaves no temp files behind
+"""
+
+import time
+
+import pytest
+
+from business.processors import BulkCleaner, FileGenerator
+from business.services.job_runner import JobRunner, JobStatus
+from business.services.orchestrator import Orchestrator
+from data.bid_history import BidHistoryStore
+from data.result_cache import ResultCache
+from data.writers.output_writer import OutputWriter
+from data.writers.writer_scheduler import WriterScheduler
+from tests.fixtures.synthetic_bulk import SyntheticBulkData
+from utils.progress import STAGE_STARTED
+
+ROWS = 1500
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    generator = SyntheticBulkData()
+    cleaner = BulkCleaner()
+    cleaner.clean_bulk(generator.generate_bulk(ROWS))
+    cleaned_df = Orchestrator().combine_for_processing(
+        cleaner.get_separated_dataframes()
+    )
+    return cleaned_df, generator.generate_template()
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(max_workers=1)
+    yield runner
+    runner.executor.shutdown(wait=True)
+
+
+def test_cancel_during_write_removes_partial_files(
+    inputs, runner, tmp_path, monkeypatch
+):
+    cleaned_df, template_df = inputs
+    generator = _new_generator(tmp_path)
+    written_sheets = []
+
+    def generate(progress=None, cancel_token=None):
+        # Cancel once the first sheet is in the file - the writer is
+        # mid-file and stops at its next checkpoint
+        write_sheet_manifest = OutputWriter._sheet_manifest
+
+        def cancel_after_sheet(self, sheet_name, df, start):
+            written_sheets.append(sheet_name)
+            cancel_token.cancel()
+            return write_sheet_manifest(self, sheet_name, df, start)
+
+        monkeypatch.setattr(OutputWriter, "_sheet_manifest", cancel_after_sheet)
+        return generator.generate_output_files(
+            cleaned_df,
+            ["Zero Sales"],
+            template_df,
+            progress=progress,
+            cancel_token=cancel_token,
+        )
+
+    job_id = runner.submit(generate, track_progress=True, cancellable=True)
+    status = _wait(runner, job_id)
+
+    assert status["status"] == JobStatus.CANCELLED
+    assert status["error"] is None
+    assert len(written_sheets) == 1
+    assert status["progress"]["timeline"][-1]["stage"].startswith("Write")
+    assert status["progress"]["timeline"][-1]["status"] == "failed"
+    with pytest.raises(RuntimeError, match="cancelled"):
+        runner.get_result(job_id)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cancel_before_write_skips_remaining_stages(inputs, runner, tmp_path):
+    cleaned_df, template_df = inputs
+    generator = _new_generator(tmp_path)
+
+    def generate(progress=None, cancel_token=None):
+        # Cancel as soon as the optimization starts
+        progress.subscribe(
+            lambda event: event["type"] == STAGE_STARTED and cancel_token.cancel()
+        )
+        return generator.generate_output_files(
+            cleaned_df,
+            ["Zero Sales"],
+            template_df,
+            progress=progress,
+            cancel_token=cancel_token,
+        )
+
+    job_id = runner.submit(generate, track_progress=True, cancellable=True)
+    status = _wait(runner, job_id)
+
+    assert status["status"] == JobStatus.CANCELLED
+    # The optimization stopped at a checkpoint, nothing was written
+    assert [entry["stage"] for entry in status["progress"]["timeline"]] == [
+        "Zero Sales"
+    ]
+    assert status["progress"]["timeline"][0]["status"] == "failed"
+    assert list(tmp_path.iterdir()) == []
+
+
+def _new_generator(temp_dir) -> FileGenerator:
+    """Generator without cache or history, writing inline into temp_dir"""
+    generator = FileGenerator(ResultCache(max_size_mb=0), BidHistoryStore(""))
+    generator.writer_scheduler = WriterScheduler(max_workers=1, temp_dir=str(temp_dir))
+    return generator
+
+
+def _wait(runner: JobRunner, job_id: str, timeout: float = 60) -> dict:
+    """Poll a job until it finishes"""
+    deadline = time.time() + timeout
+    while not runner.get_job(job_id).is_finished:
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.05)
+    return runner.get_status(job_id)
@@ -0,0 +1,63 @@
+"""
+Upload Flow Tests
+Resetting the app lets go of the session's parsed uploads in the shared
+dataset cache
+"""
+
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from data.dataset_cache import get_dataset_cache
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "app")
+
+# A session holding a parsed dataset, with one of the Reset buttons.
+# AppTest does not put the app directory on sys.path.
+RESET_SCRIPT = """
+import sys
+sys.path.insert(0, {app_dir!r})
+
+from data.dataset_cache import get_dataset_cache
+from state.session import SessionStateManager
+from {module} import render_reset_button
+
+SessionStateManager.initialize()
+cache = get_dataset_cache()
+if {key!r} not in cache.get_info()["entries"]:
+    cache.put({key!r}, {{"rows": 1}}, owner=SessionStateManager.get_session_id())
+    SessionStateManager.set_dataset({key!r})
+render_reset_button()
+"""
+
+
+@pytest.mark.parametrize(
+    "module, button_key",
+    [
+        ("ui.components.download_buttons", "reset_output_btn"),
+        ("ui.components.buttons", "reset_btn"),
+    ],
+)
+def test_reset_releases_dataset(module, button_key):
+    key = f"reset-test-{button_key}"
+    script = RESET_SCRIPT.format(
+        app_dir=os.path.abspath(APP_DIR), module=module, key=key
+    )
+    app = AppTest.from_string(script, default_timeout=30).run()
+    session_id = app.session_state["session_id"]
+    assert _owners(key) == 1
+
+    app.button(key=button_key).click().run()
+
+    assert not app.exception
+    assert _owners(key) == 0
+    assert app.session_state["dataset_key"] is None
+    assert app.session_state["current_state"] == "upload"
+    # Same browser session, so the memory governor keeps tracking it
+    assert app.session_state["session_id"] == session_id
+
+
+def _owners(key: str) -> int:
+    """Sessions holding a dataset"""
+    return get_dataset_cache().get_info()["entries"][key]["owners"]
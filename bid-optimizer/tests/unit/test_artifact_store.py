@@ -0,0 +1,70 @@
+"""
+Artifact Store Tests
+Artifacts idle for longer than the TTL are swept away; opening one
+refreshes its TTL
+"""
+
+import os
+import time
+
+import pytest
+
+from data.artifact_store import ArtifactNotFoundError, ArtifactStore
+
+TTL_SECONDS = 60
+
+
+def test_cleanup_deletes_idle_artifacts(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    idle = store.put_bytes(b"idle", "idle.xlsx")
+    opened = store.put_bytes(b"opened", "opened.xlsx")
+    _age(store, idle, 2 * TTL_SECONDS)
+    _age(store, opened, 2 * TTL_SECONDS)
+
+    # Opening an artifact (e.g. for a download) refreshes its TTL
+    with store.open(opened) as f:
+        assert f.read() == b"opened"
+
+    assert store.cleanup_expired(force=True) == 1
+    assert not store.exists(idle)
+    assert store.exists(opened)
+    with pytest.raises(ArtifactNotFoundError):
+        store.open(idle)
+    with pytest.raises(ArtifactNotFoundError):
+        store.get_info(idle)
+
+
+def test_cleanup_sweeps_at_most_once_per_interval(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    first = store.put_bytes(b"first", "first.xlsx")
+    _age(store, first, 2 * TTL_SECONDS)
+
+    # The put that just swept keeps the next put from sweeping again
+    store.put_bytes(b"second", "second.xlsx")
+    assert store.exists(first)
+
+    store._last_cleanup -= ArtifactStore.CLEANUP_INTERVAL_SECONDS
+    store.put_bytes(b"third", "third.xlsx")
+    assert not store.exists(first)
+
+
+def test_cleanup_uses_directory_age_without_metadata(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    # Left behind by a process that died before writing its metadata
+    half_written = tmp_path / "half_written"
+    half_written.mkdir()
+    (half_written / "data").write_bytes(b"partial")
+    recent = tmp_path / "recent"
+    recent.mkdir()
+    past = time.time() - 2 * TTL_SECONDS
+    os.utime(half_written, (past, past))
+
+    assert store.cleanup_expired(force=True) == 1
+    assert sorted(os.listdir(tmp_path)) == ["recent"]
+
+
+def _age(store: ArtifactStore, artifact_id: str, seconds: float):
+    """Make an artifact look idle for the given time"""
+    meta_path = os.path.join(store._artifact_dir(artifact_id), store.META_FILENAME)
+    past = time.time() - seconds
+    os.utime(meta_path, (past, past))
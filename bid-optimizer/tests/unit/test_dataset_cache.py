@@ -0,0 +1,71 @@
+"""
+Dataset Cache Tests
+Unheld datasets are evicted least recently used first to stay within the
+memory budget; datasets a session holds are never evicted
+"""
+
+import sys
+
+from data.dataset_cache import DatasetCache
+
+# Budget of 1 MB fits two datasets, not three
+DATASET_BYTES = 400 * 1024
+
+
+def test_budget_evicts_least_recently_used():
+    cache = DatasetCache(memory_budget_mb=1)
+    for key in ["a", "b"]:
+        cache.put(key, _dataset())
+    cache.get("a")
+
+    cache.put("c", _dataset())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert _size_bytes(cache) <= cache.memory_budget_bytes
+    assert cache.stats["evictions"] == 1
+
+
+def test_held_datasets_are_never_evicted():
+    cache = DatasetCache(memory_budget_mb=1)
+    cache.put("a", _dataset(), owner="session-1")
+    cache.put("b", _dataset(), owner="session-2")
+    cache.put("c", _dataset(), owner="session-2")
+    cache.put("d", _dataset())
+    cache.put("e", _dataset())
+
+    # Held datasets outlast the budget; unheld ones give way, except the
+    # one just stored
+    assert _keys(cache) == ["a", "b", "c", "e"]
+    assert _size_bytes(cache) > cache.memory_budget_bytes
+
+    # Released, a dataset is evictable again
+    cache.release("a", "session-1")
+    cache.release("b", "session-2")
+    cache.put("f", _dataset())
+    assert _keys(cache) == ["c", "f"]
+    assert _size_bytes(cache) <= cache.memory_budget_bytes
+
+
+def test_expired_leases_no_longer_hold():
+    cache = DatasetCache(memory_budget_mb=1, lease_ttl_seconds=-1)
+    cache.put("a", _dataset(), owner="closed-session")
+    cache.put("b", _dataset())
+    cache.put("c", _dataset())
+
+    assert cache.get("a") is None
+
+
+def _dataset() -> bytes:
+    """Dataset of DATASET_BYTES (estimated size)"""
+    return b"x" * (DATASET_BYTES - sys.getsizeof(b""))
+
+
+def _keys(cache: DatasetCache) -> list:
+    """Cached keys, least recently used first"""
+    return list(cache.get_info()["entries"])
+
+
+def _size_bytes(cache: DatasetCache) -> int:
+    """Estimated size of all cached datasets"""
+    return cache._size_bytes
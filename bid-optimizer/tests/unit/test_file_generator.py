@@ -0,0 +1,283 @@
+"""
+File Generator Tests
+Repeat runs come from the cache; option changes and eviction do not;
+template edits re-run only the changed portfolios; runs land in the bid
+history; changes-only Clean sheets keep exactly the rows whose Bid changed
+"""
+
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from business.processors import BulkCleaner, FileGenerator
+from business.services.orchestrator import Orchestrator
+from data.bid_history import BidHistoryStore
+from data import result_cache
+from data.result_cache import ResultCache, get_code_version
+from tests.fixtures.synthetic_bulk import SyntheticBulkData
+
+ROWS = 1500
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    generator = SyntheticBulkData()
+    cleaner = BulkCleaner()
+    cleaner.clean_bulk(generator.generate_bulk(ROWS))
+    cleaned_df = Orchestrator().combine_for_processing(
+        cleaner.get_separated_dataframes()
+    )
+    return cleaned_df, generator.generate_template()
+
+
+def test_repeat_run_returns_cached_files(inputs, tmp_path):
+    cleaned_df, template_df = inputs
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=100)
+
+    working, clean, stats = FileGenerator(cache).generate_output_files(
+        cleaned_df, ["Zero Sales"], template_df
+    )
+    assert stats["cached"] is False
+    expected = (working.getvalue(), clean.getvalue())
+    # Callers own the returned files - deleting them keeps the cache intact
+    working.cleanup()
+    clean.cleanup()
+
+    generator = FileGenerator(cache)
+    working, clean, stats = generator.generate_output_files(
+        cleaned_df.copy(), ["Zero Sales"], template_df.copy()
+    )
+    assert stats["cached"] is True
+    assert [entry["stage"] for entry in stats["timeline"]] == ["Load cached result"]
+    assert (working.getvalue(), clean.getvalue()) == expected
+    assert generator.output_writer.get_file_stats(clean)["total_rows"] > 0
+    working.cleanup()
+    clean.cleanup()
+
+    # Other options or inputs are other results
+    _, clean, stats = FileGenerator(cache).generate_output_files(
+        cleaned_df, ["Zero Sales"], template_df, defer_working=True
+    )
+    assert stats["cached"] is False
+    clean.cleanup()
+    _, clean, stats = FileGenerator(cache).generate_output_files(
+        cleaned_df.iloc[1:], ["Zero Sales"], template_df, defer_working=True
+    )
+    assert stats["cached"] is False
+    clean.cleanup()
+
+    generator = FileGenerator(cache)
+    _, clean, stats = generator.generate_output_files(
+        cleaned_df, ["Zero Sales"], template_df, defer_working=True
+    )
+    assert stats["cached"] is True
+    assert "Working Zero Sales" in generator.deferred_working_sheets
+    clean.cleanup()
+    # Three results, and a partition record per bulk for template edits
+    assert cache.get_info()["entries"] == 5
+
+
+def test_least_recently_used_results_are_evicted(inputs, tmp_path):
+    cleaned_df, template_df = inputs
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=100)
+
+    run_sizes = []
+    for rows in (len(cleaned_df), len(cleaned_df) - 1):
+        size_before = _cache_size(cache)
+        working, clean, _ = FileGenerator(cache).generate_output_files(
+            cleaned_df.iloc[:rows], ["Zero Sales"], template_df
+        )
+        run_sizes.append(_cache_size(cache) - size_before)
+        working.cleanup()
+        clean.cleanup()
+
+    # Room for about one run (its result and partition record) - storing a
+    # third evicts the older runs' entries
+    cache.max_size_bytes = int(max(run_sizes) * 1.05)
+    working, clean, _ = FileGenerator(cache).generate_output_files(
+        cleaned_df.iloc[:-2], ["Zero Sales"], template_df
+    )
+    working.cleanup()
+    clean.cleanup()
+
+    info = cache.get_info()
+    assert info["entries"] == 2
+    assert info["evictions"] == 4
+
+
+def test_template_edit_reruns_changed_portfolios_only(inputs, tmp_path):
+    cleaned_df, template_df = inputs
+    edited_df = template_df.copy()
+    edited_df["Base Bid"] = edited_df["Base Bid"].astype(object)
+    edited_df.loc[0, "Base Bid"] = 0.9
+    edited_df.loc[1, "Base Bid"] = "Ignore"
+    edited_df.loc[2, "Target CPA"] = 3.0
+    edited_df = edited_df.drop(index=3)
+
+    def run(cache, template):
+        generator = FileGenerator(cache)
+        _, clean, stats = generator.generate_output_files(
+            cleaned_df, ["Zero Sales"], template, defer_working=True
+        )
+        clean.cleanup()
+        return generator.deferred_working_sheets, stats
+
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=100)
+    _, stats = run(cache, template_df)
+    assert stats["incremental"] is False
+    sheets, stats = run(cache, edited_df)
+    assert stats["incremental"] is True
+    assert stats["changed_partitions"] == 4
+
+    expected_sheets, _ = run(ResultCache(str(tmp_path / "full"), 100), edited_df)
+    assert list(sheets) == list(expected_sheets)
+    for name, expected_df in expected_sheets.items():
+        pd.testing.assert_frame_equal(sheets[name], expected_df)
+
+
+def test_runs_are_recorded_in_bid_history(inputs, tmp_path):
+    cleaned_df, template_df = inputs
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=100)
+    history = BidHistoryStore(str(tmp_path / "history.sqlite3"))
+
+    generator = FileGenerator(cache, history)
+    _, clean, stats = generator.generate_output_files(
+        cleaned_df, ["Zero Sales"], template_df, defer_working=True
+    )
+    clean.cleanup()
+    targets = cleaned_df[cleaned_df["Entity"].isin(["Keyword", "Product Targeting"])]
+    assert stats["history_rows"] == len(targets)
+
+    # New bids for the optimized keywords, the bulk bid for the rest
+    working_df = generator.deferred_working_sheets["Working Zero Sales"]
+    keywords = cleaned_df[cleaned_df["Entity"] == "Keyword"]
+    history_df = history.get_history(keywords["Keyword ID"], entity="Keyword")
+    history_bids = dict(zip(history_df["entity_id"], history_df["bid"]))
+    expected_bids = dict(zip(keywords["Keyword ID"], keywords["Bid"]))
+    optimized = working_df[working_df["Entity"] == "Keyword"]
+    expected_bids.update(zip(optimized["Keyword ID"], optimized["Bid"]))
+    assert history_bids == {
+        str(int(keyword_id)): bid for keyword_id, bid in expected_bids.items()
+    }
+
+    # A cached repeat the same day is a run of its own, with the same bids
+    _, clean, stats = FileGenerator(cache, history).generate_output_files(
+        cleaned_df, ["Zero Sales"], template_df, defer_working=True
+    )
+    clean.cleanup()
+    assert stats["cached"] is True
+    assert stats["history_rows"] == len(targets)
+    history_df = history.get_history(keywords["Keyword ID"], entity="Keyword")
+    assert history_df["run_id"].nunique() == 2
+    repeat_df = history_df[history_df["recorded_at"] > history_df["recorded_at"].min()]
+    assert dict(zip(repeat_df["entity_id"], repeat_df["bid"])) == history_bids
+
+    history.record_run(cleaned_df, {}, run_date=date(2020, 1, 1))
+    info = history.get_info()
+    assert info["runs"] == 3
+    assert info["rows"] == 3 * len(targets)
+    assert info["first_run_date"] == "2020-01-01"
+
+
+def test_code_version_covers_every_package_module(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "PACKAGE_ROOT", str(tmp_path))
+    for path in ["main.py", "utils/helpers.py", "tests/test_main.py"]:
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text("VALUE = 1\n")
+    version = get_code_version()
+
+    # Tests do not change results, any other module does - imported or not
+    (tmp_path / "tests/test_main.py").write_text("VALUE = 2\n")
+    assert get_code_version() == version
+    (tmp_path / "utils/helpers.py").write_text("VALUE = 2\n")
+    os.utime(tmp_path / "utils/helpers.py", (1, 1))
+    assert get_code_version() != version
+
+
+def test_result_cache_directory_is_private(tmp_path):
+    shared_dir = tmp_path / "shared"
+    shared_dir.mkdir(mode=0o777)
+    os.chmod(shared_dir, 0o777)
+    ResultCache(str(shared_dir), max_size_mb=1)
+    assert shared_dir.stat().st_mode & 0o777 == 0o700
+
+    # A planted link could point the cache at anyone's directory
+    (tmp_path / "link").symlink_to(shared_dir)
+    with pytest.raises(PermissionError):
+        ResultCache(str(tmp_path / "link"), max_size_mb=1)
+
+
+def test_keep_changed_rows_compares_rounded_numeric_bids():
+    generator = _new_changed_rows_generator()
+    sheet = pd.DataFrame(
+        {
+            "Operation": ["Update"] * 6,
+            "Keyword ID": ["1", "2", "3", "4", "5", "6"],
+            "Old Bid": [0.5, 0.5, None, None, 0.5, "0.5"],
+            "Bid": [0.5, 0.504, None, 0.3, None, "0.50"],
+        }
+    )
+
+    kept = generator._keep_changed_rows({"Clean Zero Sales": sheet})
+
+    # Equal after rounding, both missing, or equal as text are unchanged;
+    # a bid set or cleared is a change
+    assert kept["Clean Zero Sales"]["Keyword ID"].tolist() == ["4", "5"]
+    assert generator.generation_stats["suppressed_rows"] == 4
+    assert generator.generation_stats["suppressed_rows_by_sheet"] == {
+        "Clean Zero Sales": 4
+    }
+
+
+def test_keep_changed_rows_treats_unparseable_bids_as_missing():
+    generator = _new_changed_rows_generator()
+    sheet = pd.DataFrame(
+        {
+            "Keyword ID": ["1", "2", "3"],
+            "Old Bid": ["n/a", "abc", 0.4],
+            "Bid": ["", 0.4, "n/a"],
+        }
+    )
+
+    kept = generator._keep_changed_rows({"Clean Zero Sales": sheet})
+
+    assert kept["Clean Zero Sales"]["Keyword ID"].tolist() == ["2", "3"]
+
+
+def test_keep_changed_rows_leaves_other_columns_alone():
+    generator = _new_changed_rows_generator()
+    sheet = pd.DataFrame(
+        {
+            "Operation": ["Update", "Create", ""],
+            "Old Bid": [0.5, 0.5, 0.5],
+            "Bid": [0.7, 0.5, 0.9],
+        },
+        index=[10, 20, 30],
+    )
+    adjustments = pd.DataFrame({"Operation": ["Update"], "Percentage": [10]})
+
+    kept = generator._keep_changed_rows(
+        {"Clean Zero Sales": sheet, "Bidding Adjustment": adjustments}
+    )
+
+    # Operation is never rewritten here, and only unchanged bids drop a row
+    pd.testing.assert_frame_equal(kept["Clean Zero Sales"], sheet.loc[[10, 30]])
+    # Sheets without Old Bid pass through untouched
+    assert kept["Bidding Adjustment"] is adjustments
+    assert "Bidding Adjustment" not in (
+        generator.generation_stats["suppressed_rows_by_sheet"]
+    )
+
+
+def _new_changed_rows_generator() -> FileGenerator:
+    """Generator with the stats _keep_changed_rows updates"""
+    generator = FileGenerator(ResultCache(max_size_mb=0), BidHistoryStore(""))
+    generator.generation_stats = {"suppressed_rows": 0, "suppressed_rows_by_sheet": {}}
+    return generator
+
+
+def _cache_size(cache: ResultCache) -> int:
+    """Bytes of all cache entries"""
+    return sum(size_bytes for _, size_bytes, _ in cache._list_entries())
@@ -0,0 +1,117 @@
+"""
+Instrumentation Tests
+Spans nest per thread, close with their parent on failure, reach deep
+code through the module-level span() and go to the trace file per root
+"""
+
+import json
+import threading
+
+import pytest
+
+from utils.instrumentation import Instrumentation, span
+
+
+def test_spans_nest_and_record_rows_and_times():
+    instrumentation = Instrumentation(trace_memory=False)
+
+    with instrumentation.span("Generate output files", 100) as root:
+        with instrumentation.span("Zero Sales", 100) as child:
+            child["rows_out"] = 40
+        with instrumentation.span("Write Clean file", 40):
+            pass
+        root["rows_out"] = 40
+
+    spans = instrumentation.get_spans()
+    assert [(s["path"], s["depth"]) for s in spans] == [
+        ("Generate output files", 0),
+        ("Generate output files > Zero Sales", 1),
+        ("Generate output files > Write Clean file", 1),
+    ]
+    assert [(s["rows_in"], s["rows_out"]) for s in spans] == [
+        (100, 40),
+        (100, 40),
+        (40, None),
+    ]
+    assert all(s["status"] == "done" for s in spans)
+    assert all(s["wall_seconds"] is not None for s in spans)
+    assert all(s["cpu_seconds"] is not None for s in spans)
+    # Internal fields stay internal
+    assert not any(key.startswith("_") for s in spans for key in s)
+
+
+def test_failure_closes_open_children_as_failed():
+    instrumentation = Instrumentation(trace_memory=False)
+
+    with pytest.raises(ValueError):
+        with instrumentation.span("Generate output files"):
+            instrumentation.start_span("Zero Sales")
+            raise ValueError("bad template")
+
+    assert [(s["name"], s["status"]) for s in instrumentation.get_spans()] == [
+        ("Generate output files", "failed"),
+        ("Zero Sales", "failed"),
+    ]
+    assert all(s["wall_seconds"] is not None for s in instrumentation.get_spans())
+
+
+def test_module_span_records_into_the_active_root():
+    instrumentation = Instrumentation(trace_memory=False)
+
+    # Without an open root span, span() records nothing
+    with span("Orphan") as entry:
+        assert entry == {}
+
+    with instrumentation.span("Generate output files") as root:
+        with span("Zero Sales > Bids", 10) as entry:
+            entry["rows_out"] = 5
+    with instrumentation.span("Another run"):
+        pass
+    with span("Orphan"):
+        pass
+
+    assert [s["path"] for s in instrumentation.get_spans(root)] == [
+        "Generate output files",
+        "Generate output files > Zero Sales > Bids",
+    ]
+    assert len(instrumentation.get_spans()) == 3
+
+
+def test_spans_of_other_threads_do_not_nest():
+    instrumentation = Instrumentation(trace_memory=False)
+
+    def work():
+        with instrumentation.span("Worker"):
+            pass
+
+    with instrumentation.span("Session"):
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+
+    assert [(s["path"], s["depth"]) for s in instrumentation.get_spans()] == [
+        ("Session", 0),
+        ("Worker", 0),
+    ]
+
+
+def test_root_spans_are_appended_to_the_trace_file(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    instrumentation = Instrumentation(trace_memory=True, trace_file=str(trace_file))
+
+    for run in ["first", "second"]:
+        with instrumentation.span(run):
+            with instrumentation.span("Allocate"):
+                data = bytearray(2 * 1024 * 1024)
+            del data
+
+    lines = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [line["path"] for line in lines] == [
+        "first",
+        "first > Allocate",
+        "second",
+        "second > Allocate",
+    ]
+    # Peaks of a child count towards its parent
+    assert lines[1]["memory_peak_mb"] >= 2
+    assert lines[0]["memory_peak_mb"] >= lines[1]["memory_peak_mb"]
@@ -0,0 +1,80 @@
+"""
+Optimization Registry Tests
+Names and metadata without imports, loading on first use, entry point plugins
+"""
+
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from business.optimizations import (
+    OPTIMIZATION_REGISTRY,
+    OptimizationRegistry,
+    OptimizationSpec,
+    get_optimization,
+    registry as registry_module,
+)
+from business.optimizations.base import BaseOptimization
+
+
+def test_builtin_metadata_matches_implementation():
+    for info in OPTIMIZATION_REGISTRY.get_info():
+        cls = OPTIMIZATION_REGISTRY[info["name"]]
+        assert cls.name == info["name"]
+        assert cls.description == info["description"]
+        assert list(cls.required_columns) == info["required_columns"]
+
+
+def test_registry_imports_on_first_use():
+    # A fresh interpreter - the registry must list Zero Sales without
+    # importing it, and import it for get_optimization
+    code = (
+        "import sys\n"
+        "from business.optimizations import OPTIMIZATION_REGISTRY, get_optimization\n"
+        "assert 'Zero Sales' in OPTIMIZATION_REGISTRY\n"
+        "assert OPTIMIZATION_REGISTRY.get_info()[0]['required_columns']\n"
+        "assert 'business.optimizations.zero_sales' not in sys.modules\n"
+        "assert 'pandas' not in sys.modules\n"
+        "get_optimization('Zero Sales')\n"
+        "assert 'business.optimizations.zero_sales' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    with pytest.raises(ValueError, match="Unknown optimization"):
+        get_optimization("Nope")
+
+
+def test_entry_point_plugins(monkeypatch):
+    plugins = [
+        EntryPoint(
+            "Plugin Sales",
+            "business.optimizations.zero_sales:ZeroSalesOptimization",
+            "bid_optimizer.optimizations",
+        ),
+        EntryPoint(
+            "Zero Sales",
+            "somewhere.else:Shadowed",
+            "bid_optimizer.optimizations",
+        ),
+        EntryPoint("Broken", "builtins:dict", "bid_optimizer.optimizations"),
+    ]
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: plugins)
+
+    registry = OptimizationRegistry()
+    registry.register(
+        OptimizationSpec("Zero Sales", ".zero_sales:ZeroSalesOptimization")
+    )
+
+    assert list(registry) == ["Zero Sales", "Plugin Sales", "Broken"]
+    spec = registry.get_spec("Plugin Sales")
+    assert spec.is_plugin and not spec.is_loaded
+    assert spec.required_columns == []
+
+    assert issubclass(registry["Plugin Sales"], BaseOptimization)
+    assert spec.is_loaded and "Units" in spec.required_columns
+    assert not registry.get_spec("Zero Sales").is_plugin
+
+    with pytest.raises(TypeError, match="not a BaseOptimization"):
+        registry["Broken"]
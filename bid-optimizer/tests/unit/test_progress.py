@@ -0,0 +1,111 @@
+"""
+Progress Reporter Tests
+Stage events carry elapsed times and the finished fraction of planned
+stages; the timeline shows running stages up to now
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils import progress as progress_module
+from utils.progress import (
+    STAGE_FAILED,
+    STAGE_FINISHED,
+    STAGE_STARTED,
+    ProgressReporter,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake clock for the reporter - advance it with clock.now += seconds"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        progress_module, "time", SimpleNamespace(time=lambda: clock.now)
+    )
+    return clock
+
+
+def test_stage_events_report_elapsed_time_and_progress(clock):
+    events = []
+    reporter = ProgressReporter([events.append])
+    reporter.plan(2)
+
+    clock.now += 1
+    with reporter.stage("Read Bulk", rows=100) as entry:
+        clock.now += 2.5
+        entry["rows"] = 90
+    clock.now += 1
+    with pytest.raises(ValueError):
+        with reporter.stage("Zero Sales", rows=90):
+            clock.now += 0.5
+            raise ValueError("bad template")
+
+    assert [(event["type"], event["stage"]) for event in events] == [
+        (STAGE_STARTED, "Read Bulk"),
+        (STAGE_FINISHED, "Read Bulk"),
+        (STAGE_STARTED, "Zero Sales"),
+        (STAGE_FAILED, "Zero Sales"),
+    ]
+    assert [event["rows"] for event in events] == [100, 90, 90, 90]
+    assert [event["elapsed_seconds"] for event in events] == [0.0, 2.5, 0.0, 0.5]
+    assert [event["total_elapsed_seconds"] for event in events] == [
+        1.0,
+        3.5,
+        4.5,
+        5.0,
+    ]
+    assert [event["progress"] for event in events] == [0.0, 0.5, 0.5, 1.0]
+    assert [entry["status"] for entry in reporter.get_timeline()] == [
+        "done",
+        "failed",
+    ]
+
+
+def test_timeline_shows_running_stages_up_to_now(clock):
+    reporter = ProgressReporter()
+    reporter.plan(3)
+    first = reporter.start_stage("Read Bulk", rows=100)
+    clock.now += 2
+    reporter.finish_stage(first, rows=80)
+    reporter.start_stage("Zero Sales", rows=80)
+    clock.now += 1.25
+
+    snapshot = reporter.get_snapshot()
+
+    assert snapshot["current_stage"] == "Zero Sales"
+    assert snapshot["progress"] == pytest.approx(1 / 3)
+    assert snapshot["total_elapsed_seconds"] == 3.25
+    assert [
+        (entry["stage"], entry["status"], entry["rows"], entry["elapsed_seconds"])
+        for entry in snapshot["timeline"]
+    ] == [("Read Bulk", "done", 80, 2.0), ("Zero Sales", "running", 80, 1.25)]
+
+
+def test_stages_are_recorded_as_spans(clock):
+    reporter = ProgressReporter()
+
+    with reporter.instrumentation.span("Generate output files", 100):
+        with reporter.stage("Zero Sales", rows=100) as entry:
+            entry["rows"] = 40
+
+    stage_span = reporter.instrumentation.get_spans()[-1]
+    assert stage_span["path"] == "Generate output files > Zero Sales"
+    assert (stage_span["rows_in"], stage_span["rows_out"]) == (100, 40)
+    assert stage_span["status"] == "done"
+
+
+def test_broken_callback_does_not_stop_the_stage(clock):
+    events = []
+
+    def broken(event):
+        raise RuntimeError("observer gone")
+
+    reporter = ProgressReporter([broken])
+    reporter.subscribe(events.append)
+
+    with reporter.stage("Read Bulk"):
+        pass
+
+    assert [event["type"] for event in events] == [STAGE_STARTED, STAGE_FINISHED]
@@ -0,0 +1,174 @@
+"""
+Output Writer Tests
+Splitting sheets into upload-sized parts along campaign boundaries; CSV
+output matching the Excel output; file stats from the write manifest;
+parallel writes stopping on a failure
+"""
+
+import os
+import time
+import zipfile
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from data.writers.output_writer import OutputWriter
+from data.writers.writer_scheduler import OutputFileHandle, WriterScheduler
+
+
+def test_split_sheet_keeps_campaigns_together():
+    df = _campaign_rows({"A": 3, "B": 4, "C": 2, "D": 3})
+
+    parts = OutputWriter().split_sheet(df, max_rows=7)
+
+    # Whole campaigns, packed in order until the next one does not fit
+    assert [_campaigns(part) for part in parts] == [["A", "B"], ["C", "D"]]
+    assert sum(len(part) for part in parts) == len(df)
+
+
+def test_split_sheet_groups_interleaved_campaign_rows():
+    df = pd.DataFrame({"Campaign ID": list("ABABCA"), "Row": range(6)})
+
+    parts = OutputWriter().split_sheet(df, max_rows=3)
+
+    # Rows of a campaign are gathered, keeping their order within it
+    assert [part["Row"].tolist() for part in parts] == [[0, 2, 5], [1, 3, 4]]
+
+
+def test_split_sheet_chunks_oversized_campaign():
+    df = _campaign_rows({"A": 2, "B": 11, "C": 1, "D": 3})
+
+    parts = OutputWriter().split_sheet(df, max_rows=4)
+
+    # B starts a new part and is cut into full chunks; its last chunk
+    # shares a part with C, the campaigns after that are whole again
+    assert [_campaigns(part) for part in parts] == [
+        ["A"],
+        ["B"],
+        ["B"],
+        ["B", "C"],
+        ["D"],
+    ]
+    assert [len(part) for part in parts] == [2, 4, 4, 4, 3]
+    assert all(len(part) <= 4 for part in parts)
+
+
+def test_split_sheet_returns_small_sheet_whole():
+    df = _campaign_rows({"A": 3, "B": 2})
+
+    parts = OutputWriter().split_sheet(df, max_rows=5)
+
+    assert len(parts) == 1
+    assert parts[0] is df
+
+
+def test_write_csv_file_matches_excel_output():
+    sheet = _upload_sheet()
+    writer = OutputWriter()
+    csv_buffer, xlsx_buffer = BytesIO(), BytesIO()
+
+    manifest = writer.write_csv_file({"Clean Zero Sales": sheet}, csv_buffer)
+    writer.write_excel_file({"Clean Zero Sales": sheet}, xlsx_buffer)
+
+    # UTF-8 without a byte order mark, IDs as digits, blanks for missing
+    data = csv_buffer.getvalue()
+    assert not data.startswith(b"\xef\xbb\xbf")
+    lines = data.decode("utf-8").splitlines()
+    assert lines[0] == ",".join(sheet.columns)
+    assert lines[1] == "Keyword,Update,123456789012345,98765432109876,נעליים,0.35"
+    assert lines[3].endswith(",מילת מפתח,")
+
+    # Same cells as the Excel file (which stores 1.0 as 1, so compare values)
+    id_types = {"Keyword ID": str, "Campaign ID": str}
+    csv_df = pd.read_csv(BytesIO(data), dtype=id_types)
+    xlsx_df = pd.read_excel(xlsx_buffer, dtype=id_types)
+    pd.testing.assert_frame_equal(csv_df, xlsx_df)
+    assert manifest["format"] == OutputWriter.CSV_FORMAT
+    assert manifest["sheets"][0]["rows"] == len(sheet)
+    assert manifest["sheets"][0]["columns"] == len(sheet.columns)
+
+
+def test_write_csv_file_zips_several_sheets():
+    sheet = _upload_sheet()
+    sheets = {"Clean Zero Sales": sheet, "Bidding Adjustment": sheet.head(1)}
+    buffer = BytesIO()
+
+    OutputWriter().write_csv_file(sheets, buffer)
+
+    assert OutputWriter().get_csv_extension(sheets) == "zip"
+    with zipfile.ZipFile(buffer) as zf:
+        assert zf.namelist() == ["Clean Zero Sales.csv", "Bidding Adjustment.csv"]
+        single = pd.read_csv(zf.open("Bidding Adjustment.csv"), dtype=str)
+    assert single["Keyword ID"].tolist() == ["123456789012345"]
+
+
+def test_file_stats_come_from_the_manifest(tmp_path, monkeypatch):
+    sheet = _upload_sheet()
+    files = {"clean": {"Clean Zero Sales": sheet, "Bidding Adjustment": sheet.head(1)}}
+    handle = WriterScheduler(max_workers=1, temp_dir=str(tmp_path)).write_files(files)[
+        "clean"
+    ]
+
+    # Written files are never reopened to describe them
+    def load_workbook(*args, **kwargs):
+        raise AssertionError("workbook reloaded")
+
+    monkeypatch.setattr(openpyxl, "load_workbook", load_workbook)
+    stats = OutputWriter().get_file_stats(handle)
+
+    assert stats["sheet_names"] == ["Clean Zero Sales", "Bidding Adjustment"]
+    assert stats["total_rows"] == 4
+    assert [sheet["rows"] for sheet in stats["sheets"]] == [3, 1]
+    assert stats["size_bytes"] == os.path.getsize(handle.path)
+
+    # Without a manifest the handle's sheet names still describe it
+    bare = OutputFileHandle(handle.path, handle.file_format, handle.sheet_names)
+    stats = OutputWriter().get_file_stats(bare)
+    assert stats["sheet_names"] == ["Clean Zero Sales", "Bidding Adjustment"]
+    assert stats["size_bytes"] == handle.size_bytes
+
+
+def test_failed_parallel_write_cancels_the_others(tmp_path):
+    # Written inline, the big file takes tens of seconds; the bad one fails
+    # on its sheet name right away
+    big = pd.DataFrame({"Campaign ID": range(20000), "Bid": 0.5, "Text": "x" * 20})
+    files = {
+        "big": {f"Sheet {i}": big for i in range(8)},
+        "bad": {"bad/name": big.head(10)},
+    }
+    scheduler = WriterScheduler(max_workers=2, temp_dir=str(tmp_path))
+
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="sheet title"):
+        scheduler.write_files(files)
+
+    # The big write stopped at its next checkpoint and left no file behind
+    assert time.monotonic() - start < 15
+    assert list(tmp_path.iterdir()) == []
+
+
+def _upload_sheet() -> pd.DataFrame:
+    """Clean sheet with large float IDs, Hebrew text and missing values"""
+    return pd.DataFrame(
+        {
+            "Entity": ["Keyword", "Keyword", "Keyword"],
+            "Operation": ["", "Create", None],
+            "Keyword ID": [123456789012345.0, 2.0, None],
+            "Campaign ID": [98765432109876, 5, 7],
+            "Keyword Text": ["נעליים", "shoes, red", "מילת מפתח"],
+            "Bid": [0.35, 1.0, None],
+        }
+    )
+
+
+def _campaign_rows(sizes: dict) -> pd.DataFrame:
+    """Sheet with the given number of rows per Campaign ID, in order"""
+    campaigns = [campaign for campaign, size in sizes.items() for _ in range(size)]
+    return pd.DataFrame({"Campaign ID": campaigns, "Bid": 0.5})
+
+
+def _campaigns(part: pd.DataFrame) -> list:
+    """Campaign IDs of a part, in order of appearance"""
+    return part["Campaign ID"].unique().tolist()
@@ -0,0 +1,68 @@
+"""
+Cancellation
+Cooperative cancellation for long-running processing
+"""
+
+import threading
+from typing import Optional
+
+
+class ProcessingCancelledError(Exception):
+    """Raised at a checkpoint after processing was cancelled"""
+
+    pass
+
+
+class CancellationToken:
+    """
+    Thread-safe flag checked by the pipeline at stage and chunk boundaries
+
+    Cancelling does not interrupt running code; each component calls
+    check() at its next checkpoint and unwinds with ProcessingCancelledError.
+    """
+
+    # Row loops check the token once per this many rows
+    CHECK_EVERY_ROWS = 5000
+
+    def __init__(self, event=None):
+        """
+        Initialize token (not cancelled)
+
+        Args:
+            event: Event to use as the flag, e.g. a multiprocessing Event
+                shared with worker processes (default: a new threading.Event)
+        """
+        self._event = event or threading.Event()
+
+    def cancel(self):
+        """Request cancellation"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Check if cancellation was requested"""
+        return self._event.is_set()
+
+    def check(self):
+        """
+        Checkpoint - stop if cancellation was requested
+
+        Raises:
+            ProcessingCancelledError: If the token was cancelled
+        """
+        if self._event.is_set():
+            raise ProcessingCancelledError("Processing was cancelled")
+
+
+def check_cancelled(cancel_token: Optional[CancellationToken]):
+    """
+    Checkpoint for code where a token is optional
+
+    Args:
+        cancel_token: CancellationToken or None
+
+    Raises:
+        ProcessingCancelledError: If the token was cancelled
+    """
+    if cancel_token is not None:
+        cancel_token.check()
@@ -0,0 +1,87 @@
+"""
+File Utilities
+Private on-disk directories for the stores that pickle data
+"""
+
+import getpass
+import os
+import stat
+import tempfile
+
+
+def get_private_temp_dir(name: str) -> str:
+    """
+    Get the path of a per-user directory in the system temp dir
+
+    Args:
+        name: Directory name (the user ID is appended, so users on the same
+            machine never share it)
+
+    Returns:
+        Path - not created yet, see make_private_dir
+    """
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"{name}-{user}")
+
+
+def make_private_dir(path: str) -> str:
+    """
+    Create a directory only this user can access, or check an existing one
+
+    Stores that pickle.load their files must only read them from such a
+    directory - anyone able to plant a file there can run code in this
+    process.
+
+    Args:
+        path: Directory path
+
+    Returns:
+        The path
+
+    Raises:
+        PermissionError: If the path is a symlink or not a directory, is
+            owned by another user, or cannot be made private
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    check_private_dir(path)
+    return path
+
+
+def check_private_dir(path: str):
+    """
+    Check that a directory is private to this user
+
+    A directory this user owns but others can access is made private.
+
+    Args:
+        path: Directory path
+
+    Raises:
+        PermissionError: If the path is a symlink or not a directory, is
+            owned by another user, or cannot be made private
+    """
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Not a directory: {path}")
+    if not hasattr(os, "getuid"):
+        # No POSIX ownership (Windows) - the user profile temp dir is private
+        return
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"Directory owned by another user: {path}")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def is_owned_file(file_obj) -> bool:
+    """
+    Check that an open file belongs to this user
+
+    Args:
+        file_obj: File object opened from disk
+
+    Returns:
+        False if another user owns the file
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    return os.fstat(file_obj.fileno()).st_uid == os.getuid()
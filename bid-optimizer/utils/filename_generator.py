@@ -8,7 +8,7 @@ from typing import Optional
 
 
 def generate_output_filename(
-    file_type: str, timestamp: Optional[datetime] = None
+    file_type: str, timestamp: Optional[datetime] = None, extension: str = "xlsx"
 ) -> str:
     """
     Generate filename with current date and time
@@ -16,6 +16,7 @@ def generate_output_filename(
     Args:
         file_type: 'Working' or 'Clean'
         timestamp: Optional specific timestamp (defaults to now)
+        extension: File extension without the dot (default: xlsx)
 
     Returns:
         Formatted filename string
@@ -29,7 +30,9 @@ def generate_output_filename(
     time_str = timestamp.strftime("%H-%M")
 
     # Create filename
-    filename = f"Auto Optimized Bulk | {file_type} | {date_str} | {time_str}.xlsx"
+    filename = (
+        f"Auto Optimized Bulk | {file_type} | {date_str} | {time_str}.{extension}"
+    )
 
     return filename
 
@@ -0,0 +1,298 @@
+"""
+Instrumentation
+Nested timing and memory spans for pipeline stages, and a debug logger
+that costs nothing when disabled
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Environment switches
+DEBUG_ENV_VAR = "BID_OPTIMIZER_DEBUG"
+TRACE_FILE_ENV_VAR = "BID_OPTIMIZER_TRACE_FILE"
+TRACE_MEMORY_ENV_VAR = "BID_OPTIMIZER_TRACE_MEMORY"
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+_debug_enabled = os.environ.get(DEBUG_ENV_VAR, "").lower() in _TRUE_VALUES
+
+# Instrumentation with an open root span, per thread
+_active = threading.local()
+
+
+def is_debug_enabled() -> bool:
+    """Check if debug logging is on - guard expensive debug arguments with it"""
+    return _debug_enabled
+
+
+def set_debug_enabled(enabled: bool):
+    """Turn debug logging on or off for the whole process"""
+    global _debug_enabled
+    _debug_enabled = enabled
+
+
+def debug(message: str, *args):
+    """
+    Print a debug message if debug logging is on
+
+    Formatting is %-style and only happens when enabled, so disabled calls
+    cost one function call. Arguments are still evaluated by the caller -
+    wrap anything expensive in `if is_debug_enabled():`.
+
+    Args:
+        message: Message, e.g. "FileGen: Writing %d rows"
+        *args: Values for the % placeholders
+    """
+    if not _debug_enabled:
+        return
+    print(f"DEBUG {message % args if args else message}")
+
+
+class Instrumentation:
+    """
+    Records nested spans with wall time, CPU time, rows and peak memory
+
+    Spans nest per thread: a span started while another is open on the same
+    thread becomes its child. While a root span is open the instrumentation
+    is also the target of the module-level span() on that thread.
+
+    Every span is a dictionary with name, path, depth, status, rows_in,
+    rows_out, wall_seconds, cpu_seconds, memory_peak_mb (tracemalloc peak,
+    None unless trace_memory) and rss_peak_mb (process high-water mark at
+    span end).
+
+    CPU time is the time of the span's own thread - work in writer worker
+    processes shows up as wall time only. tracemalloc is process-wide, so
+    memory peaks of concurrent jobs overlap.
+    """
+
+    def __init__(
+        self, trace_memory: Optional[bool] = None, trace_file: Optional[str] = None
+    ):
+        """
+        Initialize instrumentation
+
+        Args:
+            trace_memory: Track per-span peaks with tracemalloc (slows
+                allocation-heavy code; default: BID_OPTIMIZER_TRACE_MEMORY)
+            trace_file: Append finished root spans and their children to
+                this file as JSON lines (default: BID_OPTIMIZER_TRACE_FILE)
+        """
+        if trace_memory is None:
+            trace_memory = (
+                os.environ.get(TRACE_MEMORY_ENV_VAR, "").lower() in _TRUE_VALUES
+            )
+        self.trace_memory = trace_memory
+        self.trace_file = trace_file or os.environ.get(TRACE_FILE_ENV_VAR)
+        self._spans: List[Dict[str, Any]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def span(self, name: str, rows_in: Optional[int] = None):
+        """
+        Record a span around a block of work
+
+        Yields the span; set span["rows_out"] inside the block.
+
+        Args:
+            name: Span name (e.g. "Zero Sales", "Write Clean file")
+            rows_in: Rows going into the block, if known
+        """
+        span = self.start_span(name, rows_in)
+        try:
+            yield span
+        except BaseException:
+            self.finish_span(span, failed=True)
+            raise
+        self.finish_span(span)
+
+    def start_span(self, name: str, rows_in: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Open a span on the current thread
+
+        Args:
+            name: Span name
+            rows_in: Rows going into the span, if known
+
+        Returns:
+            Span dictionary to pass to finish_span
+        """
+        stack = self._get_stack()
+        parent = stack[-1] if stack else None
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            # The peak counter is global - carry the parent's peak so far
+            # over before resetting it for the child
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent["_memory_peak"] = max(parent["_memory_peak"], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+
+        span = {
+            "name": name,
+            "path": f"{parent['path']} > {name}" if parent else name,
+            "depth": len(stack),
+            "status": "running",
+            "rows_in": rows_in,
+            "rows_out": None,
+            "started": time.time(),
+            "wall_seconds": None,
+            "cpu_seconds": None,
+            "memory_peak_mb": None,
+            "rss_peak_mb": None,
+            "_root": parent["_root"] if parent else None,
+            "_wall_start": time.perf_counter(),
+            "_cpu_start": time.thread_time(),
+            "_memory_peak": current,
+        }
+        if parent is None:
+            span["_root"] = span
+            span["_previous_active"] = getattr(_active, "instrumentation", None)
+            _active.instrumentation = self
+
+        stack.append(span)
+        with self._lock:
+            self._spans.append(span)
+
+        return span
+
+    def finish_span(
+        self, span: Dict[str, Any], rows_out: Optional[int] = None, failed: bool = False
+    ):
+        """
+        Close a span
+
+        Spans opened inside it and still open are closed as well.
+
+        Args:
+            span: Span returned by start_span
+            rows_out: Rows coming out of the span (keeps span["rows_out"] if None)
+            failed: Mark the span as failed
+        """
+        stack = self._get_stack()
+        if not any(open_span is span for open_span in stack):
+            return
+        while stack[-1] is not span:
+            self.finish_span(stack[-1], failed=failed)
+        stack.pop()
+
+        if rows_out is not None:
+            span["rows_out"] = rows_out
+        span["status"] = "failed" if failed else "done"
+        span["wall_seconds"] = round(time.perf_counter() - span["_wall_start"], 4)
+        span["cpu_seconds"] = round(time.thread_time() - span["_cpu_start"], 4)
+
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(span["_memory_peak"], tracemalloc.get_traced_memory()[1])
+            span["memory_peak_mb"] = round(peak / (1024 * 1024), 2)
+            if stack:
+                stack[-1]["_memory_peak"] = max(stack[-1]["_memory_peak"], peak)
+            elif self._started_tracemalloc and not self._any_open():
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+        span["rss_peak_mb"] = _get_rss_peak_mb()
+
+        if not stack:
+            _active.instrumentation = span.pop("_previous_active", None)
+            if self.trace_file:
+                self.write_jsonl(self.trace_file, self.get_spans(span))
+
+    def get_spans(self, root: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Get recorded spans in start order
+
+        Args:
+            root: Only return this root span and its descendants
+
+        Returns:
+            List of span dictionaries without internal fields
+        """
+        with self._lock:
+            spans = list(self._spans)
+
+        if root is not None:
+            root = root["_root"]
+            spans = [span for span in spans if span["_root"] is root]
+
+        return [
+            {key: value for key, value in span.items() if not key.startswith("_")}
+            for span in spans
+        ]
+
+    def write_jsonl(self, path: str, spans: Optional[List[Dict[str, Any]]] = None):
+        """
+        Append spans to a JSON lines file
+
+        Args:
+            path: Target file (created if missing)
+            spans: Spans to write (default: all recorded spans)
+        """
+        spans = spans if spans is not None else self.get_spans()
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps(span, default=str) + "\n")
+        except OSError as e:
+            # Tracing must not break processing
+            print(f"WARNING: Could not write trace file {path}: {e}")
+
+    def _get_stack(self) -> List[Dict[str, Any]]:
+        """Get the open spans of the current thread"""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _any_open(self) -> bool:
+        """Check if any thread still has an open span"""
+        with self._lock:
+            return any(span["status"] == "running" for span in self._spans)
+
+
+@contextmanager
+def span(name: str, rows_in: Optional[int] = None):
+    """
+    Record a span in the instrumentation whose root span is open on this thread
+
+    Lets deep code such as optimizations add sub-stage spans without being
+    passed an Instrumentation. Without an active instrumentation this only
+    yields a throwaway dictionary.
+
+    Args:
+        name: Span name
+        rows_in: Rows going into the block, if known
+    """
+    instrumentation = getattr(_active, "instrumentation", None)
+    if instrumentation is None:
+        yield {}
+        return
+
+    with instrumentation.span(name, rows_in) as entry:
+        yield entry
+
+
+def _get_rss_peak_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return round(peak / divisor, 1)
@@ -0,0 +1,197 @@
+"""
+Progress Reporting
+Stage-level progress events published by the processing pipeline
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.instrumentation import Instrumentation, debug
+
+# Event types
+STAGE_STARTED = "stage_started"
+STAGE_FINISHED = "stage_finished"
+STAGE_FAILED = "stage_failed"
+
+
+class ProgressReporter:
+    """
+    Publishes pipeline stage events to subscribed callbacks
+
+    Every event is a dictionary with type, stage, rows, elapsed_seconds
+    (time in the stage so far), total_elapsed_seconds and progress
+    (finished stages / planned stages). The reporter also keeps a timeline
+    of all stages so pollers can render it without subscribing.
+
+    Every stage is also recorded as an instrumentation span (CPU time,
+    memory), nested under whatever span is open when the stage starts.
+    """
+
+    def __init__(
+        self,
+        callbacks: Optional[List[Callable[[Dict], None]]] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        """
+        Initialize reporter
+
+        Args:
+            callbacks: Functions called with every event dictionary
+            instrumentation: Span recorder for the stages (default: new one)
+        """
+        self.callbacks = list(callbacks or [])
+        self.instrumentation = instrumentation or Instrumentation()
+        self._spans: Dict[int, Dict[str, Any]] = {}
+        self.start_time = time.time()
+        self.planned_stages = 0
+        self._timeline: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """Add a callback for future events"""
+        self.callbacks.append(callback)
+
+    def plan(self, stage_count: int):
+        """
+        Add expected stages - used to compute the progress fraction
+
+        Args:
+            stage_count: Number of stages the caller will report
+        """
+        with self._lock:
+            self.planned_stages += stage_count
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None):
+        """
+        Report a stage around a block of work
+
+        Yields the timeline entry; set entry["rows"] inside the block when
+        the row count is only known afterwards.
+
+        Args:
+            name: Stage name (e.g. "Read Bulk", "Zero Sales")
+            rows: Rows going into the stage, if known
+        """
+        entry = self.start_stage(name, rows)
+        try:
+            yield entry
+        except BaseException:
+            self._finish(entry, STAGE_FAILED)
+            raise
+        self._finish(entry, STAGE_FINISHED)
+
+    def start_stage(self, name: str, rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Mark a stage as started
+
+        Args:
+            name: Stage name
+            rows: Rows going into the stage, if known
+
+        Returns:
+            Timeline entry to pass to finish_stage
+        """
+        entry = {
+            "stage": name,
+            "status": "running",
+            "rows": rows,
+            "started": time.time(),
+            "elapsed_seconds": 0.0,
+        }
+        span = self.instrumentation.start_span(name, rows)
+        with self._lock:
+            self._timeline.append(entry)
+            self._spans[id(entry)] = span
+
+        self._publish(STAGE_STARTED, entry)
+        return entry
+
+    def finish_stage(
+        self, entry: Dict[str, Any], rows: Optional[int] = None, failed: bool = False
+    ):
+        """
+        Mark a stage as finished
+
+        Args:
+            entry: Timeline entry returned by start_stage
+            rows: Final row count (keeps the start count if None)
+            failed: Mark the stage as failed instead of done
+        """
+        if rows is not None:
+            entry["rows"] = rows
+        self._finish(entry, STAGE_FAILED if failed else STAGE_FINISHED)
+
+    def get_timeline(self) -> List[Dict[str, Any]]:
+        """
+        Get all stages reported so far
+
+        Returns:
+            List of stage dictionaries (stage, status, rows, elapsed_seconds);
+            running stages show their elapsed time up to now
+        """
+        now = time.time()
+        with self._lock:
+            timeline = [dict(entry) for entry in self._timeline]
+
+        for entry in timeline:
+            if entry["status"] == "running":
+                entry["elapsed_seconds"] = round(now - entry["started"], 2)
+        return timeline
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Get current progress for polling
+
+        Returns:
+            Dictionary with progress (0.0-1.0), current_stage,
+            total_elapsed_seconds and timeline
+        """
+        timeline = self.get_timeline()
+        running = [entry for entry in timeline if entry["status"] == "running"]
+        return {
+            "progress": self._get_progress(),
+            "current_stage": running[-1]["stage"] if running else None,
+            "total_elapsed_seconds": round(time.time() - self.start_time, 2),
+            "timeline": timeline,
+        }
+
+    def _finish(self, entry: Dict[str, Any], status: str):
+        """Close a timeline entry and its span, then publish its event"""
+        entry["status"] = "failed" if status == STAGE_FAILED else "done"
+        entry["elapsed_seconds"] = round(time.time() - entry["started"], 2)
+
+        with self._lock:
+            span = self._spans.pop(id(entry), None)
+        if span is not None:
+            self.instrumentation.finish_span(
+                span, rows_out=entry["rows"], failed=status == STAGE_FAILED
+            )
+        self._publish(status, entry)
+
+    def _get_progress(self) -> float:
+        """Fraction of planned stages that are finished"""
+        with self._lock:
+            done = sum(1 for entry in self._timeline if entry["status"] != "running")
+            planned = max(self.planned_stages, len(self._timeline), 1)
+        return min(done / planned, 1.0)
+
+    def _publish(self, event_type: str, entry: Dict[str, Any]):
+        """Send an event to all callbacks"""
+        event = {
+            "type": event_type,
+            "stage": entry["stage"],
+            "rows": entry["rows"],
+            "elapsed_seconds": entry["elapsed_seconds"],
+            "total_elapsed_seconds": round(time.time() - self.start_time, 2),
+            "progress": self._get_progress(),
+        }
+
+        for callback in self.callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                # A broken observer must not break processing
+                debug("ProgressReporter: Callback failed (%s)", e)